@@ -1,21 +1,41 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from config import Config
 from models import db
+from cache import cache
+from metrics import metrics
+from replica import replica_router
+from passwords import password_hasher, HashingBusy
+from identity import identity_cache
+from memberships import memberships
+from trending import trending
+from feed import feed
+from serializers import OrjsonProvider
+from pagination import InvalidCursor
+from commands import register_commands
+from search import ensure_search_index
 from routes.books import books_bp
 from routes.users import users_bp
 from routes.literary_works import literary_works_bp
 from routes.workshops import workshops_bp
 from routes.groups import groups_bp
+from routes.feed import feed_bp
+from routes.export import export_bp
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# Sérialisation JSON rapide (orjson) pour jsonify() dans tous les blueprints
+# (UTF-8 au lieu d'échappements \uXXXX, sauf JSON_ENSURE_ASCII : voir serializers.py)
+app.json = OrjsonProvider(app)
+app.json.ensure_ascii = app.config['JSON_ENSURE_ASCII']
+
 # Configuration CORS améliorée
 CORS(app, 
      resources={r"/api/*": {"origins": "*"}},
-     allow_headers=["Content-Type", "Authorization"],
+     allow_headers=["Content-Type", "Authorization", "X-Read-Primary-Until"],
+     expose_headers=["X-Next-Cursor", "X-Read-Primary-Until"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
      supports_credentials=True)
 
@@ -27,8 +47,37 @@ jwt = JWTManager(app)
 # Initialisation de la base de données
 db.init_app(app)
 
+# Lectures des endpoints marqués @read_replica sur le réplica, si configuré
+replica_router.init_app(app)
+
+# Cache des réponses des listes publiques
+cache.init_app(app)
+
+# Hachage des mots de passe hors des workers HTTP
+password_hasher.init_app(app)
+
+# Utilisateur courant mis en cache entre requêtes (voir identity.py)
+identity_cache.init_app(app)
+
+# Tests d'appartenance aux groupes / ateliers sur la clé primaire, avec cache (voir memberships.py)
+memberships.init_app(app)
+
+# Score « tendance » des œuvres et sa re-décroissance périodique (voir trending.py)
+trending.init_app(app)
+
+# Fil d'actualité : diffusion des publications en arrière-plan (voir feed.py)
+feed.init_app(app)
+
+# Mesures par endpoint (latence, SQL, taille) et en-tête Server-Timing
+metrics.init_app(app)
+
 with app.app_context():
     db.create_all()
+    ensure_search_index(app.config['SEARCH_LANGUAGE'])
+    trending.ensure_state()
+
+# Commandes de maintenance (flask recount-works, ...)
+register_commands(app)
 
 # Route racine
 @app.route('/')
@@ -52,16 +101,41 @@ def api_health():
             '/api/books',
             '/api/literary-works',
             '/api/workshops',
-            '/api/groups'
+            '/api/groups',
+            '/api/feed'
         ]
     })
 
+# Statistiques du cache de réponses (pour le dimensionner)
+@app.route('/api/cache/stats')
+def cache_stats():
+    return jsonify(cache.stats())
+
+# Métriques au format Prometheus
+@app.route('/api/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Curseur de pagination invalide sur une liste paginée
+@app.errorhandler(InvalidCursor)
+def handle_invalid_cursor(error):
+    return jsonify({'error': 'Curseur de pagination invalide'}), 400
+
+# File de hachage des mots de passe pleine (pic de connexions)
+@app.errorhandler(HashingBusy)
+def handle_hashing_busy(error):
+    response = jsonify({'error': 'Service momentanément surchargé, veuillez réessayer'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # Enregistrement des blueprints
 app.register_blueprint(books_bp, url_prefix='/api')
 app.register_blueprint(users_bp, url_prefix='/api')
 app.register_blueprint(literary_works_bp, url_prefix='/api')
 app.register_blueprint(workshops_bp, url_prefix='/api')
 app.register_blueprint(groups_bp, url_prefix='/api')
+app.register_blueprint(feed_bp, url_prefix='/api')
+app.register_blueprint(export_bp, url_prefix='/api')
 
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=5009)
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Mode de service ASGI de l'API :
+
+    cd backend && ASGI_ENABLED=1 uvicorn asgi:application --workers 4 --port 5009
+
+Les lectures chaudes (ASYNC_ENDPOINTS : listes et détails des œuvres, groupes et
+ateliers) passent par la même application Flask, exécutée dans un greenlet dont
+les accès à la base utilisent un moteur SQLAlchemy asynchrone (aiosqlite /
+asyncpg) : pendant qu'une requête attend la base, la boucle d'événements en sert
+d'autres. URLs, en-têtes et JSON sont donc exactement ceux du mode synchrone.
+Les autres endpoints (écritures, hachage des mots de passe...) restent
+synchrones et s'exécutent dans le pool de threads de WsgiToAsgi. Le travail
+bloquant des endpoints asynchrones qui n'est pas un accès base (cache Redis,
+encodage JSON) passe par replica.offload, qui l'exécute dans le pool de threads
+de la boucle d'événements.
+
+Ce mode n'est pas celui par défaut : sur SQLite il est plus lent que le mode
+synchrone (mesuré avec benchmarks.load, 1 worker, 32 clients : gunicorn 122 req/s,
+ASGI 89 req/s). Une base dans le processus n'a pas d'attente réseau à recouvrir
+et aiosqlite ajoute un passage par un thread à chaque requête SQL. Le gain n'est
+attendu qu'avec un PostgreSQL distant ; cette configuration n'a pas encore été
+mesurée. Le mode reste donc expérimental : `application` refuse de démarrer sans
+ASGI_ENABLED=1, à n'activer qu'après une comparaison benchmarks.load sur
+PostgreSQL montrant un gain sur le mode synchrone.
+"""
+import io
+import logging
+import sys
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.util import greenlet_spawn
+from werkzeug.exceptions import HTTPException
+from app import app
+from models import db
+from replica import async_engines
+
+logger = logging.getLogger(__name__)
+
+# Pilote asynchrone de chaque base supportée
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def async_url(url):
+    """URL du moteur synchrone convertie vers le pilote asynchrone équivalent"""
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f'Pas de pilote asynchrone pour la base {url.get_backend_name()!r}')
+    return url.set(drivername=driver)
+
+def build_environ(scope):
+    """Environnement WSGI d'une requête ASGI sans corps (GET / HEAD)"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+class AsyncApplication:
+    """Application ASGI : endpoints chauds en asynchrone, le reste via WsgiToAsgi"""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.endpoints = set(flask_app.config['ASYNC_ENDPOINTS'])
+
+        # Un moteur asynchrone par moteur Flask-SQLAlchemy (base principale et réplica éventuel)
+        with flask_app.app_context():
+            self.async_engines = {
+                key: create_async_engine(
+                    async_url(engine.url),
+                    pool_size=flask_app.config['ASYNC_POOL_SIZE'],
+                    max_overflow=flask_app.config['ASYNC_MAX_OVERFLOW']
+                )
+                for key, engine in db.engines.items()
+            }
+        if any(engine.dialect.name == 'sqlite' for engine in self.async_engines.values()):
+            logger.warning('Mode ASGI sur SQLite : plus lent que le mode synchrone (voir asgi.py)')
+        # RoutingSession choisit parmi ces moteurs (interface synchrone, E/S asynchrones)
+        self.sync_engines = {key: engine.sync_engine for key, engine in self.async_engines.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            return await self.wsgi(scope, receive, send)
+
+        environ = build_environ(scope)
+        if self._endpoint(environ) not in self.endpoints:
+            return await self.wsgi(scope, receive, send)
+
+        token = async_engines.set(self.sync_engines)
+        try:
+            status, headers, body = await greenlet_spawn(self._run_wsgi, environ)
+        finally:
+            async_engines.reset(token)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _endpoint(self, environ):
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None  # 404, 405, redirection : laissés à Flask
+        return endpoint
+
+    def _run_wsgi(self, environ):
+        # Exécuté dans un greenlet : chaque accès base rend la main à la boucle d'événements
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = headers
+
+        chunks = self.app(environ, start_response)
+        try:
+            body = b''.join(chunks)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        return response['status'], response['headers'], body
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for engine in self.async_engines.values():
+                    await engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+if not app.config['ASGI_ENABLED']:
+    raise RuntimeError(
+        'Mode ASGI expérimental, plus lent que le mode synchrone sur SQLite et non mesuré sur '
+        'PostgreSQL : ASGI_ENABLED=1 pour le lancer (voir asgi.py)'
+    )
+
+application = AsyncApplication(app)
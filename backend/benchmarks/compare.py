@@ -0,0 +1,42 @@
+"""
+Compare deux résultats de benchmarks.endpoints ou benchmarks.load (ex. SQLite
+contre PostgreSQL, mode synchrone contre ASGI, avant / après une optimisation) :
+
+    cd backend && python -m benchmarks.compare avant.json apres.json
+"""
+import argparse
+import json
+
+def _load(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+def _label(report):
+    return report['meta'].get('label') or report['meta']['database']
+
+def _ratio(before, after):
+    if not before or after is None:
+        return '-'
+    return f'{after / before:.2f}x'
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare deux fichiers de résultats de benchmark')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--metric', default='p50_ms', help='Métrique comparée (p50_ms, p95_ms, p99_ms, mean_ms...)')
+    args = parser.parse_args()
+
+    baseline = _load(args.baseline)
+    candidate = _load(args.candidate)
+    print(f"{'endpoint':28} {_label(baseline):>12} {_label(candidate):>12} "
+          f"{'ratio':>8} {'sql':>13}")
+    for name, before in baseline['endpoints'].items():
+        after = candidate['endpoints'].get(name)
+        if after is None:
+            continue
+        print(f"{name:28} {before[args.metric]:>12} {after[args.metric]:>12} "
+              f"{_ratio(before[args.metric], after[args.metric]):>8} "
+              f"{before.get('sql_statements_mean', '-'):>6}/{after.get('sql_statements_mean', '-'):<6}")
+
+if __name__ == '__main__':
+    main()
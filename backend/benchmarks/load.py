@@ -0,0 +1,155 @@
+"""
+Test de charge HTTP (client asyncio, connexions keep-alive) pour comparer les
+modes de service synchrone et ASGI sur la même machine et la même base :
+
+    cd backend
+    CACHE_TYPE=none gunicorn --workers 4 --bind 127.0.0.1:5009 app:app
+    python -m benchmarks.load --url http://127.0.0.1:5009 --label wsgi --output wsgi.json
+
+    CACHE_TYPE=none ASGI_ENABLED=1 uvicorn asgi:application --workers 4 --port 5009
+    python -m benchmarks.load --url http://127.0.0.1:5009 --label asgi --output asgi.json
+
+    python -m benchmarks.compare wsgi.json asgi.json --metric requests_per_second
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from benchmarks.endpoints import percentile
+
+DEFAULT_PATHS = [
+    '/api/literary-works?limit=20',
+    '/api/literary-works?sort_by=popularity&limit=20',
+    '/api/literary-works/1',
+    '/api/groups',
+    '/api/groups/1',
+    '/api/workshops',
+    '/api/workshops/1',
+]
+
+class Connection:
+    """Connexion HTTP/1.1 réutilisée tant que le serveur ne la ferme pas"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nConnection: keep-alive\r\n\r\n'.encode('latin-1')
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connexion fermée par le serveur')
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status_line.split()[1]), len(body)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+async def worker(host, port, paths, deadline, offset, results):
+    connection = Connection(host, port)
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            status, _ = await connection.get(path)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            connection.close()
+            status = 'error'
+        results[path]['latencies'].append(time.perf_counter() - start)
+        results[path]['statuses'][str(status)] += 1
+    connection.close()
+
+async def run(url, paths, concurrency, duration, warmup):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    # Échauffement (pools de connexions, caches du moteur) non mesuré
+    if warmup:
+        ignored = {path: {'latencies': [], 'statuses': Counter()} for path in paths}
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*[worker(host, port, paths, deadline, n, ignored) for n in range(concurrency)])
+
+    results = {path: {'latencies': [], 'statuses': Counter()} for path in paths}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[worker(host, port, paths, deadline, n, results) for n in range(concurrency)])
+    return results, time.perf_counter() - start
+
+def summarize(latencies, statuses, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'statuses': dict(statuses),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Test de charge des endpoints de lecture')
+    parser.add_argument('--url', default='http://127.0.0.1:5009')
+    parser.add_argument('--path', action='append', help='Chemin à solliciter (répétable)')
+    parser.add_argument('--concurrency', type=int, default=64, help='Clients simultanés')
+    parser.add_argument('--duration', type=float, default=20, help='Durée mesurée (secondes)')
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--label', default='run', help='Nom du mode testé (wsgi, asgi...)')
+    parser.add_argument('--output', default='load_results.json')
+    args = parser.parse_args()
+
+    paths = args.path or DEFAULT_PATHS
+    results, elapsed = asyncio.run(run(args.url, paths, args.concurrency, args.duration, args.warmup))
+
+    endpoints = {path: summarize(data['latencies'], data['statuses'], elapsed) for path, data in results.items()}
+    endpoints['total'] = summarize(
+        [latency for data in results.values() for latency in data['latencies']],
+        sum((data['statuses'] for data in results.values()), Counter()),
+        elapsed
+    )
+    for path, summary in endpoints.items():
+        print(f"{path:50} {summary['requests_per_second']:>9} req/s  p50={summary['p50_ms']} ms  "
+              f"p99={summary['p99_ms']} ms  {summary['statuses']}")
+
+    report = {
+        'meta': {
+            'date': datetime.utcnow().isoformat(),
+            'label': args.label,
+            'url': args.url,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+        },
+        'endpoints': endpoints,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2)
+    print(f'Résultats écrits dans {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Tests d'appartenance sur un groupe de 50 000 membres : collection chargée
+(`user in group.members`, l'ancien code des routes) contre memberships.py
+(EXISTS sur la clé primaire, avec et sans cache), puis latence de
+join/leave et de la page d'un groupe privé par l'API.
+
+    cd backend && python -m benchmarks.memberships --members 50000 --iterations 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.endpoints import percentile
+
+def timed(func, iterations):
+    """Latences triées (secondes) de `iterations` appels"""
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+def summary(latencies):
+    return (f'p50={percentile(latencies, 0.50) * 1000:9.3f} ms  '
+            f'p99={percentile(latencies, 0.99) * 1000:9.3f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description="Tests d'appartenance sur un grand groupe")
+    parser.add_argument('--members', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--legacy-iterations', type=int, default=10,
+                        help='Itérations du chargement de la collection (lent)')
+    args = parser.parse_args()
+
+    # Base jetable : le benchmark ne touche pas aux données de développement
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'memberships.db')
+    os.environ['CACHE_TYPE'] = 'none'
+    from app import app
+    from models import db, User, Group, group_members
+    from memberships import memberships
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.execute(User.__table__.insert(), [
+            {'username': f'member_{i}', 'email': f'member_{i}@example.com', 'password_hash': '-',
+             'role': 'author', 'created_at': now, 'updated_at': now}
+            for i in range(args.members + 1)
+        ])
+        user_ids = [row[0] for row in db.session.query(User.id).order_by(User.id)]
+        outsider_id, member_ids = user_ids[-1], user_ids[:-1]
+        group = Group(name='Grand groupe', description='', is_private=True, creator_id=member_ids[0])
+        db.session.add(group)
+        db.session.flush()
+        group_id = group.id
+        db.session.execute(group_members.insert(), [
+            {'group_id': group_id, 'user_id': user_id} for user_id in member_ids
+        ])
+        db.session.commit()
+        member_token = create_access_token(identity=str(member_ids[-1]), additional_claims={'role': 'author'})
+        outsider_token = create_access_token(identity=str(outsider_id), additional_claims={'role': 'author'})
+
+        def legacy(i):
+            # Ancien test des routes : chargement de toute la collection
+            db.session.expire_all()
+            user = db.session.get(User, member_ids[i % len(member_ids)])
+            return user in db.session.get(Group, group_id).members
+
+        def service(i):
+            return memberships.is_member('group', group_id, member_ids[i * 7919 % len(member_ids)])
+
+        print(f'{args.members} membres')
+        print(f'{"collection chargée":28} {summary(timed(legacy, args.legacy_iterations))}')
+        for ttl in (0, 30):
+            app.config['MEMBERSHIP_CACHE_TTL'] = ttl
+            memberships.init_app(app)
+            label = 'EXISTS sans cache' if not ttl else 'EXISTS, cache (2e passe)'
+            if ttl:
+                timed(service, args.iterations)  # remplit le cache
+            print(f'{label:28} {summary(timed(service, args.iterations))}')
+
+    client = app.test_client()
+    member = {'Authorization': f'Bearer {member_token}'}
+    outsider = {'Authorization': f'Bearer {outsider_token}'}
+
+    # Le groupe devient public pour join/leave ; la page privée est mesurée avant
+    print(f'{"GET groupe privé (membre)":28} '
+          f'{summary(timed(lambda i: client.get(f"/api/groups/{group_id}", headers=member), args.iterations))}')
+    with app.app_context():
+        Group.query.filter_by(id=group_id).update({'is_private': False})
+        db.session.commit()
+
+    def join_leave(i):
+        client.post(f'/api/groups/{group_id}/join', headers=outsider)
+        client.post(f'/api/groups/{group_id}/leave', headers=outsider)
+    print(f'{"POST join + leave":28} {summary(timed(join_leave, args.iterations))}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Pic de connexions simultanées : débit de /api/login et latence d'un endpoint
+léger (/api/books) servi pendant ce temps, avec le hachage dans le processus
+de la requête puis dans le pool de processus (passwords.py).
+
+    cd backend && python -m benchmarks.passwords --concurrency 16 --duration 10 --workers 2
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.endpoints import percentile
+
+EMAIL = 'bench_login@example.com'
+PASSWORD = 'password123'
+
+def storm(app, concurrency, duration):
+    """Connexions en boucle sur `concurrency` threads, et une sonde sur /api/books"""
+    deadline = time.perf_counter() + duration
+    logins = []
+    statuses = Counter()
+    probe = []
+    lock = threading.Lock()
+
+    def login_loop():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = client.post('/api/login', json={'email': EMAIL, 'password': PASSWORD})
+            with lock:
+                logins.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+    def probe_loop():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            client.get('/api/books')
+            probe.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(concurrency)]
+    threads.append(threading.Thread(target=probe_loop))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    logins.sort()
+    probe.sort()
+    return {
+        'logins_per_second': round(statuses[200] / duration, 1),
+        'login_p50_ms': round(percentile(logins, 0.50) * 1000, 1),
+        'login_p99_ms': round(percentile(logins, 0.99) * 1000, 1),
+        'probe_p50_ms': round(percentile(probe, 0.50) * 1000, 2),
+        'probe_p99_ms': round(percentile(probe, 0.99) * 1000, 2),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Débit de connexions concurrentes')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=2, help='Taille du pool de hachage')
+    parser.add_argument('--max-pending', type=int, default=32)
+    args = parser.parse_args()
+
+    # Base jetable : le benchmark ne touche pas aux données de développement
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'passwords.db')
+    os.environ['CACHE_TYPE'] = 'none'
+    from app import app
+    from models import db, User
+    from passwords import password_hasher
+
+    with app.app_context():
+        user = User(username='bench_login', email=EMAIL)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+    for label, workers in (('dans la requête', 0), (f'pool de {args.workers} processus', args.workers)):
+        app.config['PASSWORD_HASH_WORKERS'] = workers
+        app.config['PASSWORD_HASH_MAX_PENDING'] = args.max_pending
+        password_hasher.init_app(app)
+        storm(app, 1, 1)  # échauffement (démarrage du pool)
+        result = storm(app, args.concurrency, args.duration)
+        print(f'{label:24} {result}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Génération d'un jeu de données synthétique volumineux à travers les modèles de models.py.
+
+Les insertions passent par des INSERT groupés (executemany) par lots ; la
+distribution des likes suit une loi de Zipf pour reproduire quelques textes
+« viraux » et une longue traîne d'œuvres peu lues.
+
+    cd backend && DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --users 1000 --works 20000
+"""
+import argparse
+import itertools
+import os
+import random
+from datetime import datetime, timedelta
+
+BATCH_SIZE = 5000
+
+WORK_TYPES = ['poem', 'novel', 'short story', 'essay', 'other']
+WORDS = (
+    'lune soleil mer vent forêt ville nuit silence mémoire voyage rivière automne '
+    'lumière ombre jardin hiver orage rêve fenêtre chemin horizon encre papier '
+    'souvenir enfance étoile désert montagne pluie murmure'
+).split()
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def _zipf_weights(count, exponent):
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+def _insert(table, rows):
+    """INSERT groupé par lots de BATCH_SIZE lignes"""
+    from models import db
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(table.insert(), rows[start:start + BATCH_SIZE])
+    db.session.commit()
+
+def _reset_sequences(tables):
+    """PostgreSQL : recale les séquences après des insertions avec identifiants explicites"""
+    from models import db
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM \"{table.name}\"))"
+        ))
+    db.session.commit()
+
+def seed(users=200, works=2000, likes_per_user=20, comments=4000, groups=50,
+         workshops=50, members_per_group=40, books=200, follows_per_user=10, zipf_exponent=1.1,
+         random_seed=42):
+    """
+    Remplit la base courante (dans un contexte d'application) et retourne les
+    identifiants utiles aux scénarios de benchmark.
+    """
+    from werkzeug.security import generate_password_hash
+    from models import (
+        db, User, LiteraryWork, Comment, Group, Workshop, Book,
+        literary_work_likes, group_members, workshop_participants, author_followers
+    )
+    from commands import recount_works
+    from trending import trending
+    from feed import feed
+
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+
+    # Un seul hachage pour tous les comptes : le coût du hachage n'est pas l'objet du seed
+    password_hash = generate_password_hash('password123')
+    first_user_id = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+    _insert(User.__table__, [{
+        'id': first_user_id + i,
+        'username': f'bench_user_{first_user_id + i}',
+        'email': f'bench_user_{first_user_id + i}@example.com',
+        'password_hash': password_hash,
+        'first_name': 'Bench',
+        'last_name': str(first_user_id + i),
+        'bio': _text(rng, 12),
+        'role': 'admin' if i == 0 else 'author',
+        'created_at': now - timedelta(days=400),
+        'updated_at': now - timedelta(days=400),
+    } for i in range(users)])
+    user_ids = list(range(first_user_id, first_user_id + users))
+
+    first_book_id = (db.session.query(db.func.max(Book.id)).scalar() or 0) + 1
+    _insert(Book.__table__, [{
+        'id': first_book_id + i,
+        'title': f'Livre {first_book_id + i}',
+        'author': f'Écrivain {i % 97}',
+        'published_at': now - timedelta(days=rng.randint(0, 20000)),
+    } for i in range(books)])
+    book_ids = list(range(first_book_id, first_book_id + books))
+
+    first_group_id = (db.session.query(db.func.max(Group.id)).scalar() or 0) + 1
+    group_ids = list(range(first_group_id, first_group_id + groups))
+    _insert(Group.__table__, [{
+        'id': group_id,
+        'name': f'Groupe {group_id}',
+        'description': _text(rng, 20),
+        'is_private': group_id % 5 == 0,
+        'creator_id': rng.choice(user_ids),
+        'created_at': now - timedelta(days=rng.randint(0, 365)),
+        'changed_at': now,
+        'version': 1,
+    } for group_id in group_ids])
+
+    first_workshop_id = (db.session.query(db.func.max(Workshop.id)).scalar() or 0) + 1
+    workshop_ids = list(range(first_workshop_id, first_workshop_id + workshops))
+    workshop_rows = []
+    for workshop_id in workshop_ids:
+        start = now + timedelta(days=rng.randint(-300, 60))
+        workshop_rows.append({
+            'id': workshop_id,
+            'title': f'Atelier {workshop_id}',
+            'description': _text(rng, 20),
+            'theme': rng.choice(WORDS),
+            'status': rng.choice(['planning', 'active', 'completed']),
+            'start_date': start,
+            'end_date': start + timedelta(days=rng.randint(1, 30)),
+            'creator_id': rng.choice(user_ids),
+            'created_at': start - timedelta(days=30),
+            'changed_at': now,
+            'version': 1,
+        })
+    _insert(Workshop.__table__, workshop_rows)
+
+    # Adhésions : tailles de groupes également asymétriques (quelques très gros groupes)
+    size_weights = _zipf_weights(groups, zipf_exponent)
+    memberships = set()
+    for group_id, weight in zip(group_ids, size_weights):
+        size = min(users, max(2, int(members_per_group * weight * groups / sum(size_weights))))
+        memberships.update((user_id, group_id) for user_id in rng.sample(user_ids, size))
+    _insert(group_members, [{'user_id': u, 'group_id': g} for u, g in memberships])
+    participations = {
+        (user_id, workshop_id)
+        for workshop_id in workshop_ids
+        for user_id in rng.sample(user_ids, min(users, rng.randint(2, members_per_group)))
+    }
+    _insert(workshop_participants, [{'user_id': u, 'workshop_id': w} for u, w in participations])
+
+    # Abonnements : quelques auteurs très suivis (loi de Zipf), une longue traîne
+    author_order = user_ids[:]
+    rng.shuffle(author_order)
+    author_weights = list(itertools.accumulate(_zipf_weights(users, zipf_exponent)))
+    follows = {
+        (user_id, author_id)
+        for user_id in user_ids
+        for author_id in rng.choices(author_order, cum_weights=author_weights, k=follows_per_user)
+        if author_id != user_id
+    }
+    _insert(author_followers, [{'user_id': u, 'author_id': a} for u, a in follows])
+
+    # Œuvres réparties sur un an, quelques-unes dans des groupes / ateliers / liées à un livre
+    first_work_id = (db.session.query(db.func.max(LiteraryWork.id)).scalar() or 0) + 1
+    work_ids = list(range(first_work_id, first_work_id + works))
+    work_rows = []
+    for work_id in work_ids:
+        created_at = now - timedelta(minutes=rng.randint(0, 525600))
+        work_rows.append({
+            'id': work_id,
+            'title': f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {work_id}',
+            'content': _text(rng, rng.randint(50, 400)),
+            'type': rng.choice(WORK_TYPES),
+            'status': 'published' if rng.random() < 0.9 else 'draft',
+            'created_at': created_at,
+            'updated_at': created_at,
+            'changed_at': created_at,
+            'version': 1,
+            'author_id': rng.choice(user_ids),
+            'workshop_id': rng.choice(workshop_ids) if workshop_ids and rng.random() < 0.2 else None,
+            'group_id': rng.choice(group_ids) if group_ids and rng.random() < 0.2 else None,
+            'book_id': rng.choice(book_ids) if book_ids and rng.random() < 0.1 else None,
+            'likes_count': 0,
+            'comments_count': 0,
+            'rating_sum': 0,
+            'rating_count': 0,
+        })
+    _insert(LiteraryWork.__table__, work_rows)
+
+    # Likes selon une loi de Zipf sur un ordre aléatoire des œuvres
+    popularity_order = work_ids[:]
+    rng.shuffle(popularity_order)
+    cumulative = list(itertools.accumulate(_zipf_weights(works, zipf_exponent)))
+    likes = set()
+    for user_id in user_ids:
+        for work_id in rng.choices(popularity_order, cum_weights=cumulative, k=likes_per_user):
+            likes.add((user_id, work_id))
+    _insert(literary_work_likes, [{'user_id': u, 'literary_work_id': w} for u, w in likes])
+
+    _insert(Comment.__table__, [{
+        'content': _text(rng, rng.randint(5, 60)),
+        'rating': rng.choice([None, 1, 2, 3, 4, 5]),
+        'created_at': now - timedelta(minutes=rng.randint(0, 525600)),
+        'user_id': rng.choice(user_ids),
+        'literary_work_id': work_id,
+    } for work_id in rng.choices(popularity_order, cum_weights=cumulative, k=comments)])
+
+    # Compteurs dénormalisés cohérents avec les tables sources
+    recount_works()
+    trending.rebuild()
+    # Fils d'actualité : œuvres du dernier mois, comme `flask rebuild-feed`
+    feed.rebuild(since=now - timedelta(days=30))
+    _reset_sequences([
+        User.__table__, Book.__table__, Group.__table__, Workshop.__table__,
+        LiteraryWork.__table__, Comment.__table__
+    ])
+
+    return {
+        'user_ids': user_ids,
+        'work_ids': work_ids,
+        'hot_work_id': popularity_order[0],
+        'group_ids': group_ids,
+        'largest_group_id': group_ids[0] if group_ids else None,
+        'workshop_ids': workshop_ids,
+        'book_ids': book_ids,
+        'counts': {
+            'users': users, 'works': works, 'likes': len(likes), 'comments': comments,
+            'groups': groups, 'workshops': workshops, 'memberships': len(memberships),
+            'participations': len(participations), 'follows': len(follows), 'books': books,
+        },
+    }
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--works', type=int, default=2000)
+    parser.add_argument('--likes-per-user', type=int, default=20)
+    parser.add_argument('--comments', type=int, default=4000)
+    parser.add_argument('--groups', type=int, default=50)
+    parser.add_argument('--workshops', type=int, default=50)
+    parser.add_argument('--members-per-group', type=int, default=40)
+    parser.add_argument('--books', type=int, default=200)
+    parser.add_argument('--follows-per-user', type=int, default=10)
+    parser.add_argument('--zipf-exponent', type=float, default=1.1)
+    parser.add_argument('--random-seed', type=int, default=42)
+
+def seed_from_args(args):
+    return seed(
+        users=args.users, works=args.works, likes_per_user=args.likes_per_user,
+        comments=args.comments, groups=args.groups, workshops=args.workshops,
+        members_per_group=args.members_per_group, books=args.books, follows_per_user=args.follows_per_user,
+        zipf_exponent=args.zipf_exponent, random_seed=args.random_seed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Remplit la base avec un jeu de données synthétique')
+    parser.add_argument('--database-url', help='Base cible (sinon DATABASE_URL)')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from app import app  # la configuration lit DATABASE_URL à l'import
+
+    with app.app_context():
+        dataset = seed_from_args(args)
+    print(dataset['counts'])
+
+if __name__ == '__main__':
+    main()
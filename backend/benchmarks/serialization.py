@@ -0,0 +1,107 @@
+"""
+Benchmark de sérialisation d'une liste d'œuvres (1 000 éléments par défaut) :
+construction manuelle des dictionnaires + json (ancien code des routes) contre
+schéma compilé + orjson (serializers.py).
+
+    cd backend && python -m benchmarks.serialization --items 1000 --repeat 50
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import orjson
+
+from serializers import WORK_LIST_ITEM
+
+def make_works(count):
+    """Objets factices ayant les attributs lus par les routes (pas de base de données)"""
+    now = datetime(2025, 6, 1, 12, 0, 0, 123456)
+    authors = [
+        SimpleNamespace(id=i, username=f'auteur_{i}', profile_picture=f'/avatars/{i}.png')
+        for i in range(50)
+    ]
+    books = [SimpleNamespace(id=i, title=f'Livre {i}', author=f'Écrivain {i}') for i in range(20)]
+    return [
+        SimpleNamespace(
+            id=i,
+            title=f'Œuvre numéro {i}',
+            type='poem' if i % 2 else 'short story',
+            status='published',
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(seconds=i),
+            author=authors[i % len(authors)],
+            likes_count=i * 7 % 311,
+            comments_count=i % 13,
+            rating_average=round(1 + i % 40 / 10, 2) if i % 5 else None,
+            rating_count=i % 17 if i % 5 else 0,
+            book=books[i % len(books)] if i % 3 == 0 else None
+        )
+        for i in range(count)
+    ]
+
+def legacy_dump(works):
+    """Reproduction du formatage manuel de get_literary_works avant les schémas"""
+    works_list = []
+    for work in works:
+        work_data = {
+            'id': work.id,
+            'title': work.title,
+            'type': work.type,
+            'status': work.status,
+            'created_at': work.created_at.isoformat(),
+            'updated_at': work.updated_at.isoformat(),
+            'author': {
+                'id': work.author.id,
+                'username': work.author.username,
+                'profile_picture': work.author.profile_picture
+            },
+            'likes_count': work.likes_count,
+            'comments_count': work.comments_count,
+            'rating_average': work.rating_average,
+            'rating_count': work.rating_count
+        }
+        if work.book:
+            work_data['book'] = {
+                'id': work.book.id,
+                'title': work.book.title,
+                'author': work.book.author
+            }
+        works_list.append(work_data)
+    # Mêmes options que le fournisseur JSON par défaut de Flask (hors debug)
+    return json.dumps(works_list, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def schema_dump(works):
+    return orjson.dumps(WORK_LIST_ITEM.dump_many(works), option=orjson.OPT_SORT_KEYS)
+
+def best_of(func, works, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(works)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    works = make_works(args.items)
+
+    # Les deux sorties doivent décrire exactement le même document JSON
+    assert json.loads(legacy_dump(works)) == json.loads(schema_dump(works))
+
+    legacy = best_of(legacy_dump, works, args.repeat)
+    compiled = best_of(schema_dump, works, args.repeat)
+    print(json.dumps({
+        'items': args.items,
+        'legacy_ms': round(legacy * 1000, 3),
+        'schema_orjson_ms': round(compiled * 1000, 3),
+        'speedup': round(legacy / compiled, 2)
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import g, request, make_response
+from replica import offload
+
+# En-têtes de réponse conservés avec le corps (curseur de la page suivante des listes)
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+# Durée (secondes) pendant laquelle une invalidation est mémorisée : une lecture
+# commencée avant cette fenêtre n'est pas mise en cache (voir ResponseCache.cached)
+INVALIDATION_MEMORY = 300
+
+def resource_tag(kind, resource_id):
+    """Tag d'une ressource précise : 'work:12', 'workshop:3', 'group:7'"""
+    return f'{kind}:{resource_id}'
+
+class MemoryBackend:
+    """Cache en mémoire du processus : LRU borné avec expiration (TTL) et index par tag"""
+
+    blocking = False  # aucune E/S : appelé directement, même en mode ASGI
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clé -> (expiration, valeur, tags)
+        self._tags = {}                # tag -> ensemble de clés
+        self._invalidated = {}         # tag -> dernière invalidation (monotonic)
+        self._forgotten_before = 0.0   # invalidations plus anciennes oubliées
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def now(self):
+        return time.monotonic()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags, started=None):
+        """Stocke l'entrée, sauf si l'un de ses tags a été invalidé depuis `started`. Retourne True si stockée."""
+        with self._lock:
+            if started is not None and (
+                started <= self._forgotten_before
+                or any(self._invalidated.get(tag, -1.0) >= started for tag in tags)
+            ):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, tags):
+        with self._lock:
+            now = time.monotonic()
+            if len(self._invalidated) >= 4 * self.max_entries:
+                # Mémoire bornée : les lectures en cours à cet instant ne seront pas stockées
+                self._invalidated.clear()
+                self._forgotten_before = now
+            for tag in tags:
+                self._invalidated[tag] = now
+                for key in self._tags.pop(tag, set()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._invalidated.clear()
+            self._forgotten_before = time.monotonic()
+
+    def size(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class RedisBackend:
+    """Cache partagé entre processus (Redis), tags stockés sous forme d'ensembles"""
+
+    blocking = True  # client redis synchrone : appels hors de la boucle en mode ASGI (replica.offload)
+
+    def __init__(self, url, prefix='esme:cache:'):
+        import redis  # dépendance optionnelle, seulement si CACHE_TYPE = 'redis'
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self._prefix = prefix
+        self.evictions = 0
+
+    def now(self):
+        # Horloge du serveur Redis : commune à tous les processus
+        seconds, microseconds = self._client.time()
+        return seconds + microseconds / 1e6
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl, tags, started=None):
+        """Stocke l'entrée, sauf si l'un de ses tags a été invalidé depuis `started`. Retourne True si stockée."""
+        invalidated_keys = [self._prefix + 'inv:' + tag for tag in tags]
+        with self._client.pipeline() as pipe:
+            try:
+                if started is not None:
+                    if started <= self.now() - INVALIDATION_MEMORY:
+                        return False
+                    # Une invalidation concurrente fait échouer EXEC (WATCH)
+                    pipe.watch(*invalidated_keys)
+                    if any(raw is not None and float(raw) >= started for raw in pipe.mget(invalidated_keys)):
+                        pipe.unwatch()
+                        return False
+                pipe.multi()
+                pipe.set(self._prefix + key, json.dumps(value), ex=ttl)
+                for tag in tags:
+                    pipe.sadd(self._prefix + 'tag:' + tag, key)
+                pipe.execute()
+                return True
+            except self._watch_error:
+                return False
+
+    def invalidate(self, tags):
+        # Date d'invalidation écrite avant la suppression des entrées
+        now = self.now()
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.set(self._prefix + 'inv:' + tag, repr(now), ex=INVALIDATION_MEMORY)
+        pipe.execute()
+        for tag in tags:
+            tag_key = self._prefix + 'tag:' + tag
+            keys = self._client.smembers(tag_key)
+            pipe = self._client.pipeline()
+            for key in keys:
+                pipe.delete(self._prefix + key.decode('utf-8'))
+            pipe.delete(tag_key)
+            pipe.execute()
+
+    def clear(self):
+        for key in self._client.scan_iter(self._prefix + '*'):
+            self._client.delete(key)
+
+    def size(self):
+        return sum(
+            1 for key in self._client.scan_iter(self._prefix + '*') if b':tag:' not in key and b':inv:' not in key
+        )
+
+class ResponseCache:
+    """
+    Cache des réponses des endpoints publics en lecture.
+    Les entrées sont indexées par tag et invalidées par les routes d'écriture
+    après commit :
+      - tags de collection ('works', 'groups', ...) : ajout, suppression ou
+        modification changeant la composition ou l'ordre des listes ;
+      - tags de ressource (resource_tag('work', 12)...) ajoutés par la vue avec
+        add_tags pour chaque élément affiché : changement de ses compteurs ;
+      - tags de tri ('works:likes'...) : listes ordonnées par un compteur.
+    Une réponse dont un tag a été invalidé pendant son calcul n'est pas stockée.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = 60
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cache_type = app.config.get('CACHE_TYPE', 'memory')
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+        if cache_type == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+        elif cache_type == 'memory':
+            self.backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+        else:
+            self.backend = None  # cache désactivé
+        app.extensions['response_cache'] = self
+
+    def cached(self, *tags, ttl=None):
+        """Décorateur de vue GET : sert la réponse depuis le cache si elle y est"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Contournement explicite (ex. lecture de ses propres écritures, voir replica.py)
+                if self.backend is None or request.method != 'GET' or g.get('skip_response_cache'):
+                    return view(*args, **kwargs)
+
+                key = self._make_key(kwargs)
+                entry = self._call('get', key)
+                if entry is not None:
+                    self._count('hits')
+                    response = make_response(entry['body'], entry['status'])
+                    response.mimetype = entry['mimetype']
+                    response.headers.update(entry.get('headers', {}))
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self._count('misses')
+                # Date de début de la lecture, comparée aux invalidations au moment de stocker
+                started = self._call('now')
+                g.cache_tags = list(tags)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self._call('set', key, {
+                        'body': response.get_data(as_text=True),
+                        'status': response.status_code,
+                        'mimetype': response.mimetype,
+                        'headers': {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                    }, ttl or self.default_ttl, g.cache_tags, started)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def _call(self, method, *args):
+        # Backend réseau : hors de la boucle d'événements en mode ASGI
+        if self.backend.blocking:
+            return offload(getattr(self.backend, method), *args)
+        return getattr(self.backend, method)(*args)
+
+    def add_tags(self, *tags):
+        """Tags supplémentaires de la réponse en cours de calcul (ressources affichées)"""
+        if 'cache_tags' in g:
+            g.cache_tags.extend(tags)
+
+    def invalidate(self, *tags):
+        """Supprime toutes les entrées portant l'un des tags"""
+        if self.backend is None:
+            return
+        self._count('invalidations')
+        self.backend.invalidate(tags)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        """Compteurs d'utilisation pour dimensionner le cache"""
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'invalidations': invalidations,
+            'evictions': self.backend.evictions if self.backend else 0,
+            'size': self.backend.size() if self.backend else 0
+        }
+
+    @staticmethod
+    def _make_key(view_args):
+        """Clé normalisée : endpoint + arguments d'URL + paramètres non vides triés"""
+        args = sorted(
+            (name, value)
+            for name in request.args
+            for value in request.args.getlist(name)
+            if value != ''
+        )
+        parts = [request.endpoint]
+        parts += [f'{name}={value}' for name, value in sorted(view_args.items())]
+        parts += [f'{name}={value}' for name, value in args]
+        return '|'.join(parts)
+
+cache = ResponseCache()
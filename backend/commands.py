@@ -0,0 +1,102 @@
+import click
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func
+from models import db, LiteraryWork, Comment, literary_work_likes, RATING_VALUES, bayesian_rating
+from search import rebuild_search_index
+from trending import trending
+from feed import feed
+
+def recount_works():
+    """Recalcule les compteurs dénormalisés de toutes les œuvres à partir des tables sources"""
+    likes = select(func.count()).where(
+        literary_work_likes.c.literary_work_id == LiteraryWork.id
+    ).scalar_subquery()
+    comments = select(func.count(Comment.id)).where(
+        Comment.literary_work_id == LiteraryWork.id
+    ).scalar_subquery()
+    rating_sum = select(func.coalesce(func.sum(Comment.rating), 0)).where(
+        Comment.literary_work_id == LiteraryWork.id
+    ).scalar_subquery()
+    rating_count = select(func.count(Comment.rating)).where(
+        Comment.literary_work_id == LiteraryWork.id
+    ).scalar_subquery()
+
+    distribution = {
+        f'rating_{value}_count': select(func.count()).where(
+            Comment.literary_work_id == LiteraryWork.id, Comment.rating == value
+        ).scalar_subquery()
+        for value in RATING_VALUES
+    }
+
+    result = db.session.execute(
+        update(LiteraryWork).values(
+            likes_count=likes,
+            comments_count=comments,
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            **distribution
+        ).execution_options(synchronize_session=False)
+    )
+    # Note lissée depuis les sommes recalculées (et la note a priori configurée)
+    db.session.execute(
+        update(LiteraryWork).values(
+            rating_score=bayesian_rating(LiteraryWork.rating_sum, LiteraryWork.rating_count)
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+def register_commands(app):
+    """Enregistre les commandes de maintenance `flask ...`"""
+
+    @app.cli.command('recount-works')
+    def recount_works_command():
+        """Reconstruit likes_count, comments_count, les sommes et la répartition des notes des œuvres."""
+        updated = recount_works()
+        click.echo(f'{updated} œuvre(s) recalculée(s)')
+
+    @app.cli.command('decay-trending')
+    def decay_trending_command():
+        """Ramène les scores tendance à l'échelle de maintenant (à lancer périodiquement, ex. cron horaire)."""
+        updated = trending.redecay()
+        if updated is None:
+            click.echo('Re-décroissance déjà faite par un autre processus')
+        else:
+            click.echo(f'{updated} score(s) tendance mis à jour')
+
+    @app.cli.command('rebuild-trending')
+    def rebuild_trending_command():
+        """Recalcule les scores tendance depuis les compteurs (initialisation d'une base existante)."""
+        updated = trending.rebuild()
+        click.echo(f'{updated} œuvre(s) recalculée(s)')
+
+    @app.cli.command('rebuild-feed')
+    @click.option('--days', type=int, default=30, help='Ancienneté maximale des œuvres rediffusées')
+    def rebuild_feed_command(days):
+        """Remplit les fils d'actualité avec les œuvres publiées récemment (initialisation)."""
+        works, entries = feed.rebuild(since=datetime.utcnow() - timedelta(days=days))
+        click.echo(f'{works} œuvre(s) diffusée(s), {entries} entrée(s) de fil ajoutée(s)')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Reconstruit l'index plein texte des œuvres."""
+        rebuild_search_index(app.config['SEARCH_LANGUAGE'])
+        click.echo('Index de recherche reconstruit')
+
+    @app.cli.command('sync-replica')
+    def sync_replica_command():
+        """Copie la base SQLite principale vers le réplica (test local du routage des lectures)."""
+        replica = db.engines.get('replica')
+        if replica is None:
+            raise click.ClickException('Aucun réplica configuré (READ_REPLICA_URL)')
+        primary = db.engines[None]
+        if primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+            raise click.ClickException('Réservé à SQLite : utiliser la réplication native de PostgreSQL')
+        source = primary.raw_connection()
+        target = replica.raw_connection()
+        try:
+            source.driver_connection.backup(target.driver_connection)
+        finally:
+            source.close()
+            target.close()
+        click.echo('Réplica synchronisé')
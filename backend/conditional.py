@@ -0,0 +1,43 @@
+import hashlib
+from datetime import datetime
+from flask import request, make_response
+
+# Requêtes conditionnelles (If-None-Match / If-Modified-Since) sur les pages de détail :
+# les validateurs sont calculés à partir d'une requête légère sur les colonnes de
+# version, avant de charger la ressource complète.
+
+def make_etag(*parts):
+    """ETag fort calculé à partir des marqueurs de version de la ressource"""
+    raw = '|'.join(
+        part.isoformat() if isinstance(part, datetime) else str(part)
+        for part in parts
+    )
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def last_modified_of(*timestamps):
+    """Date de dernière modification à la seconde (précision des en-têtes HTTP)"""
+    timestamps = [timestamp for timestamp in timestamps if timestamp]
+    if not timestamps:
+        return None
+    return max(timestamps).replace(microsecond=0)
+
+def not_modified(etag, last_modified):
+    """Retourne une réponse 304 si le client possède déjà cette version, sinon None"""
+    # If-None-Match est prioritaire sur If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        if request.if_none_match.star_tag or request.if_none_match.contains(etag):
+            return with_validators(make_response('', 304), etag, last_modified)
+        return None
+
+    if_modified_since = request.if_modified_since
+    if if_modified_since and last_modified and last_modified <= if_modified_since.replace(tzinfo=None):
+        return with_validators(make_response('', 304), etag, last_modified)
+    return None
+
+def with_validators(response, etag, last_modified):
+    """Ajoute ETag, Last-Modified et impose la revalidation par le client"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
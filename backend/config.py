@@ -4,4 +4,96 @@ import secrets
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///esme_litteraire.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Réplica en lecture optionnel : les endpoints marqués @read_replica y lisent,
+    # sauf pour un client ayant écrit depuis moins de READ_REPLICA_STICKY_SECONDS
+    # (fenêtre portée par le client via l'en-tête X-Read-Primary-Until)
+    READ_REPLICA_URL = os.getenv('READ_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': READ_REPLICA_URL} if READ_REPLICA_URL else {}
+    READ_REPLICA_STICKY_SECONDS = int(os.getenv('READ_REPLICA_STICKY_SECONDS', 5))
+    # Endpoints à garder sur la base principale, ex. "literary_works.get_literary_work,groups.get_group"
+    READ_REPLICA_DISABLED_ENDPOINTS = [
+        endpoint.strip() for endpoint in os.getenv('READ_REPLICA_DISABLED_ENDPOINTS', '').split(',') if endpoint.strip()
+    ]
+
     SECRET_KEY = os.getenv('SECRET_KEY', 'esme-litteraire-secret-key-2025-dev-mode-only')
+
+    # Cache des réponses publiques : 'memory' (par processus), 'redis' (partagé) ou 'none'
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'memory')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+
+    # Limite de publication par auteur sur 7 jours glissants, et durée de vie
+    # du décompte mis en cache par processus (secondes)
+    PUBLICATION_LIMIT = int(os.getenv('PUBLICATION_LIMIT', 2))
+    PUBLICATION_QUOTA_CACHE_TTL = int(os.getenv('PUBLICATION_QUOTA_CACHE_TTL', 60))
+
+    # Configuration linguistique de la recherche plein texte (PostgreSQL)
+    SEARCH_LANGUAGE = os.getenv('SEARCH_LANGUAGE', 'french')
+
+    # Instrumentation des requêtes (/api/metrics) et en-tête Server-Timing
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'true').lower() == 'true'
+
+    # Mode ASGI (asgi.py) : endpoints servis avec le moteur SQLAlchemy asynchrone.
+    # Expérimental, refusé au démarrage tant que ASGI_ENABLED n'est pas activé :
+    # aucune mesure sur PostgreSQL ne montre encore de gain (voir asgi.py)
+    ASGI_ENABLED = os.getenv('ASGI_ENABLED', '0') == '1'
+    ASYNC_ENDPOINTS = [
+        endpoint.strip() for endpoint in os.getenv('ASYNC_ENDPOINTS', ','.join([
+            'literary_works.get_literary_works', 'literary_works.get_literary_work',
+            'literary_works.search_literary_works', 'groups.get_groups', 'groups.get_group',
+            'groups.get_group_members', 'groups.get_group_works',
+            'workshops.get_workshops', 'workshops.get_workshop',
+            'workshops.get_workshop_participants', 'workshops.get_workshop_works'
+        ])).split(',') if endpoint.strip()
+    ]
+    ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', 20))
+    ASYNC_MAX_OVERFLOW = int(os.getenv('ASYNC_MAX_OVERFLOW', 20))
+
+    # Hachage des mots de passe : méthode werkzeug ('scrypt', 'pbkdf2:sha256:600000'...),
+    # pool de processus dédié (0 = dans le processus de la requête) et file d'attente bornée
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Cache des utilisateurs courants entre requêtes (secondes, entrées par processus)
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 30))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+
+    # Cache des tests d'appartenance groupe / atelier (secondes, 0 pour désactiver ;
+    # invalidé localement à l'ajout/retrait, la durée borne le délai entre processus)
+    MEMBERSHIP_CACHE_TTL = int(os.getenv('MEMBERSHIP_CACHE_TTL', 30))
+    MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.getenv('MEMBERSHIP_CACHE_MAX_ENTRIES', 100000))
+
+    # Classement tendance : demi-vie des événements, intervalle de re-décroissance en
+    # secondes (0 = pas de fil en arrière-plan, lancer `flask decay-trending` par cron)
+    TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 24))
+    TRENDING_DECAY_INTERVAL = int(os.getenv('TRENDING_DECAY_INTERVAL', 0))
+
+    # Fil d'actualité : threads de diffusion des publications (0 = dans la requête)
+    # et nombre de destinataires au-delà duquel un groupe / atelier / auteur est lu à la demande
+    FEED_FANOUT_WORKERS = int(os.getenv('FEED_FANOUT_WORKERS', 2))
+    FEED_FANOUT_MAX_RECIPIENTS = int(os.getenv('FEED_FANOUT_MAX_RECIPIENTS', 5000))
+
+    # Tri par note (sort_by=rating) : moyenne bayésienne, la note a priori compte pour
+    # RATING_PRIOR_WEIGHT notes (relancer `flask recount-works` après un changement)
+    RATING_PRIOR_MEAN = float(os.getenv('RATING_PRIOR_MEAN', 3.0))
+    RATING_PRIOR_WEIGHT = int(os.getenv('RATING_PRIOR_WEIGHT', 5))
+
+    # Réponses JSON (orjson) : texte non ASCII en UTF-8 par défaut ; 1 = octets identiques
+    # au module json (\uXXXX, flottants repr()), au prix d'un repli plus lent sur le texte accentué
+    JSON_ENSURE_ASCII = os.getenv('JSON_ENSURE_ASCII', '0') == '1'
+
+    # Export NDJSON (/api/export/<entité>.ndjson) : lignes lues par lot sur un curseur
+    # côté serveur, et niveau de compression gzip (si le client accepte gzip)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', 6))
+
+    # Imports en masse (/api/books/bulk, /api/literary-works/bulk) : lignes validées et
+    # insérées par lot (un commit par lot), nombre maximal d'erreurs détaillées dans la réponse
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', 100))
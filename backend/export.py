@@ -0,0 +1,67 @@
+import zlib
+from sqlalchemy import select, or_
+from models import db, LiteraryWork, Comment, literary_work_likes
+from serializers import dumps_compact
+
+# Export NDJSON des tables (une ligne JSON par enregistrement) pour l'analyse.
+# Les lignes sont lues par lots de batch_size sur un curseur côté serveur
+# (yield_per / stream_results) et écrites au fil de l'eau : la mémoire utilisée
+# ne dépend pas de la taille de la table. Parcours dans l'ordre de la clé
+# primaire, sans tri ; updated_since restreint aux lignes créées ou modifiées
+# depuis cette date (exports incrémentaux).
+
+def _works_since(since):
+    # updated_at : édition de l'œuvre ; changed_at : likes, commentaires, notes
+    return or_(LiteraryWork.updated_at >= since, LiteraryWork.changed_at >= since)
+
+# entité -> (colonnes exportées, clé de parcours, filtre « modifié depuis »)
+EXPORTS = {
+    'works': (
+        [
+            LiteraryWork.id, LiteraryWork.title, LiteraryWork.content, LiteraryWork.type,
+            LiteraryWork.status, LiteraryWork.created_at, LiteraryWork.updated_at, LiteraryWork.changed_at,
+            LiteraryWork.author_id, LiteraryWork.workshop_id, LiteraryWork.group_id, LiteraryWork.book_id,
+            LiteraryWork.likes_count, LiteraryWork.comments_count,
+            LiteraryWork.rating_sum, LiteraryWork.rating_count
+        ],
+        [LiteraryWork.id],
+        _works_since
+    ),
+    'comments': (
+        [Comment.id, Comment.literary_work_id, Comment.user_id, Comment.content, Comment.rating, Comment.created_at],
+        [Comment.id],
+        lambda since: Comment.created_at >= since
+    ),
+    # Les likes retirés ne laissent pas de trace : un export complet les reflète
+    'likes': (
+        [literary_work_likes.c.user_id, literary_work_likes.c.literary_work_id, literary_work_likes.c.created_at],
+        [literary_work_likes.c.user_id, literary_work_likes.c.literary_work_id],
+        lambda since: literary_work_likes.c.created_at >= since
+    ),
+}
+
+def export_query(entity, updated_since=None):
+    columns, order_by, since_filter = EXPORTS[entity]
+    query = select(*columns).order_by(*order_by)
+    if updated_since is not None:
+        query = query.where(since_filter(updated_since))
+    return query
+
+def ndjson_stream(entity, updated_since=None, batch_size=1000):
+    """Générateur de blocs NDJSON (un bloc d'octets par lot de lignes)"""
+    result = db.session.execute(export_query(entity, updated_since).execution_options(yield_per=batch_size))
+    try:
+        for rows in result.mappings().partitions():
+            yield b''.join(dumps_compact(dict(row)) + b'\n' for row in rows)
+    finally:
+        # Flux interrompu (client déconnecté) : libère le curseur côté serveur
+        result.close()
+
+def gzip_stream(chunks, level=6):
+    """Compresse au vol un flux de blocs d'octets au format gzip"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,227 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, union, tuple_
+from sqlalchemy.orm import contains_eager, joinedload, defer
+from models import db, LiteraryWork, User, Group, Workshop, feed_entries, insert_ignore
+from memberships import MEMBERSHIP_TABLES
+from pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Fil d'actualité : œuvres publiées dans les groupes / ateliers du lecteur et
+# œuvres des auteurs qu'il suit, des plus récentes aux plus anciennes.
+# À la publication, l'œuvre est recopiée (en arrière-plan) dans la table
+# feed_entries de chaque destinataire ; la lecture est alors un parcours d'index
+# (user_id, created_at, id). Au-delà de max_recipients destinataires, le
+# conteneur est marqué fanout_on_read et ses œuvres sont lues à la demande, dans
+# la même requête SQL que le fil.
+
+# type de source -> (colonne de l'œuvre, modèle du conteneur) ; les destinataires
+# sont lus dans MEMBERSHIP_TABLES (membres, participants, abonnés)
+FEED_SOURCES = {
+    'group': (LiteraryWork.group_id, Group),
+    'workshop': (LiteraryWork.workshop_id, Workshop),
+    'author': (LiteraryWork.author_id, User),
+}
+
+# Clé de tri du fil (et du curseur)
+FEED_SORT_COLUMNS = [LiteraryWork.created_at, LiteraryWork.id]
+
+class Feed:
+    """
+    Diffusion des publications dans les fils (fan-out à l'écriture) dans un pool
+    de threads ; avec workers=0, la diffusion se fait dans la requête, après le
+    commit de l'œuvre.
+    """
+
+    def __init__(self):
+        self.workers = 0
+        self.max_recipients = 5000
+        self._app = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.workers = app.config.get('FEED_FANOUT_WORKERS', 0)
+        self.max_recipients = app.config.get('FEED_FANOUT_MAX_RECIPIENTS', 5000)
+        self._app = app
+        app.extensions['feed'] = self
+
+    def publish(self, work_id):
+        """À appeler après le commit d'une œuvre publiée (création, publication, déplacement)"""
+        if not self.workers:
+            self._deliver(work_id)
+            return
+        self._get_executor().submit(self._run, work_id)
+
+    def fan_out(self, work_id):
+        """
+        Recopie une œuvre publiée dans les fils des membres de son groupe, des
+        participants de son atelier et des abonnés de son auteur (sans commit).
+        Les œuvres d'un groupe privé ne sont pas diffusées aux abonnés non membres.
+        Retourne le nombre de lignes insérées.
+        """
+        work = db.session.query(
+            LiteraryWork.id, LiteraryWork.status, LiteraryWork.created_at, LiteraryWork.author_id,
+            LiteraryWork.group_id, LiteraryWork.workshop_id, Group.is_private
+        ).outerjoin(Group, Group.id == LiteraryWork.group_id).filter(LiteraryWork.id == work_id).first()
+        if work is None or work.status != 'published':
+            return 0
+
+        sources = [('group', work.group_id), ('workshop', work.workshop_id)]
+        if not work.is_private:
+            sources.append(('author', work.author_id))
+
+        inserted = 0
+        for kind, container_id in sources:
+            if not container_id or self._fanout_on_read(kind, container_id):
+                continue
+            table, container_column = MEMBERSHIP_TABLES[kind]
+            # INSERT ... SELECT : une requête par source, doublons (plusieurs sources) ignorés
+            recipients = select(
+                table.c.user_id,
+                db.literal(work.id, db.Integer),
+                db.literal(work.created_at, db.DateTime)
+            ).where(container_column == container_id, table.c.user_id != work.author_id)
+            result = db.session.execute(insert_ignore(feed_entries).from_select(
+                ['user_id', 'literary_work_id', 'created_at'], recipients
+            ))
+            inserted += max(result.rowcount, 0)
+        return inserted
+
+    def page(self, user_id, limit, cursor=None):
+        """
+        Page du fil d'un lecteur, en une requête : fil matérialisé et œuvres des
+        conteneurs lus à la demande, fusionnés par UNION puis triés par clé.
+        Retourne (œuvres, curseur suivant).
+        """
+        after = decode_cursor(cursor, FEED_SORT_COLUMNS) if cursor else None
+
+        timeline = select(
+            feed_entries.c.created_at.label('created_at'), feed_entries.c.literary_work_id.label('id')
+        ).join(LiteraryWork, LiteraryWork.id == feed_entries.c.literary_work_id).where(
+            feed_entries.c.user_id == user_id, LiteraryWork.status == 'published'
+        )
+        branches = [_bounded(timeline, [feed_entries.c.created_at, feed_entries.c.literary_work_id], after, limit)]
+
+        for kind, (work_column, model) in FEED_SOURCES.items():
+            table, container_column = MEMBERSHIP_TABLES[kind]
+            # Partir des conteneurs du lecteur (clé primaire user_id, ...) puis de l'index
+            # (conteneur, created_at, id) : aucun coût sans conteneur lu à la demande.
+            # Le statut est comparé sous forme d'expression (status || '') pour que le
+            # planificateur n'y préfère pas l'index (status, created_at, id), qui parcourrait
+            # toutes les œuvres publiées quand le lecteur n'a aucun conteneur de ce type.
+            containers = select(container_column.label('id')).join(model, model.id == container_column).where(
+                table.c.user_id == user_id, model.fanout_on_read
+            ).subquery()
+            query = select(LiteraryWork.created_at, LiteraryWork.id).select_from(containers).join(
+                LiteraryWork, work_column == containers.c.id
+            ).where((LiteraryWork.status + '') == 'published', LiteraryWork.author_id != user_id)
+            if kind == 'author':
+                query = query.where(db.or_(
+                    LiteraryWork.group_id.is_(None),
+                    LiteraryWork.group_id.not_in(select(Group.id).where(Group.is_private))
+                ))
+            branches.append(_bounded(query, FEED_SORT_COLUMNS, after, limit))
+
+        merged = union(*branches).subquery()
+        works = LiteraryWork.query.join(merged, LiteraryWork.id == merged.c.id).join(
+            User, LiteraryWork.author_id == User.id
+        ).options(
+            defer(LiteraryWork.content),
+            contains_eager(LiteraryWork.author).load_only(User.id, User.username, User.profile_picture),
+            joinedload(LiteraryWork.book)
+        ).order_by(merged.c.created_at.desc(), merged.c.id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(works) > limit:
+            works = works[:limit]
+            next_cursor = encode_cursor([works[-1].created_at, works[-1].id])
+        return works, next_cursor
+
+    def forget(self, kind, container_id, user_id):
+        """
+        Retire du fil d'un lecteur les œuvres d'un conteneur quitté, sauf celles qui
+        lui parviennent encore par une autre source (à appeler après le retrait, sans commit)
+        """
+        still_reachable = []
+        for other_kind, (other_work_column, _) in FEED_SOURCES.items():
+            table, container_column = MEMBERSHIP_TABLES[other_kind]
+            still_reachable.append(db.and_(
+                other_work_column.isnot(None),
+                other_work_column.in_(select(container_column).where(table.c.user_id == user_id))
+            ))
+        work_column = FEED_SOURCES[kind][0]
+        forgotten = select(LiteraryWork.id).where(work_column == container_id, ~db.or_(*still_reachable))
+        db.session.execute(feed_entries.delete().where(
+            feed_entries.c.user_id == user_id, feed_entries.c.literary_work_id.in_(forgotten)
+        ))
+
+    def remove_work(self, work_id):
+        """Efface une œuvre de tous les fils (avant sa suppression, sans commit)"""
+        db.session.execute(feed_entries.delete().where(feed_entries.c.literary_work_id == work_id))
+
+    def remove_container_works(self, kind, container_id):
+        """Efface des fils les œuvres d'un conteneur supprimé avec elles (sans commit)"""
+        work_column = FEED_SOURCES[kind][0]
+        db.session.execute(feed_entries.delete().where(
+            feed_entries.c.literary_work_id.in_(select(LiteraryWork.id).where(work_column == container_id))
+        ))
+
+    def rebuild(self, since=None, batch_size=500):
+        """Rediffuse les œuvres publiées (depuis `since`) : initialisation d'une base existante"""
+        query = db.session.query(LiteraryWork.id).filter(LiteraryWork.status == 'published')
+        if since is not None:
+            query = query.filter(LiteraryWork.created_at >= since)
+        work_ids = [row[0] for row in query.order_by(LiteraryWork.id)]
+        inserted = 0
+        for start in range(0, len(work_ids), batch_size):
+            for work_id in work_ids[start:start + batch_size]:
+                inserted += self.fan_out(work_id)
+            db.session.commit()
+        return len(work_ids), inserted
+
+    def _fanout_on_read(self, kind, container_id):
+        """Vrai si le conteneur est lu à la demande ; le marque s'il dépasse max_recipients"""
+        model = FEED_SOURCES[kind][1]
+        if db.session.query(model.fanout_on_read).filter(model.id == container_id).scalar():
+            return True
+        table, container_column = MEMBERSHIP_TABLES[kind]
+        # Décompte borné : inutile de compter les 50 000 membres d'un grand groupe
+        recipients = select(table.c.user_id).where(container_column == container_id).limit(self.max_recipients + 1)
+        if db.session.query(db.func.count()).select_from(recipients.subquery()).scalar() <= self.max_recipients:
+            return False
+        db.session.query(model).filter(model.id == container_id).update(
+            {model.fanout_on_read: True}, synchronize_session=False
+        )
+        return True
+
+    def _deliver(self, work_id):
+        try:
+            self.fan_out(work_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Diffusion de l'œuvre %s dans les fils échouée", work_id)
+
+    def _run(self, work_id):
+        with self._app.app_context():
+            try:
+                self._deliver(work_id)
+            finally:
+                db.session.remove()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='feed-fanout')
+            return self._executor
+
+def _bounded(query, columns, after, limit):
+    """Branche de l'UNION : reprise après le curseur et limit + 1 lignes, dans l'ordre de l'index"""
+    if after is not None:
+        query = query.where(tuple_(*columns) < tuple_(*after))
+    return select(query.order_by(*[column.desc() for column in columns]).limit(limit + 1).subquery())
+
+feed = Feed()
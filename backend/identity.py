@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from models import db, User
+
+# Utilisateur courant des routes protégées. Le rôle est lu dans les claims du JWT
+# (posé à la connexion) : pas de requête pour un simple contrôle admin. Un
+# changement de rôle prend effet avec le prochain jeton.
+
+Identity = namedtuple('Identity', 'id username role profile_picture')
+
+class IdentityCache:
+    """Instantanés d'utilisateurs partagés entre requêtes : LRU borné avec expiration"""
+
+    def __init__(self, ttl=30, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id -> (chargé le (monotonic), Identity)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', 30)
+        self.max_entries = app.config.get('IDENTITY_CACHE_MAX_ENTRIES', 10000)
+        app.extensions['identity_cache'] = self
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def store(self, identity):
+        with self._lock:
+            self._entries[identity.id] = (time.monotonic(), identity)
+            self._entries.move_to_end(identity.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """À appeler après une modification du profil ou du rôle"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+identity_cache = IdentityCache()
+
+def current_user_id():
+    return int(get_jwt_identity())
+
+def current_role():
+    return get_jwt().get('role')
+
+def is_admin():
+    return current_role() == 'admin'
+
+def current_identity():
+    """Instantané de l'utilisateur courant (requête, puis cache, puis base) ; None s'il n'existe plus"""
+    if 'current_identity' in g:
+        return g.current_identity
+    user_id = current_user_id()
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        row = db.session.query(
+            User.id, User.username, User.role, User.profile_picture
+        ).filter(User.id == user_id).first()
+        if row is not None:
+            identity = Identity(*row)
+            identity_cache.store(identity)
+    g.current_identity = identity
+    return identity
+
+def current_user():
+    """Instance ORM de l'utilisateur courant, chargée une fois par requête (relations, modifications)"""
+    if 'current_user' not in g:
+        g.current_user = db.session.get(User, current_user_id())
+    return g.current_user
@@ -0,0 +1,223 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from flask import request
+from sqlalchemy import insert, select
+from models import db, Book, LiteraryWork, Workshop, Group
+from quota import publication_quota
+from trending import trending
+from feed import feed
+
+# Imports en masse de livres et d'œuvres. Le corps est un tableau JSON, ou un
+# flux NDJSON / CSV lu ligne à ligne. Les enregistrements sont validés par lots
+# de batch_size, chaque lot valide est inséré en un seul executemany (INSERT
+# multi-lignes) puis validé par un commit : une ligne invalide est signalée avec
+# son numéro sans bloquer les autres.
+
+# Types de contenu acceptés
+IMPORT_MIMETYPES = ('application/json', 'application/x-ndjson', 'application/jsonl', 'text/csv')
+
+WORK_STATUSES = ('draft', 'published', 'archived')
+
+# Références optionnelles d'une œuvre, vérifiées par lot (une requête par modèle)
+WORK_REFERENCES = (('workshop_id', Workshop), ('group_id', Group), ('book_id', Book))
+
+class ImportFormatError(ValueError):
+    """Corps illisible dans son ensemble (tableau JSON invalide, CSV mal formé, encodage)"""
+
+class ImportReport:
+    """Bilan d'un import : lignes insérées et erreurs par ligne (les max_errors premières)"""
+
+    def __init__(self, max_errors=100):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'error': message})
+
+    def to_dict(self):
+        return {'inserted': self.inserted, 'failed': self.failed, 'errors': self.errors}
+
+def read_records():
+    """
+    Enregistrements du corps de la requête courante : itérable de (numéro de
+    ligne à partir de 1, dict ou None si la ligne est illisible)
+    """
+    if request.mimetype == 'application/json':
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise ImportFormatError('Un tableau JSON est attendu')
+        return enumerate(data, 1)
+    if request.mimetype == 'text/csv':
+        return _csv_records()
+    return _ndjson_records()
+
+def _lines():
+    # Lecture en flux du corps, sans le charger entièrement en mémoire
+    try:
+        for line in request.stream:
+            yield line.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ImportFormatError('Le contenu doit être encodé en UTF-8')
+
+def _ndjson_records():
+    row = 0
+    for line in _lines():
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError:
+            yield row, None
+
+def _csv_records():
+    try:
+        # Cellules vides lues comme des valeurs absentes
+        for row, record in enumerate(csv.DictReader(_lines()), 1):
+            yield row, {key: value or None for key, value in record.items() if key is not None}
+    except csv.Error as error:
+        raise ImportFormatError(f'CSV invalide : {error}')
+
+def chunked(records, size):
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _is_text(value, max_length):
+    return isinstance(value, str) and value.strip() != '' and len(value) <= max_length
+
+def _optional_id(value):
+    """Identifiant optionnel (entier, ou chaîne de chiffres en CSV) ; ValueError sinon"""
+    if value is None:
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(value)
+
+# --- Livres -------------------------------------------------------------------
+
+def validate_book(record):
+    """Valeurs d'insertion d'un livre, ou message d'erreur (mêmes règles que POST /books)"""
+    if not isinstance(record, dict):
+        return None, 'Invalid row, expected an object'
+    if not _is_text(record.get('title'), 100) or not _is_text(record.get('author'), 100):
+        return None, 'Invalid data, title and author are required (100 characters max)'
+
+    published_at = record.get('published_at')
+    if published_at is not None:
+        try:
+            published_at = datetime.strptime(published_at, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return None, 'Invalid date format, expected YYYY-MM-DD'
+    return {'title': record['title'], 'author': record['author'], 'published_at': published_at}, None
+
+def import_books(records, report, batch_size=1000):
+    for chunk in chunked(records, batch_size):
+        rows = []
+        for row, record in chunk:
+            values, error = validate_book(record)
+            if error:
+                report.error(row, error)
+            else:
+                rows.append(values)
+        if rows:
+            db.session.execute(insert(Book), rows)
+            db.session.commit()
+            report.inserted += len(rows)
+
+# --- Œuvres ------------------------------------------------------------------
+
+def validate_work(record):
+    """Valeurs d'insertion d'une œuvre, ou message d'erreur (mêmes champs que POST /literary-works)"""
+    if not isinstance(record, dict):
+        return None, 'Ligne invalide, un objet est attendu'
+    if not all(record.get(key) for key in ('title', 'content', 'type')):
+        return None, 'Tous les champs requis doivent être remplis'
+    if not _is_text(record['title'], 100) or not _is_text(record['type'], 50) or not isinstance(record['content'], str):
+        return None, 'Titre (100 caractères max), contenu et type (50 caractères max) doivent être du texte'
+
+    status = record.get('status') or 'draft'
+    if status not in WORK_STATUSES:
+        return None, f'Statut invalide, valeurs possibles : {", ".join(WORK_STATUSES)}'
+
+    values = {'title': record['title'], 'content': record['content'], 'type': record['type'], 'status': status}
+    for key, _ in WORK_REFERENCES:
+        try:
+            values[key] = _optional_id(record.get(key))
+        except ValueError:
+            return None, f'{key} doit être un entier'
+    return values, None
+
+def _check_references(candidates, report):
+    """Écarte les lignes qui désignent un atelier, un groupe ou un livre inexistant"""
+    missing = {}
+    for key, model in WORK_REFERENCES:
+        ids = {values[key] for _, values in candidates if values[key] is not None}
+        if ids:
+            existing = set(db.session.scalars(select(model.id).where(model.id.in_(ids))))
+            missing[key] = ids - existing
+
+    valid = []
+    for row, values in candidates:
+        unknown = [key for key, ids in missing.items() if values[key] in ids]
+        if unknown:
+            report.error(row, f'Référence inexistante : {", ".join(unknown)}')
+        else:
+            valid.append((row, values))
+    return valid
+
+def import_works(records, author_id, report, batch_size=1000):
+    """
+    Importe des œuvres de l'auteur donné. Le quota de publication est vérifié à
+    chaque lot, auteur verrouillé jusqu'au commit comme pour une création
+    unitaire : les lignes au-delà du quota sont rejetées.
+    """
+    for chunk in chunked(records, batch_size):
+        candidates = []
+        for row, record in chunk:
+            values, error = validate_work(record)
+            if error:
+                report.error(row, error)
+            else:
+                candidates.append((row, values))
+        candidates = _check_references(candidates, report)
+        if not candidates:
+            continue
+
+        usage = publication_quota.reserve(author_id)
+        accepted = candidates[:usage.remaining]
+        for row, _ in candidates[len(accepted):]:
+            report.error(row, f'Limite de {usage.limit} publications par semaine atteinte')
+        if not accepted:
+            db.session.rollback()
+            continue
+
+        now = datetime.utcnow()
+        # Epoch lue dans la transaction du lot (une re-décroissance a pu avoir lieu entre deux lots)
+        publication_points = trending.delta(trending.points(publication=True), at=now)
+        rows = [dict(
+            values, author_id=author_id, created_at=now, updated_at=now, changed_at=now,
+            hot_score=publication_points if values['status'] == 'published' else 0,
+            first_published_at=now if values['status'] == 'published' else None
+        ) for _, values in accepted]
+        work_ids = db.session.scalars(
+            insert(LiteraryWork).returning(LiteraryWork.id, sort_by_parameter_order=True), rows
+        ).all()
+        # Les pages des ateliers / groupes listent leurs œuvres
+        Workshop.bump_version(*(values['workshop_id'] for values in rows))
+        Group.bump_version(*(values['group_id'] for values in rows))
+        db.session.commit()
+        report.inserted += len(work_ids)
+
+        for work_id, values in zip(work_ids, rows):
+            publication_quota.record(author_id, now)
+            if values['status'] == 'published':
+                feed.publish(work_id)
@@ -0,0 +1,83 @@
+from datetime import datetime
+from models import db, LiteraryWork, literary_work_likes, insert_ignore
+from trending import trending
+
+# Likes écrits directement dans la table d'association, sans charger la
+# collection `work.likes` : coût constant quel que soit le nombre de likes.
+
+def add_like(user_id, work_id):
+    """Ajoute le like s'il n'existe pas encore. Retourne True si une ligne a été insérée."""
+    # Même date pour la ligne et le poids ajouté : remove_like retire exactement ce poids
+    now = datetime.utcnow()
+    result = db.session.execute(
+        insert_ignore(literary_work_likes).values(user_id=user_id, literary_work_id=work_id, created_at=now)
+    )
+    inserted = result.rowcount == 1
+    if inserted:
+        LiteraryWork.adjust_counters(work_id, likes_count=1, hot_score=trending.delta(trending.points(likes=1), at=now))
+    return inserted
+
+def remove_like(user_id, work_id):
+    """Retire le like s'il existe. Retourne True si une ligne a été supprimée."""
+    condition = db.and_(
+        literary_work_likes.c.user_id == user_id,
+        literary_work_likes.c.literary_work_id == work_id
+    )
+    liked_at = db.session.execute(db.select(literary_work_likes.c.created_at).where(condition)).scalar()
+    result = db.session.execute(literary_work_likes.delete().where(condition))
+    deleted = result.rowcount == 1
+    if deleted:
+        # Retirer le poids ajouté au moment du like, pas celui qu'il aurait maintenant.
+        # Like sans date (antérieur à la colonne) : poids à l'epoch, majorant de ce qu'il
+        # vaut encore puisqu'il a été ramené à cette échelle par la re-décroissance
+        hot_score = trending.delta(trending.points(likes=-1), at=liked_at or trending.epoch())
+        LiteraryWork.adjust_counters(work_id, likes_count=-1, hot_score=hot_score)
+    return deleted
+
+def set_likes(user_id, wanted):
+    """
+    Applique plusieurs likes / unlikes ({work_id: liked}) en un nombre fixe de requêtes :
+    une insertion et une suppression groupées, puis un seul UPDATE des compteurs.
+    Retourne l'ensemble des œuvres dont l'état a changé.
+    """
+    if not wanted:
+        return set()
+    to_like = [work_id for work_id, liked in wanted.items() if liked]
+    to_unlike = [work_id for work_id, liked in wanted.items() if not liked]
+    # Epoch lue une fois (verrou partagé) pour tous les poids du lot
+    epoch = trending.epoch()
+    now = datetime.utcnow()
+    deltas = {}
+
+    if to_like:
+        # RETURNING : seules les lignes réellement insérées (les doublons sont ignorés)
+        liked_ids = db.session.scalars(
+            insert_ignore(literary_work_likes).values([
+                {'user_id': user_id, 'literary_work_id': work_id, 'created_at': now} for work_id in to_like
+            ]).returning(literary_work_likes.c.literary_work_id)
+        ).all()
+        weight = trending.delta(trending.points(likes=1), at=now, epoch=epoch)
+        for work_id in liked_ids:
+            deltas[work_id] = {'likes_count': 1, 'hot_score': weight}
+
+    if to_unlike:
+        removed = db.session.execute(
+            literary_work_likes.delete().where(
+                literary_work_likes.c.user_id == user_id,
+                literary_work_likes.c.literary_work_id.in_(to_unlike)
+            ).returning(literary_work_likes.c.literary_work_id, literary_work_likes.c.created_at)
+        ).all()
+        # Même règle que remove_like : poids ajouté à la date du like (l'epoch si elle manque)
+        for work_id, liked_at in removed:
+            deltas[work_id] = {
+                'likes_count': -1,
+                'hot_score': trending.delta(trending.points(likes=-1), at=liked_at or epoch, epoch=epoch)
+            }
+
+    LiteraryWork.adjust_counters_many(deltas)
+    return set(deltas)
+
+def get_likes_counts(work_ids):
+    """Compteurs de likes courants pour un ensemble d'œuvres, en une requête"""
+    rows = db.session.query(LiteraryWork.id, LiteraryWork.likes_count).filter(LiteraryWork.id.in_(work_ids)).all()
+    return dict(rows)
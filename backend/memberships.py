@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from models import db, group_members, workshop_participants, author_followers, insert_ignore
+
+# Appartenance aux groupes, participation aux ateliers et abonnements aux auteurs,
+# lues et écrites directement sur les tables d'association : on ne charge jamais la
+# collection group.members (50 000 membres pour un grand groupe) pour tester ou
+# modifier une seule ligne.
+
+# type de conteneur -> (table d'association, colonne du conteneur) ; pour 'author',
+# le conteneur est l'auteur suivi et user_id l'abonné
+MEMBERSHIP_TABLES = {
+    'group': (group_members, group_members.c.group_id),
+    'workshop': (workshop_participants, workshop_participants.c.workshop_id),
+    'author': (author_followers, author_followers.c.author_id),
+}
+
+class Memberships:
+    """
+    Tests d'appartenance par requête EXISTS sur la clé primaire, avec un cache
+    optionnel par processus (LRU borné avec expiration). Les entrées sont
+    invalidées après l'ajout ou le retrait ; entre processus, la durée de vie
+    borne le délai de prise en compte. ttl=0 désactive le cache.
+    """
+
+    def __init__(self, ttl=0, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (type, conteneur, utilisateur) -> (lu le (monotonic), booléen)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('MEMBERSHIP_CACHE_TTL', 0)
+        self.max_entries = app.config.get('MEMBERSHIP_CACHE_MAX_ENTRIES', 100000)
+        self.clear()
+        app.extensions['memberships'] = self
+
+    def is_member(self, kind, container_id, user_id):
+        key = (kind, container_id, user_id)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        table, container_column = MEMBERSHIP_TABLES[kind]
+        member = db.session.query(db.exists().where(
+            container_column == container_id, table.c.user_id == user_id
+        )).scalar()
+        self._store(key, member)
+        return member
+
+    def add(self, kind, container_id, user_id):
+        """INSERT direct (doublon ignoré). Retourne True si la ligne a été insérée."""
+        table, container_column = MEMBERSHIP_TABLES[kind]
+        result = db.session.execute(
+            insert_ignore(table).values({table.c.user_id: user_id, container_column: container_id})
+        )
+        return result.rowcount == 1
+
+    def remove(self, kind, container_id, user_id):
+        """DELETE direct. Retourne True si une ligne a été supprimée."""
+        table, container_column = MEMBERSHIP_TABLES[kind]
+        result = db.session.execute(
+            table.delete().where(container_column == container_id, table.c.user_id == user_id)
+        )
+        return result.rowcount == 1
+
+    def remove_all(self, kind, container_id):
+        """Efface toutes les lignes d'un conteneur en une requête (avant sa suppression)"""
+        table, container_column = MEMBERSHIP_TABLES[kind]
+        db.session.execute(table.delete().where(container_column == container_id))
+
+    def count(self, kind, container_id):
+        """Nombre de membres, compté sur l'index de la colonne du conteneur"""
+        table, container_column = MEMBERSHIP_TABLES[kind]
+        return db.session.query(db.func.count()).select_from(table).filter(
+            container_column == container_id
+        ).scalar()
+
+    def invalidate(self, kind, container_id, user_id):
+        """À appeler après le commit d'un ajout ou d'un retrait"""
+        with self._lock:
+            self._entries.pop((kind, container_id, user_id), None)
+
+    def invalidate_container(self, kind, container_id):
+        """À appeler après la suppression d'un groupe ou d'un atelier"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == kind and key[1] == container_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key):
+        if not self.ttl:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key, member):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), member)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+memberships = Memberships()
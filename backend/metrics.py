@@ -0,0 +1,211 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instrumentation par requête : latence, nombre d'instructions SQL, temps passé en
+# base et taille de réponse, agrégés par endpoint de blueprint et exposés au format
+# texte Prometheus. Les agrégats sont propres à chaque processus : avec plusieurs
+# workers, chaque worker expose les siens (étiquette instance côté Prometheus).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (un compteur par borne, plus somme et total)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+class EndpointStats:
+    __slots__ = ('latency', 'sql_statements', 'response_size', 'db_time', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.sql_statements = Histogram(SQL_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.db_time = 0.0
+        self.statuses = {}
+
+class Metrics:
+    """
+    Middleware de mesure (before_request / after_request) et écouteurs
+    d'événements SQLAlchemy. Le coût par requête se limite à quelques
+    perf_counter() et à une mise à jour de compteurs sous verrou.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self.server_timing = True
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        self.server_timing = app.config.get('METRICS_SERVER_TIMING', True)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        _listen_engines()
+        _time_serialization(app)
+        app.extensions['metrics'] = self
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql_count = 0
+        g.metrics_db_time = 0.0
+        g.metrics_serialize_time = 0.0
+
+    def _after_request(self, response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        sql_count = g.metrics_sql_count
+        db_time = g.metrics_db_time
+        serialize_time = g.metrics_serialize_time
+        # Taille inconnue pour une réponse en flux : non comptée
+        size = response.calculate_content_length()
+
+        key = (request.endpoint or 'unmatched', request.method)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats()
+            stats.latency.observe(elapsed)
+            stats.sql_statements.observe(sql_count)
+            stats.db_time += db_time
+            if size is not None:
+                stats.response_size.observe(size)
+            stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+
+        if self.server_timing:
+            app_time = max(0.0, elapsed - db_time - serialize_time)
+            response.headers['Server-Timing'] = (
+                f'db;dur={db_time * 1000:.2f};desc="{sql_count} queries", '
+                f'serialize;dur={serialize_time * 1000:.2f}, '
+                f'app;dur={app_time * 1000:.2f}, '
+                f'total;dur={elapsed * 1000:.2f}'
+            )
+        return response
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self):
+        """Exposition au format texte Prometheus (version 0.0.4)"""
+        with self._lock:
+            snapshot = sorted(self._endpoints.items())
+            lines = []
+            _histogram(lines, 'http_request_duration_seconds', 'Durée des requêtes HTTP',
+                       snapshot, 'latency')
+            _histogram(lines, 'http_request_sql_statements', 'Instructions SQL par requête',
+                       snapshot, 'sql_statements')
+            _histogram(lines, 'http_response_size_bytes', 'Taille du corps des réponses',
+                       snapshot, 'response_size')
+
+            lines += ['# HELP http_request_db_seconds_total Temps cumulé passé en base de données',
+                      '# TYPE http_request_db_seconds_total counter']
+            for (endpoint, method), stats in snapshot:
+                lines.append(f'http_request_db_seconds_total{_labels(endpoint, method)} {stats.db_time!r}')
+
+            lines += ['# HELP http_requests_total Requêtes HTTP par code de réponse',
+                      '# TYPE http_requests_total counter']
+            for (endpoint, method), stats in snapshot:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{_labels(endpoint, method, status=status)} {count}')
+
+        response_cache = current_app.extensions.get('response_cache')
+        if response_cache is not None:
+            cache_stats = response_cache.stats()
+            for name, kind in (('hits', 'counter'), ('misses', 'counter'), ('invalidations', 'counter'),
+                               ('evictions', 'counter'), ('size', 'gauge')):
+                metric = f'response_cache_{name}' + ('_total' if kind == 'counter' else '')
+                lines += [f'# TYPE {metric} {kind}', f'{metric} {cache_stats[name]}']
+
+        return '\n'.join(lines) + '\n'
+
+def _histogram(lines, name, description, snapshot, attribute):
+    lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+    for (endpoint, method), stats in snapshot:
+        histogram = getattr(stats, attribute)
+        if not histogram.count:
+            continue
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{_labels(endpoint, method, le=bound)} {count}')
+        lines.append(f'{name}_bucket{_labels(endpoint, method, le="+Inf")} {histogram.count}')
+        lines.append(f'{name}_sum{_labels(endpoint, method)} {histogram.sum!r}')
+        lines.append(f'{name}_count{_labels(endpoint, method)} {histogram.count}')
+
+def _labels(endpoint, method, **extra):
+    pairs = [('endpoint', endpoint), ('method', method)] + list(extra.items())
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# --- Temps SQL ----------------------------------------------------------------
+
+_listening = False
+
+def _listen_engines():
+    # Écoute au niveau de la classe Engine : couvre tous les moteurs (binds compris)
+    global _listening
+    if _listening:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _listening = True
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    # Hors requête HTTP (commandes CLI, démarrage) : rien à attribuer
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_sql_count += 1
+        g.metrics_db_time += elapsed
+
+# --- Temps de sérialisation -----------------------------------------------------
+
+def _time_serialization(app):
+    """Mesure le temps passé dans jsonify() (fournisseur JSON de l'application)"""
+    provider = app.json
+    response = provider.response
+
+    def timed_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return response(*args, **kwargs)
+        finally:
+            if has_request_context() and 'metrics_start' in g:
+                g.metrics_serialize_time += time.perf_counter() - start
+
+    provider.response = timed_response
+
+metrics = Metrics()
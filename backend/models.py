@@ -1,27 +1,140 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from datetime import datetime
+from flask import current_app
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from replica import RoutingSession
+from passwords import password_hasher
 
-db = SQLAlchemy()
+# La session route les lectures des endpoints marqués vers le réplica (voir replica.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Tables d'association (many-to-many)
 workshop_participants = db.Table('workshop_participants',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('workshop_id', db.Integer, db.ForeignKey('workshop.id'), primary_key=True)
+    db.Column('workshop_id', db.Integer, db.ForeignKey('workshop.id'), primary_key=True),
+    # La clé primaire (user_id, workshop_id) sert les recherches par participant ;
+    # index dédié pour compter et paginer (par user_id) les participants d'un atelier
+    db.Index('ix_workshop_participants_workshop_id_user_id', 'workshop_id', 'user_id')
 )
 
 group_members = db.Table('group_members',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True)
+    db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True),
+    # La clé primaire commence par user_id : index dédié pour compter et paginer
+    # (par user_id) les membres d'un groupe
+    db.Index('ix_group_members_group_id_user_id', 'group_id', 'user_id')
 )
 
 literary_work_likes = db.Table('literary_work_likes',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('literary_work_id', db.Integer, db.ForeignKey('literary_work.id'), primary_key=True)
+    db.Column('literary_work_id', db.Integer, db.ForeignKey('literary_work.id'), primary_key=True),
+    # Date du like (exports incrémentaux) ; NULL pour les likes antérieurs à la colonne
+    db.Column('created_at', db.DateTime, default=datetime.utcnow)
 )
 
+# Abonnements aux auteurs : user_id suit author_id (mêmes noms de colonnes que les
+# adhésions, pour passer par memberships.py)
+author_followers = db.Table('author_followers',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Column('author_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    # Abonnés d'un auteur (diffusion d'une publication dans leurs fils)
+    db.Index('ix_author_followers_author_id_user_id', 'author_id', 'user_id')
+)
+
+# Fil d'actualité matérialisé : une ligne par (lecteur, œuvre), écrite à la
+# publication (voir feed.py). created_at est celui de l'œuvre.
+feed_entries = db.Table('feed_entries',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('literary_work_id', db.Integer, db.ForeignKey('literary_work.id', ondelete='CASCADE'),
+              primary_key=True),
+    db.Column('created_at', db.DateTime, nullable=False),
+    # Lecture du fil : parcours de l'index dans l'ordre, reprise par clé
+    db.Index('ix_feed_entries_user_id_created_at_work_id', 'user_id', 'created_at', 'literary_work_id')
+)
+
+def insert_ignore(table):
+    """INSERT qui ignore silencieusement les doublons de clé primaire (ON CONFLICT DO NOTHING)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table).on_conflict_do_nothing()
+    return table.insert().prefix_with('IGNORE', dialect='mysql')
+
+def begin_write():
+    """
+    Ouvre dès maintenant la transaction d'écriture sur SQLite (BEGIN IMMEDIATE).
+    SQLite ignore FOR UPDATE / FOR SHARE et pysqlite n'ouvre la transaction qu'à la
+    première écriture : une lecture dont dépend l'écriture se ferait hors transaction.
+    Sans effet sur les autres bases, où les verrous de ligne jouent ce rôle.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return
+    dbapi_connection = connection.connection.dbapi_connection
+    # Pilote aiosqlite (mode ASGI) : connexion sqlite3 enveloppée par l'adaptateur
+    dbapi_connection = getattr(dbapi_connection, '_connection', dbapi_connection)
+    # Transaction déjà ouverte par une écriture : le verrou d'écriture est déjà pris
+    if not dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+# Notes possibles d'un commentaire (une colonne de répartition par valeur)
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+def bayesian_rating(rating_sum, rating_count):
+    """
+    Note moyenne lissée (moyenne bayésienne) : tirée vers RATING_PRIOR_MEAN tant
+    que l'œuvre a peu de notes. Accepte des nombres ou des expressions SQL.
+    """
+    mean = float(current_app.config.get('RATING_PRIOR_MEAN', 3.0))
+    weight = current_app.config.get('RATING_PRIOR_WEIGHT', 5)
+    # Flottants des deux côtés : pas de division entière en SQL
+    return (rating_sum + mean * weight) / (rating_count + float(weight))
+
+def prefix_match(column, prefix):
+    """Filtre « commence par » insensible à la casse, servi par un index sur lower(colonne)"""
+    key = db.func.lower(column)
+    if db.engine.dialect.name == 'postgresql':
+        # Index en text_pattern_ops : LIKE 'préfixe%' parcourt l'index
+        return key.startswith(prefix.lower(), autoescape=True)
+    
+    # SQLite n'utilise pas d'index d'expression pour LIKE : intervalle [préfixe, préfixe suivant[.
+    # Son lower() ne convertit que l'ASCII, on fait de même côté Python.
+    prefix = ''.join(char.lower() if char.isascii() else char for char in prefix)
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return db.and_(key >= prefix, key < upper_bound)
+
+class VersionMixin:
+    """
+    Version incrémentée à chaque modification de la ressource ou de ses enfants
+    (likes, commentaires, membres, œuvres...) : sert aux ETag et Last-Modified.
+    """
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def version_values(cls):
+        """Valeurs SET d'un incrément de version (updated_at conservé, ce n'est pas une édition)"""
+        values = {cls.version: cls.version + 1, cls.changed_at: datetime.utcnow()}
+        if hasattr(cls, 'updated_at'):
+            values[cls.updated_at] = cls.updated_at
+        return values
+
+    @classmethod
+    def bump_version(cls, *ids):
+        """Incrémente atomiquement la version des ressources données (ids vides ignorés)"""
+        ids = {resource_id for resource_id in ids if resource_id}
+        if ids:
+            cls.bump_version_where(cls.id.in_(ids))
+
+    @classmethod
+    def bump_version_where(cls, *criteria):
+        """Incrémente en un seul UPDATE la version des ressources vérifiant les critères"""
+        cls.query.filter(*criteria).update(cls.version_values(), synchronize_session=False)
+
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
@@ -32,6 +145,8 @@ class User(db.Model, UserMixin):
     bio = db.Column(db.Text)
     profile_picture = db.Column(db.String(200))
     role = db.Column(db.String(20), default='author')  # author, moderator, admin
+    # Auteur trop suivi pour recopier ses œuvres chez chaque abonné : lu à la demande (feed.py)
+    fanout_on_read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -47,12 +162,13 @@ class User(db.Model, UserMixin):
     liked_works = db.relationship('LiteraryWork', secondary=literary_work_likes, back_populates='likes')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        # Hachage dans le pool de processus (voir passwords.py)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
-class LiteraryWork(db.Model):
+class LiteraryWork(VersionMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -60,6 +176,9 @@ class LiteraryWork(db.Model):
     status = db.Column(db.String(20), default='draft')  # draft, published, archived
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Première mise en ligne : seule elle compte pour le classement tendance et la diffusion
+    # dans les fils (une œuvre dépubliée puis republiée n'est ni recomptée ni rediffusée)
+    first_published_at = db.Column(db.DateTime)
     
     # Foreign keys
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -67,6 +186,24 @@ class LiteraryWork(db.Model):
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'))
     book_id = db.Column(db.Integer, db.ForeignKey('book.id'))  # Relation optionnelle avec un livre
     
+    # Compteurs dénormalisés (maintenus par les routes, reconstruits par `flask recount-works`)
+    likes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comments_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Répartition des notes (nombre de notes 1, 2, ... 5) et note lissée servant au tri
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_score = db.Column(db.Float, nullable=False, default=lambda: bayesian_rating(0, 0), server_default='3')
+    # Score « tendance » décroissant dans le temps, incrémenté à chaque like / commentaire
+    # (échelle relative à TrendingState.epoch, voir trending.py)
+    hot_score = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    # Date du like d'un utilisateur donné, chargée à la demande (with_expression, historique d'activité)
+    liked_at = db.query_expression()
+    
     # Relations
     author = db.relationship('User', back_populates='literary_works')
     workshop = db.relationship('Workshop', back_populates='works')
@@ -77,7 +214,81 @@ class LiteraryWork(db.Model):
     # Many-to-many relations
     likes = db.relationship('User', secondary=literary_work_likes, back_populates='liked_works')
 
-class Workshop(db.Model):
+    # Index de pagination par clé pour la liste des œuvres (tri récent et popularité)
+    __table_args__ = (
+        db.Index('ix_literary_work_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_literary_work_status_likes_count_id', 'status', 'likes_count', 'id'),
+        db.Index('ix_literary_work_status_hot_score_id', 'status', 'hot_score', 'id'),
+        db.Index('ix_literary_work_status_rating_score_id', 'status', 'rating_score', 'id'),
+        # Décompte des publications récentes d'un auteur (quota hebdomadaire)
+        db.Index('ix_literary_work_author_id_created_at', 'author_id', 'created_at'),
+        # Œuvres d'un groupe / d'un atelier, paginées par clé
+        db.Index('ix_literary_work_group_id_created_at_id', 'group_id', 'created_at', 'id'),
+        db.Index('ix_literary_work_workshop_id_created_at_id', 'workshop_id', 'created_at', 'id'),
+    )
+
+    @property
+    def rating_average(self):
+        """Moyenne brute des notes, None sans note"""
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+
+    @property
+    def rating_distribution(self):
+        """Nombre de notes par valeur : {'1': n1, ... '5': n5}"""
+        return {str(value): getattr(self, f'rating_{value}_count') for value in RATING_VALUES}
+
+    @staticmethod
+    def rating_deltas(added=None, removed=None):
+        """
+        Variations des compteurs de notes pour adjust_counters : note ajoutée,
+        retirée, ou les deux pour une note modifiée (None = pas de note)
+        """
+        deltas = {}
+        for rating, sign in ((added, 1), (removed, -1)):
+            if rating is None:
+                continue
+            for name, delta in (('rating_sum', rating), ('rating_count', 1), (f'rating_{rating}_count', 1)):
+                deltas[name] = deltas.get(name, 0) + sign * delta
+        return deltas
+
+    @classmethod
+    def adjust_counters(cls, work_id, **deltas):
+        """Incrémente atomiquement les compteurs dénormalisés (UPDATE ... SET c = c + n) et la version"""
+        values = {getattr(cls, name): getattr(cls, name) + delta for name, delta in deltas.items() if delta}
+        if deltas.get('rating_sum') or deltas.get('rating_count'):
+            # Note lissée recalculée dans le même UPDATE, à partir des nouvelles valeurs
+            values[cls.rating_score] = bayesian_rating(
+                cls.rating_sum + deltas.get('rating_sum', 0), cls.rating_count + deltas.get('rating_count', 0)
+            )
+        if values:
+            values.update(cls.version_values())
+            cls.query.filter(cls.id == work_id).update(values, synchronize_session=False)
+
+    @classmethod
+    def showing_user(cls, user_id):
+        """Critère : œuvres dont le détail affiche l'utilisateur (commentaire ou like)"""
+        return db.or_(
+            cls.id.in_(db.select(Comment.literary_work_id).where(Comment.user_id == user_id)),
+            cls.id.in_(db.select(literary_work_likes.c.literary_work_id).where(literary_work_likes.c.user_id == user_id))
+        )
+
+    @classmethod
+    def adjust_counters_many(cls, deltas_by_id):
+        """
+        adjust_counters pour plusieurs œuvres en un seul UPDATE (c = c + CASE id WHEN ...).
+        Compteurs simples uniquement : la note lissée n'est pas recalculée.
+        """
+        names = {name for deltas in deltas_by_id.values() for name, delta in deltas.items() if delta}
+        values = {}
+        for name in names:
+            column = getattr(cls, name)
+            whens = {work_id: deltas[name] for work_id, deltas in deltas_by_id.items() if deltas.get(name)}
+            values[column] = column + db.case(whens, value=cls.id, else_=0)
+        if values:
+            values.update(cls.version_values())
+            cls.query.filter(cls.id.in_(deltas_by_id)).update(values, synchronize_session=False)
+
+class Workshop(VersionMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -85,6 +296,8 @@ class Workshop(db.Model):
     start_date = db.Column(db.DateTime)
     end_date = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='planning')  # planning, active, completed
+    # Trop de membres pour recopier les œuvres dans chaque fil : lues à la demande (feed.py)
+    fanout_on_read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Foreign keys
@@ -95,7 +308,29 @@ class Workshop(db.Model):
     works = db.relationship('LiteraryWork', back_populates='workshop', cascade='all, delete-orphan')
     
     # Many-to-many relations
-    participants = db.relationship('User', secondary=workshop_participants, back_populates='workshops')
+    # passive_deletes : voir Group.members
+    participants = db.relationship(
+        'User', secondary=workshop_participants, back_populates='workshops', passive_deletes=True
+    )
+    
+    # Nombres de participants et d'œuvres (sous-requêtes corrélées, chargées sur demande)
+    participants_count = column_property(
+        db.select(db.func.count()).select_from(workshop_participants)
+        .where(workshop_participants.c.workshop_id == id).correlate_except(workshop_participants).scalar_subquery(),
+        deferred=True
+    )
+    works_count = column_property(
+        db.select(db.func.count(LiteraryWork.id)).where(LiteraryWork.workshop_id == id)
+        .correlate_except(LiteraryWork).scalar_subquery(),
+        deferred=True
+    )
+    
+    __table_args__ = (
+        # Liste paginée par clé (du plus récent au plus ancien)
+        db.Index('ix_workshop_created_at_id', 'created_at', 'id'),
+        # Vues calendrier : ateliers d'un statut sur une plage de dates
+        db.Index('ix_workshop_status_start_date', 'status', 'start_date'),
+    )
 
 class Comment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -110,12 +345,21 @@ class Comment(db.Model):
     # Relations
     user = db.relationship('User', back_populates='comments')
     literary_work = db.relationship('LiteraryWork', back_populates='comments')
+    
+    # Historique paginé des commentaires d'un utilisateur (/users/<id>/activity)
+    __table_args__ = (
+        db.Index('ix_comment_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # Commentaires d'une œuvre ; couvre aussi les sommes et la répartition des notes (recount-works)
+        db.Index('ix_comment_literary_work_id_rating', 'literary_work_id', 'rating'),
+    )
 
-class Group(db.Model):
+class Group(VersionMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
     description = db.Column(db.Text)
     is_private = db.Column(db.Boolean, default=False)
+    # Trop de membres pour recopier les œuvres dans chaque fil : lues à la demande (feed.py)
+    fanout_on_read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Foreign keys
@@ -126,7 +370,36 @@ class Group(db.Model):
     works = db.relationship('LiteraryWork', back_populates='group', cascade='all, delete-orphan')
     
     # Many-to-many relations
-    members = db.relationship('User', secondary=group_members, back_populates='groups')
+    # passive_deletes : à la suppression, les lignes d'association sont effacées par
+    # memberships.remove_all() sans charger la collection
+    members = db.relationship('User', secondary=group_members, back_populates='groups', passive_deletes=True)
+    
+    # Nombres de membres et d'œuvres (sous-requêtes corrélées, chargées sur demande)
+    members_count = column_property(
+        db.select(db.func.count()).select_from(group_members)
+        .where(group_members.c.group_id == id).correlate_except(group_members).scalar_subquery(),
+        deferred=True
+    )
+    works_count = column_property(
+        db.select(db.func.count(LiteraryWork.id)).where(LiteraryWork.group_id == id)
+        .correlate_except(LiteraryWork).scalar_subquery(),
+        deferred=True
+    )
+    
+    __table_args__ = (
+        # Liste paginée par clé (groupes publics, du plus récent au plus ancien)
+        db.Index('ix_group_is_private_created_at_id', 'is_private', 'created_at', 'id'),
+        # Filtre par préfixe de nom, insensible à la casse (voir prefix_match)
+        db.Index(
+            'ix_group_name_lower', db.func.lower(name).label('name_lower'),
+            postgresql_ops={'name_lower': 'text_pattern_ops'}
+        ),
+    )
+
+class TrendingState(db.Model):
+    """Ligne unique : date de référence des scores tendance, avancée à chaque re-décroissance"""
+    id = db.Column(db.Integer, primary_key=True)
+    epoch = db.Column(db.DateTime, nullable=False)
 
 # On garde les modèles existants pour la compatibilité
 class StudentBook(db.Model):
@@ -0,0 +1,120 @@
+import base64
+import json
+from datetime import datetime, timezone
+from flask import request, jsonify
+from sqlalchemy import tuple_
+
+# Taille de page par défaut et maximale pour les listes paginées
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+class InvalidCursor(ValueError):
+    """Curseur de pagination illisible ou incompatible avec le tri demandé"""
+
+def is_paginated():
+    """Indique si le client a demandé une réponse paginée (limit ou cursor)"""
+    return 'limit' in request.args or 'cursor' in request.args
+
+def get_page_args():
+    """Lit les paramètres limit/cursor de la requête courante"""
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_LIMIT))
+    return limit, request.args.get('cursor') or None
+
+def parse_date_arg(name):
+    """Date ISO 8601 d'un paramètre de requête, ramenée en UTC naïf comme les colonnes ; None si absente"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def encode_cursor(values):
+    """Encode les valeurs de la clé de tri de la dernière ligne en curseur opaque"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """Décode un curseur en valeurs typées selon les colonnes de tri"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor(cursor)
+
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif column.type.python_type is int:
+                value = int(value)
+        except (TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        decoded.append(value)
+    return decoded
+
+def encode_offset_cursor(offset):
+    """Curseur des listes classées par score (recherche) : position dans le classement"""
+    return encode_cursor([offset])
+
+def decode_offset_cursor(cursor):
+    """Décode un curseur de position, 0 si absent"""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        offset = int(values[0])
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise InvalidCursor(cursor)
+    if offset < 0:
+        raise InvalidCursor(cursor)
+    return offset
+
+def list_page(query, columns, key):
+    """
+    Page d'une liste publique : celle demandée par limit / cursor, sinon les
+    MAX_LIMIT premières lignes (jamais la table entière). Retourne (lignes, curseur suivant).
+    """
+    if is_paginated():
+        limit, cursor = get_page_args()
+    else:
+        limit, cursor = MAX_LIMIT, None
+    return keyset_page(query, columns, limit, cursor, key)
+
+def list_response(name, items, next_cursor):
+    """
+    Réponse d'une liste : {name: [...], next_cursor} si le client pagine, sinon
+    le tableau seul (format historique) avec le curseur suivant dans X-Next-Cursor
+    """
+    if is_paginated():
+        return jsonify({name: items, 'next_cursor': next_cursor}), 200
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+def keyset_page(query, columns, limit, cursor, key):
+    """
+    Pagination par clé (keyset) : tri décroissant sur `columns`, reprise après
+    le curseur via une comparaison de tuples, donc sans OFFSET.
+    `key` extrait de chaque ligne les valeurs de `columns`.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    rows = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(key(rows[-1]))
+    return rows, next_cursor
@@ -0,0 +1,103 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HashingBusy(Exception):
+    """Trop de hachages en attente : la requête est refusée plutôt que mise en file indéfiniment"""
+
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+class PasswordHasher:
+    """
+    Hachage des mots de passe (scrypt / PBKDF2 de werkzeug) dans un pool de
+    processus borné : les pics de connexions n'occupent plus le CPU des workers
+    qui servent les autres requêtes. Au-delà de max_pending hachages en cours,
+    HashingBusy est levée (réponse 503) au lieu d'allonger la file d'attente.
+    Avec workers=0, le hachage reste dans le processus courant.
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.salt_length = 16
+        self.workers = 0
+        self.timeout = 10
+        self._slots = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._method_prefix = None
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', 16)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', 32)
+        self._slots = threading.BoundedSemaphore(max_pending) if self.workers else None
+        self._method_prefix = None
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(_verify, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Vrai si le hachage a été produit avec d'autres paramètres que ceux configurés"""
+        method, _, rest = pwhash.partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.method_prefix or len(salt) != self.salt_length
+
+    @property
+    def method_prefix(self):
+        # Méthode complète telle qu'écrite par werkzeug (ex. 'scrypt:32768:8:1'), calculée une fois
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash('', method=self.method, salt_length=1).partition('$')[0]
+        return self._method_prefix
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+
+        # Contre-pression : on attend peu une place libre, puis on refuse
+        if not self._slots.acquire(timeout=min(1, self.timeout)):
+            raise HashingBusy()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except (BrokenProcessPool, RuntimeError):
+            self._slots.release()
+            self._reset_executor()
+            raise HashingBusy()
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HashingBusy()
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise HashingBusy()
+
+    def _get_executor(self):
+        # Pool créé au premier usage, dans chaque processus worker (pas à l'import de l'application)
+        with self._executor_lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+password_hasher = PasswordHasher()
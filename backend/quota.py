@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, LiteraryWork, User, begin_write
+
+# Fenêtre glissante de la limite de publication
+PUBLICATION_WINDOW = timedelta(days=7)
+
+class QuotaUsage(namedtuple('QuotaUsage', 'count limit next_available_at')):
+    """État du quota d'un auteur à un instant donné"""
+
+    @property
+    def remaining(self):
+        return max(0, self.limit - self.count)
+
+    @property
+    def can_publish(self):
+        return self.count < self.limit
+
+class PublicationQuota:
+    """
+    Quota de publication sur fenêtre glissante (PUBLICATION_LIMIT œuvres / 7 jours).
+    Les dates de publication récentes de chaque auteur sont gardées en cache : le
+    décompte à l'instant t est recalculé à partir de ces dates, il reste donc exact
+    quand d'anciennes publications sortent de la fenêtre. La vérification avant
+    création relit toujours la base en verrouillant la ligne de l'auteur (ou toute
+    la base sur SQLite, qui n'a pas de verrou de ligne).
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # author_id -> (chargé le (monotonic), [created_at, ...])
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        return current_app.config['PUBLICATION_LIMIT']
+
+    @property
+    def ttl(self):
+        return current_app.config['PUBLICATION_QUOTA_CACHE_TTL']
+
+    def usage(self, author_id, now=None):
+        """Quota courant, servi depuis le cache si l'entrée est récente"""
+        now = now or datetime.utcnow()
+        timestamps = self._cached(author_id)
+        if timestamps is None:
+            timestamps = self._load(author_id, now - PUBLICATION_WINDOW)
+            self._store(author_id, timestamps)
+        return self._usage(timestamps, now)
+
+    def reserve(self, author_id):
+        """
+        Vérifie le quota dans la transaction courante, juste avant une création.
+        La ligne de l'auteur est verrouillée (SELECT ... FOR UPDATE) jusqu'au commit :
+        deux publications simultanées du même auteur sont traitées l'une après l'autre.
+        """
+        now = datetime.utcnow()
+        db.session.query(User.id).filter(User.id == author_id).with_for_update().first()
+        # SQLite : pas de verrou de ligne, verrou d'écriture de la base avant le décompte
+        begin_write()
+        timestamps = self._load(author_id, now - PUBLICATION_WINDOW)
+        self._store(author_id, timestamps)
+        return self._usage(timestamps, now)
+
+    def record(self, author_id, created_at):
+        """Ajoute une publication validée (après commit) à l'entrée en cache"""
+        with self._lock:
+            entry = self._entries.get(author_id)
+            if entry is not None:
+                self._entries[author_id] = (entry[0], sorted(entry[1] + [created_at]))
+
+    def invalidate(self, author_id):
+        """À appeler quand une œuvre de l'auteur est supprimée"""
+        with self._lock:
+            self._entries.pop(author_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _usage(self, timestamps, now):
+        since = now - PUBLICATION_WINDOW
+        recent = [created_at for created_at in timestamps if created_at >= since]
+        limit = self.limit
+        next_available_at = None
+        if len(recent) >= limit:
+            # Une place se libère quand la plus ancienne publication bloquante sort de la fenêtre
+            next_available_at = recent[len(recent) - limit] + PUBLICATION_WINDOW
+        return QuotaUsage(len(recent), limit, next_available_at)
+
+    def _load(self, author_id, since):
+        # Parcours de l'index (author_id, created_at)
+        rows = db.session.query(LiteraryWork.created_at).filter(
+            LiteraryWork.author_id == author_id,
+            LiteraryWork.created_at >= since
+        ).order_by(LiteraryWork.created_at).all()
+        return [row[0] for row in rows]
+
+    def _cached(self, author_id):
+        with self._lock:
+            entry = self._entries.get(author_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[author_id]
+                return None
+            self._entries.move_to_end(author_id)
+            return entry[1]
+
+    def _store(self, author_id, timestamps):
+        with self._lock:
+            self._entries[author_id] = (time.monotonic(), timestamps)
+            self._entries.move_to_end(author_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+publication_quota = PublicationQuota()
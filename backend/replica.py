@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import time
+from contextvars import ContextVar
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.util import await_only
+
+# Routage des lectures vers un réplica (bind SQLAlchemy 'replica').
+# Une requête n'utilise le réplica que si :
+#   - un réplica est configuré (READ_REPLICA_URL) ;
+#   - l'endpoint est marqué @read_replica et n'est pas désactivé par la configuration ;
+#   - le client n'a pas écrit récemment (lecture de ses propres écritures) : la fin de
+#     la fenêtre est renvoyée au client (en-tête X-Read-Primary-Until) qui la
+#     repasse sur ses requêtes suivantes, quel que soit le processus qui les sert ;
+#   - la session n'a encore rien écrit pendant la requête.
+# Tout le reste (écritures, SELECT ... FOR UPDATE, flush) part sur la base principale.
+
+REPLICA_BIND = 'replica'
+STICKY_HEADER = 'X-Read-Primary-Until'
+# Tolérance sur l'écart d'horloge entre les processus / hôtes qui émettent et lisent la fenêtre
+CLOCK_SKEW_SECONDS = 1
+
+def read_replica(view):
+    """Marque une vue en lecture seule pouvant être servie par le réplica"""
+    view.read_replica = True
+    return view
+
+# Moteurs asynchrones de la requête en cours (mode ASGI, voir asgi.py) : {None: principal, 'replica': ...}
+async_engines = ContextVar('async_engines', default=None)
+
+def offload(func, *args, **kwargs):
+    """
+    Appelle func(*args, **kwargs). En mode ASGI, l'appel (E/S bloquante, calcul
+    CPU) s'exécute dans le pool de threads de la boucle d'événements, qui sert
+    d'autres requêtes pendant ce temps ; en mode synchrone, appel direct.
+    """
+    if async_engines.get() is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await_only(loop.run_in_executor(None, functools.partial(func, *args, **kwargs)))
+
+class RoutingSession(Session):
+    """Session Flask-SQLAlchemy qui choisit le moteur principal ou le réplica à chaque instruction"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+        if self._flushing or isinstance(clause, UpdateBase) or _is_locking(clause):
+            self.info['has_written'] = True
+            use_replica = False
+        else:
+            use_replica = not self.info.get('has_written') and has_request_context() and g.get('use_replica')
+
+        # Mode ASGI : mêmes règles, appliquées aux moteurs asynchrones (pilotes aiosqlite / asyncpg)
+        engines = async_engines.get()
+        if use_replica and REPLICA_BIND in (engines or self._db.engines):
+            g.read_from_replica = True
+            return (engines or self._db.engines)[REPLICA_BIND]
+        if engines is not None:
+            return engines[None]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _is_locking(clause):
+    return getattr(clause, '_for_update_arg', None) is not None
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    # Après une écriture, le client lit sur la base principale pendant un court délai
+    if session.info.pop('has_written', False) and has_request_context():
+        replica_router.record_write()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('has_written', None)
+
+class ReplicaRouter:
+    """Décide, avant chaque requête, si elle peut lire sur le réplica"""
+
+    def __init__(self):
+        self.enabled = False
+        self.sticky_seconds = 5
+        self.disabled_endpoints = set()
+
+    def init_app(self, app):
+        self.enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+        self.sticky_seconds = app.config.get('READ_REPLICA_STICKY_SECONDS', 5)
+        self.disabled_endpoints = set(app.config.get('READ_REPLICA_DISABLED_ENDPOINTS', ()))
+        if self.enabled:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+        app.extensions['replica_router'] = self
+
+    def _before_request(self):
+        if request.method not in ('GET', 'HEAD') or request.endpoint in self.disabled_endpoints:
+            return
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, 'read_replica', False):
+            return
+        if self.recently_wrote():
+            # Ni réplica ni cache partagé : le client doit voir ses propres écritures
+            g.skip_response_cache = True
+            return
+        g.use_replica = True
+
+    def _after_request(self, response):
+        if g.get('read_primary_until'):
+            response.headers[STICKY_HEADER] = '%.3f' % g.read_primary_until
+        # Permet de vérifier le routage (tests locaux, débogage)
+        if g.get('read_from_replica'):
+            response.headers['X-Read-Replica'] = '1'
+        return response
+
+    def record_write(self):
+        """Ouvre la fenêtre de lecture sur la base principale, transmise au client dans la réponse"""
+        # Horloge murale : la fin de fenêtre est comparée par un autre processus, voire un autre hôte
+        g.read_primary_until = time.time() + self.sticky_seconds
+
+    def recently_wrote(self):
+        try:
+            until = float(request.headers.get(STICKY_HEADER, ''))
+        except ValueError:
+            return False
+        now = time.time()
+        # Une valeur au-delà de la fenêtre maximale n'a pas été émise par le serveur
+        return now < until <= now + self.sticky_seconds + CLOCK_SKEW_SECONDS
+
+replica_router = ReplicaRouter()
@@ -1,5 +1,10 @@
-from flask import Blueprint, request, jsonify
-from models import db, Book
+from flask import Blueprint, request, jsonify, current_app
+from models import db, Book, LiteraryWork
+from cache import cache
+from replica import read_replica
+from serializers import BOOK
+from identity import is_admin
+from imports import IMPORT_MIMETYPES, ImportFormatError, ImportReport, read_records, import_books
 from datetime import datetime
 from flask_cors import CORS
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -9,25 +14,20 @@ books_bp = Blueprint('books', __name__)
 CORS(books_bp, origins='*')
 # 🔹 Récupérer tous les livres
 @books_bp.route('/books', methods=['GET'])
+@read_replica
+@cache.cached('books')
 def get_books():
     books = Book.query.all()
-    return jsonify([
-        {'id': b.id, 'title': b.title, 'author': b.author, 'published_at': b.published_at.strftime('%Y-%m-%d') if b.published_at else None}
-        for b in books
-    ])
+    return jsonify(BOOK.dump_many(books))
 
 # 🔹 Récupérer un livre par ID
 @books_bp.route('/books/<int:id>', methods=['GET'])
+@read_replica
 def get_book(id):
     book = Book.query.get(id)
     if not book:
         return jsonify({'error': 'Book not found'}), 404
-    return jsonify({
-        'id': book.id,
-        'title': book.title,
-        'author': book.author,
-        'published_at': book.published_at.strftime('%Y-%m-%d') if book.published_at else None
-    })
+    return jsonify(BOOK.dump(book))
 
 # 🔹 Ajouter un livre
 @books_bp.route('/books', methods=['POST'])
@@ -47,8 +47,31 @@ def add_book():
     book = Book(title=data['title'], author=data['author'], published_at=published_at)
     db.session.add(book)
     db.session.commit()
+    cache.invalidate('books')
     return jsonify({'message': 'Book added successfully', 'id': book.id}), 201
 
+# 🔹 Importer des livres en masse (tableau JSON, NDJSON ou CSV)
+@books_bp.route('/books/bulk', methods=['POST'])
+@jwt_required()
+def bulk_add_books():
+    if not is_admin():
+        return jsonify({'error': 'Bulk import is restricted to administrators'}), 403
+    if request.mimetype not in IMPORT_MIMETYPES:
+        return jsonify({'error': f'Unsupported content type, expected one of: {", ".join(IMPORT_MIMETYPES)}'}), 415
+
+    report = ImportReport(current_app.config.get('IMPORT_MAX_ERRORS', 100))
+    try:
+        import_books(read_records(), report, current_app.config.get('IMPORT_BATCH_SIZE', 1000))
+    except ImportFormatError as error:
+        # Les lots précédents restent enregistrés
+        db.session.rollback()
+        return jsonify({'error': str(error), **report.to_dict()}), 400
+    finally:
+        if report.inserted:
+            cache.invalidate('books')
+    # Corps lisible : bilan ligne par ligne, même vide ou sans aucune ligne valide
+    return jsonify(report.to_dict()), 201 if report.inserted else 200
+
 # 🔹 Mettre à jour un livre
 @books_bp.route('/books/<int:id>', methods=['PUT'])
 def update_book(id):
@@ -70,7 +93,10 @@ def update_book(id):
         except ValueError:
             return jsonify({'error': 'Invalid date format, expected YYYY-MM-DD'}), 400
 
+    # Le livre est repris dans le détail de ses œuvres : leur ETag change
+    LiteraryWork.bump_version_where(LiteraryWork.book_id == book.id)
     db.session.commit()
+    cache.invalidate('books', 'works')
     return jsonify({'message': 'Book updated successfully'})
 
 # 🔹 Supprimer un livre
@@ -80,6 +106,8 @@ def delete_book(id):
     if not book:
         return jsonify({'error': 'Book not found'}), 404
 
+    LiteraryWork.bump_version_where(LiteraryWork.book_id == book.id)
     db.session.delete(book)
     db.session.commit()
+    cache.invalidate('books', 'works')
     return jsonify({'message': 'Book deleted successfully'})
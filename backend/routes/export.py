@@ -0,0 +1,38 @@
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required
+from replica import read_replica
+from pagination import parse_date_arg
+from identity import is_admin
+from export import EXPORTS, ndjson_stream, gzip_stream
+
+export_bp = Blueprint('export', __name__)
+
+@export_bp.route('/export/<entity>.ndjson', methods=['GET'])
+@read_replica
+@jwt_required()
+def export_entity(entity):
+    if not is_admin():
+        return jsonify({'error': 'Export réservé aux administrateurs'}), 403
+    if entity not in EXPORTS:
+        return jsonify({'error': f'Export inconnu, valeurs possibles : {", ".join(EXPORTS)}'}), 404
+
+    try:
+        updated_since = parse_date_arg('updated_since')
+    except ValueError:
+        return jsonify({'error': 'Format de date invalide (ISO 8601 attendu)'}), 400
+
+    # Borne à reprendre comme updated_since lors de l'export incrémental suivant
+    started_at = datetime.utcnow()
+    chunks = ndjson_stream(entity, updated_since, current_app.config.get('EXPORT_BATCH_SIZE', 1000))
+    headers = {
+        'Content-Disposition': f'attachment; filename={entity}.ndjson',
+        'X-Export-Started-At': started_at.isoformat(),
+        'Vary': 'Accept-Encoding',
+    }
+    if request.accept_encodings['gzip']:
+        chunks = gzip_stream(chunks, current_app.config.get('EXPORT_GZIP_LEVEL', 6))
+        headers['Content-Encoding'] = 'gzip'
+
+    # Contexte de requête (session, réplica) conservé jusqu'à la fin du flux
+    return Response(stream_with_context(chunks), mimetype='application/x-ndjson', headers=headers)
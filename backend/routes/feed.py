@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from replica import read_replica
+from pagination import get_page_args
+from serializers import WORK_LIST_ITEM
+from feed import feed
+
+feed_bp = Blueprint('feed', __name__)
+
+@feed_bp.route('/feed', methods=['GET'])
+@read_replica
+@jwt_required()
+def get_feed():
+    # Fil toujours paginé (limit / cursor) : nouvelles œuvres des groupes, ateliers et auteurs suivis
+    limit, cursor = get_page_args()
+    works, next_cursor = feed.page(int(get_jwt_identity()), limit, cursor)
+    return jsonify({'works': WORK_LIST_ITEM.dump_many(works), 'next_cursor': next_cursor}), 200
@@ -1,6 +1,15 @@
 from flask import Blueprint, request, jsonify
-from models import db, Group, User
+from models import db, Group, User, LiteraryWork, group_members, prefix_match
+from cache import cache, resource_tag
+from replica import read_replica
+from conditional import make_etag, last_modified_of, not_modified, with_validators
+from serializers import GROUP_LIST_ITEM, GROUP_DETAIL, USER_SUMMARY, WORK_BRIEF
+from pagination import get_page_args, keyset_page, list_page, list_response
+from identity import current_identity, is_admin
+from memberships import memberships
+from feed import feed
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import contains_eager, undefer, joinedload, defer, load_only
 
 groups_bp = Blueprint('groups', __name__)
 
@@ -30,14 +39,12 @@ def create_group():
         creator_id=current_user_id
     )
     
-    # Sauvegarder le groupe
+    # Sauvegarder le groupe et y inscrire le créateur dans la même transaction
     db.session.add(new_group)
+    db.session.flush()
+    memberships.add('group', new_group.id, current_user_id)
     db.session.commit()
-    
-    # Ajouter le créateur comme membre
-    creator = User.query.get(current_user_id)
-    new_group.members.append(creator)
-    db.session.commit()
+    cache.invalidate('groups')
     
     return jsonify({
         'message': 'Groupe créé avec succès',
@@ -50,98 +57,147 @@ def create_group():
     }), 201
 
 @groups_bp.route('/groups', methods=['GET'])
+@read_replica
+@cache.cached('groups')
 def get_groups():
     # Paramètres de filtrage
     creator_id = request.args.get('creator_id', type=int)
-    is_private = request.args.get('is_private', type=bool)
-    
-    # Construction de la requête - ne montrer que les groupes publics par défaut
-    query = Group.query.filter(Group.is_private == False)
+    # Liste publique, partagée par le cache entre tous les clients : jamais de groupe
+    # privé ; ?is_private=true donne une liste vide (type=bool lirait « false » comme vrai)
+    if request.args.get('is_private', 'false').lower() in ('true', '1'):
+        return list_response('groups', [], None)
+    name_prefix = request.args.get('q', '').strip()
+    
+    # Une seule requête : créateur en jointure, nombre de membres en sous-requête corrélée
+    # (évaluée pour les seules lignes renvoyées, via l'index sur group_members.group_id)
+    query = Group.query.join(User, Group.creator_id == User.id).options(
+        contains_eager(Group.creator).load_only(User.id, User.username, User.profile_picture),
+        undefer(Group.members_count)
+    ).filter(Group.is_private == False)
     
     if creator_id:
         query = query.filter(Group.creator_id == creator_id)
-    if is_private is not None:
-        query = query.filter(Group.is_private == is_private)
+    if name_prefix:
+        query = query.filter(prefix_match(Group.name, name_prefix))
     
-    # Trier par date de création (du plus récent au plus ancien)
-    query = query.order_by(Group.created_at.desc())
+    # Tri par date de création (du plus récent au plus ancien), l'id sert de départage et de curseur
+    sort_columns = [Group.created_at, Group.id]
     
-    # Exécution de la requête
-    groups = query.all()
+    # Exécution de la requête : page demandée, ou au plus MAX_LIMIT groupes sans limit/cursor
+    groups, next_cursor = list_page(query, sort_columns, lambda group: [group.created_at, group.id])
+    # Tag par groupe : une adhésion ne change que son nombre de membres
+    cache.add_tags(*(resource_tag('group', group.id) for group in groups))
     
-    # Formatage de la réponse
-    groups_list = []
-    for group in groups:
-        creator = User.query.get(group.creator_id)
-        group_data = {
-            'id': group.id,
-            'name': group.name,
-            'description': group.description,
-            'is_private': group.is_private,
-            'created_at': group.created_at.isoformat(),
-            'creator': {
-                'id': creator.id,
-                'username': creator.username,
-                'profile_picture': creator.profile_picture
-            },
-            'members_count': len(group.members)
-        }
-        groups_list.append(group_data)
+    # Formatage de la réponse (schéma compilé)
+    return list_response('groups', GROUP_LIST_ITEM.dump_many(groups), next_cursor)
+
+def check_private_access(group):
+    """Réponse d'erreur si l'utilisateur courant ne peut pas voir ce groupe privé, sinon None"""
+    if not group.is_private:
+        return None
+    
+    if not get_jwt_identity():
+        return jsonify({'error': 'Authentification requise pour ce groupe privé'}), 401
     
-    return jsonify(groups_list), 200
+    # Rôle lu dans le JWT : l'appartenance n'est vérifiée que pour un non-admin
+    if not is_admin() and not memberships.is_member('group', group.id, get_current_user_id()):
+        return jsonify({'error': 'Vous n\'avez pas accès à ce groupe privé'}), 403
+    return None
+
+def members_page(group_id, limit, cursor=None):
+    """Page de membres, triés par id décroissant (la table d'association n'est pas horodatée)"""
+    query = User.query.join(group_members, group_members.c.user_id == User.id).filter(
+        group_members.c.group_id == group_id
+    ).options(load_only(User.id, User.username, User.profile_picture))
+    members, next_cursor = keyset_page(
+        query, [group_members.c.user_id], limit, cursor, lambda user: [user.id]
+    )
+    return USER_SUMMARY.dump_many(members), next_cursor
+
+def works_page(group_id, limit, cursor=None):
+    """Page d'œuvres du groupe, les plus récentes d'abord, auteurs chargés dans la même requête"""
+    query = LiteraryWork.query.filter(LiteraryWork.group_id == group_id).options(
+        defer(LiteraryWork.content),
+        joinedload(LiteraryWork.author).load_only(User.id, User.username)
+    )
+    works, next_cursor = keyset_page(
+        query, [LiteraryWork.created_at, LiteraryWork.id], limit, cursor,
+        lambda work: [work.created_at, work.id]
+    )
+    return WORK_BRIEF.dump_many(works), next_cursor
 
 @groups_bp.route('/groups/<int:group_id>', methods=['GET'])
+@read_replica
 @jwt_required(optional=True)
 def get_group(group_id):
-    group = Group.query.get(group_id)
+    group = db.session.get(Group, group_id, options=[
+        undefer(Group.members_count), undefer(Group.works_count)
+    ])
     
     if not group:
         return jsonify({'error': 'Groupe non trouvé'}), 404
     
-    # Pour les groupes privés, vérifier l'authentification
-    if group.is_private:
-        current_user_id = get_jwt_identity()
-        if not current_user_id:
-            return jsonify({'error': 'Authentification requise pour ce groupe privé'}), 401
-        
-        current_user_id = int(current_user_id)  # Convertir en int
-    current_user = User.query.get(current_user_id)
-        if current_user not in group.members and current_user.role != 'admin':
-        return jsonify({'error': 'Vous n\'avez pas accès à ce groupe privé'}), 403
+    # Pour les groupes privés, vérifier l'authentification et l'appartenance
+    denied = check_private_access(group)
+    if denied:
+        return denied
     
     creator = User.query.get(group.creator_id)
+    viewer_id = get_current_user_id() if get_jwt_identity() else None
+    
+    # Réponse 304 si le client a déjà cette version (membres et œuvres non chargés).
+    # is_member dépend de l'utilisateur : il entre dans l'ETag.
+    etag = make_etag('group', group.id, group.version, group.changed_at, creator.updated_at, viewer_id)
+    last_modified = last_modified_of(group.changed_at, creator.updated_at)
+    cached_response = not_modified(etag, last_modified)
+    if cached_response:
+        return cached_response
+    
+    # Compteurs et première page de chaque sous-ressource (schéma compilé)
+    limit = get_page_args()[0]
+    group_data = GROUP_DETAIL.dump(group)
+    group_data['members'], members_cursor = members_page(group.id, limit)
+    group_data['works'], works_cursor = works_page(group.id, limit)
+    group_data['next_cursors'] = {'members': members_cursor, 'works': works_cursor}
+    group_data['is_member'] = viewer_id is not None and memberships.is_member('group', group.id, viewer_id)
+    
+    return with_validators(jsonify(group_data), etag, last_modified), 200
+
+@groups_bp.route('/groups/<int:group_id>/members', methods=['GET'])
+@read_replica
+@jwt_required(optional=True)
+def get_group_members(group_id):
+    group = db.session.get(Group, group_id)
+    
+    if not group:
+        return jsonify({'error': 'Groupe non trouvé'}), 404
     
-    # Formatage de la réponse
-    group_data = {
-        'id': group.id,
-        'name': group.name,
-        'description': group.description,
-        'is_private': group.is_private,
-        'created_at': group.created_at.isoformat(),
-        'creator': {
-            'id': creator.id,
-            'username': creator.username,
-            'profile_picture': creator.profile_picture
-        },
-        'members': [{
-            'id': member.id,
-            'username': member.username,
-            'profile_picture': member.profile_picture
-        } for member in group.members],
-        'works': [{
-            'id': work.id,
-            'title': work.title,
-            'type': work.type,
-            'status': work.status,
-            'created_at': work.created_at.isoformat(),
-            'author': {
-                'id': work.author.id,
-                'username': work.author.username
-            }
-        } for work in group.works]
-    }
-    
-    return jsonify(group_data), 200
+    denied = check_private_access(group)
+    if denied:
+        return denied
+    
+    limit, cursor = get_page_args()
+    members, next_cursor = members_page(group.id, limit, cursor)
+    
+    return jsonify({'members': members, 'next_cursor': next_cursor}), 200
+
+@groups_bp.route('/groups/<int:group_id>/works', methods=['GET'])
+@read_replica
+@jwt_required(optional=True)
+def get_group_works(group_id):
+    group = db.session.get(Group, group_id)
+    
+    if not group:
+        return jsonify({'error': 'Groupe non trouvé'}), 404
+    
+    denied = check_private_access(group)
+    if denied:
+        return denied
+    
+    limit, cursor = get_page_args()
+    works, next_cursor = works_page(group.id, limit, cursor)
+    
+    return jsonify({'works': works, 'next_cursor': next_cursor}), 200
 
 @groups_bp.route('/groups/<int:group_id>', methods=['PUT'])
 @jwt_required()
@@ -171,7 +227,9 @@ def update_group(group_id):
     if 'is_private' in data:
         group.is_private = data['is_private']
     
+    Group.bump_version(group.id)
     db.session.commit()
+    cache.invalidate('groups')
     
     return jsonify({
         'message': 'Groupe mis à jour avec succès',
@@ -193,13 +251,16 @@ def delete_group(group_id):
         return jsonify({'error': 'Groupe non trouvé'}), 404
     
     # Vérifier si l'utilisateur actuel est le créateur ou un admin
-    user = User.query.get(current_user_id)
-    if group.creator_id != current_user_id and user.role != 'admin':
+    if group.creator_id != current_user_id and not is_admin():
         return jsonify({'error': 'Vous n\'êtes pas autorisé à supprimer ce groupe'}), 403
     
-    # Supprimer le groupe
+    # Supprimer le groupe (adhésions effacées en une requête, sans charger les membres)
+    memberships.remove_all('group', group.id)
+    feed.remove_container_works('group', group.id)
     db.session.delete(group)
     db.session.commit()
+    memberships.invalidate_container('group', group.id)
+    cache.invalidate('groups', 'works')
     
     return jsonify({'message': 'Groupe supprimé avec succès'}), 200
 
@@ -207,61 +268,72 @@ def delete_group(group_id):
 @jwt_required()
 def join_group(group_id):
     current_user_id = get_current_user_id()
-    group = Group.query.get(group_id)
-    user = User.query.get(current_user_id)
+    group = db.session.get(Group, group_id)
     
-    if not group or not user:
+    if not group or not current_identity():
         return jsonify({'error': 'Groupe ou utilisateur non trouvé'}), 404
     
     # Vérifier si l'utilisateur est déjà membre
-    if user in group.members:
+    if memberships.is_member('group', group.id, current_user_id):
         return jsonify({'error': 'Vous êtes déjà membre de ce groupe'}), 400
     
     # Vérifier si le groupe est privé
     if group.is_private:
         return jsonify({'error': 'Ce groupe est privé. Contactez le créateur pour y être ajouté'}), 403
     
-    # Ajouter l'utilisateur comme membre
-    group.members.append(user)
+    # Ajouter l'utilisateur comme membre (INSERT direct ; une requête concurrente a pu le faire)
+    if not memberships.add('group', group.id, current_user_id):
+        db.session.rollback()
+        memberships.invalidate('group', group.id, current_user_id)
+        return jsonify({'error': 'Vous êtes déjà membre de ce groupe'}), 400
+    Group.bump_version(group.id)
     db.session.commit()
+    memberships.invalidate('group', group.id, current_user_id)
+    cache.invalidate(resource_tag('group', group.id))
     
     return jsonify({
         'message': 'Vous avez rejoint le groupe avec succès',
-        'members_count': len(group.members)
+        'members_count': memberships.count('group', group.id)
     }), 200
 
 @groups_bp.route('/groups/<int:group_id>/leave', methods=['POST'])
 @jwt_required()
 def leave_group(group_id):
     current_user_id = get_current_user_id()
-    group = Group.query.get(group_id)
-    user = User.query.get(current_user_id)
+    group = db.session.get(Group, group_id)
     
-    if not group or not user:
+    if not group or not current_identity():
         return jsonify({'error': 'Groupe ou utilisateur non trouvé'}), 404
     
     # Vérifier si l'utilisateur est membre
-    if user not in group.members:
+    if not memberships.is_member('group', group.id, current_user_id):
         return jsonify({'error': 'Vous n\'êtes pas membre de ce groupe'}), 400
     
     # Vérifier si l'utilisateur est le créateur (ne peut pas quitter)
     if group.creator_id == current_user_id:
         return jsonify({'error': 'Le créateur ne peut pas quitter le groupe'}), 400
     
-    # Retirer l'utilisateur des membres
-    group.members.remove(user)
+    # Retirer l'utilisateur des membres (DELETE direct)
+    if not memberships.remove('group', group.id, current_user_id):
+        db.session.rollback()
+        memberships.invalidate('group', group.id, current_user_id)
+        return jsonify({'error': 'Vous n\'êtes pas membre de ce groupe'}), 400
+    feed.forget('group', group.id, current_user_id)
+    Group.bump_version(group.id)
     db.session.commit()
+    memberships.invalidate('group', group.id, current_user_id)
+    cache.invalidate(resource_tag('group', group.id))
     
     return jsonify({
         'message': 'Vous avez quitté le groupe avec succès',
-        'members_count': len(group.members)
+        'members_count': memberships.count('group', group.id)
     }), 200
 
 @groups_bp.route('/groups/<int:group_id>/add-member', methods=['POST'])
 @jwt_required()
 def add_member(group_id):
     current_user_id = get_current_user_id()
-    group = Group.query.get(group_id)
+    group = db.session.get(Group, group_id)
     
     if not group:
         return jsonify({'error': 'Groupe non trouvé'}), 404
@@ -274,28 +346,30 @@ def add_member(group_id):
     if 'user_id' not in data:
         return jsonify({'error': 'ID utilisateur requis'}), 400
     
-    user_to_add = User.query.get(data['user_id'])
-    if not user_to_add:
+    user_id = data['user_id']
+    if not db.session.query(db.exists().where(User.id == user_id)).scalar():
         return jsonify({'error': 'Utilisateur à ajouter non trouvé'}), 404
     
-    # Vérifier si l'utilisateur est déjà membre
-    if user_to_add in group.members:
+    # Ajouter l'utilisateur comme membre (INSERT direct, doublon ignoré)
+    if not memberships.add('group', group.id, user_id):
+        db.session.rollback()
+        memberships.invalidate('group', group.id, user_id)
         return jsonify({'error': 'Cet utilisateur est déjà membre du groupe'}), 400
-    
-    # Ajouter l'utilisateur comme membre
-    group.members.append(user_to_add)
+    Group.bump_version(group.id)
     db.session.commit()
+    memberships.invalidate('group', group.id, user_id)
+    cache.invalidate(resource_tag('group', group.id))
     
     return jsonify({
         'message': 'Membre ajouté avec succès',
-        'members_count': len(group.members)
+        'members_count': memberships.count('group', group.id)
     }), 200
 
 @groups_bp.route('/groups/<int:group_id>/remove-member', methods=['POST'])
 @jwt_required()
 def remove_member(group_id):
     current_user_id = get_current_user_id()
-    group = Group.query.get(group_id)
+    group = db.session.get(Group, group_id)
     
     if not group:
         return jsonify({'error': 'Groupe non trouvé'}), 404
@@ -308,23 +382,26 @@ def remove_member(group_id):
     if 'user_id' not in data:
         return jsonify({'error': 'ID utilisateur requis'}), 400
     
-    user_to_remove = User.query.get(data['user_id'])
-    if not user_to_remove:
+    user_id = data['user_id']
+    if not db.session.query(db.exists().where(User.id == user_id)).scalar():
         return jsonify({'error': 'Utilisateur à retirer non trouvé'}), 404
     
-    # Vérifier si l'utilisateur est membre
-    if user_to_remove not in group.members:
-        return jsonify({'error': 'Cet utilisateur n\'est pas membre du groupe'}), 400
-    
     # Vérifier si l'utilisateur à retirer est le créateur (ne peut pas être retiré)
-    if user_to_remove.id == group.creator_id:
+    if user_id == group.creator_id:
         return jsonify({'error': 'Le créateur ne peut pas être retiré du groupe'}), 400
     
-    # Retirer l'utilisateur des membres
-    group.members.remove(user_to_remove)
+    # Retirer l'utilisateur des membres (DELETE direct)
+    if not memberships.remove('group', group.id, user_id):
+        db.session.rollback()
+        memberships.invalidate('group', group.id, user_id)
+        return jsonify({'error': 'Cet utilisateur n\'est pas membre du groupe'}), 400
+    feed.forget('group', group.id, user_id)
+    Group.bump_version(group.id)
     db.session.commit()
+    memberships.invalidate('group', group.id, user_id)
+    cache.invalidate(resource_tag('group', group.id))
     
     return jsonify({
         'message': 'Membre retiré avec succès',
-        'members_count': len(group.members)
+        'members_count': memberships.count('group', group.id)
     }), 200 
\ No newline at end of file
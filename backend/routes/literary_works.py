@@ -1,12 +1,34 @@
-from flask import Blueprint, request, jsonify
-from models import db, LiteraryWork, User, Comment, literary_work_likes
+from flask import Blueprint, request, jsonify, current_app
+from models import db, LiteraryWork, User, Comment, Workshop, Group
+from cache import cache, resource_tag
+from replica import read_replica
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload, contains_eager, defer
+from pagination import get_page_args, list_page, list_response, encode_offset_cursor, decode_offset_cursor
+from search import search_works, SearchUnavailable
+from likes import add_like, remove_like, set_likes, get_likes_counts
+from conditional import make_etag, last_modified_of, not_modified, with_validators
+from serializers import WORK_LIST_ITEM, WORK_SEARCH_ITEM, WORK_DETAIL
+from quota import publication_quota
+from identity import current_identity, is_admin
+from trending import trending
+from feed import feed
+from imports import IMPORT_MIMETYPES, ImportFormatError, ImportReport, read_records, import_works
 
 literary_works_bp = Blueprint('literary_works', __name__)
 
+# Nombre maximal de likes synchronisés par appel à /likes/batch
+MAX_BATCH_LIKES = 100
+
+# Tags de cache des listes triées par un compteur : invalidés par les likes /
+# commentaires / notes, qui changent l'ordre (le tri par date n'en dépend pas)
+SORT_CACHE_TAGS = {
+    'popularity': ('works:likes',),
+    'trending': ('works:likes', 'works:comments'),
+    'rating': ('works:ratings',),
+}
+
 def get_current_user_id():
     """Utilitaire pour obtenir l'ID utilisateur actuel depuis le JWT"""
     return int(get_jwt_identity())
@@ -21,15 +43,14 @@ def create_literary_work():
     if not all(key in data for key in ['title', 'content', 'type']):
         return jsonify({'error': 'Tous les champs requis doivent être remplis'}), 400
     
-    # Vérification de la limite de publication (2 textes par semaine)
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_works = LiteraryWork.query.filter(
-        LiteraryWork.author_id == current_user_id,
-        LiteraryWork.created_at >= one_week_ago
-    ).count()
-    
-    if recent_works >= 2:
-        return jsonify({'error': 'Vous avez atteint la limite de 2 publications par semaine'}), 429
+    # Vérification de la limite de publication (verrou sur l'auteur jusqu'au commit)
+    usage = publication_quota.reserve(current_user_id)
+    if not usage.can_publish:
+        db.session.rollback()
+        return jsonify({
+            'error': f'Vous avez atteint la limite de {usage.limit} publications par semaine',
+            'next_available_at': usage.next_available_at.isoformat()
+        }), 429
     
     # Création de l'œuvre littéraire
     new_work = LiteraryWork(
@@ -42,9 +63,21 @@ def create_literary_work():
         group_id=data.get('group_id'),
         book_id=data.get('book_id')  # Ajout du book_id optionnel
     )
+    # Une œuvre publiée entre dans le classement tendance avec le poids de sa publication
+    if new_work.status == 'published':
+        new_work.first_published_at = datetime.utcnow()
+        new_work.hot_score = trending.delta(trending.points(publication=True), at=new_work.first_published_at)
     
     db.session.add(new_work)
+    # Les pages de l'atelier / du groupe listent leurs œuvres
+    Workshop.bump_version(new_work.workshop_id)
+    Group.bump_version(new_work.group_id)
     db.session.commit()
+    cache.invalidate('works')
+    publication_quota.record(current_user_id, new_work.created_at)
+    # Diffusion dans les fils des membres, participants et abonnés (en arrière-plan)
+    if new_work.status == 'published':
+        feed.publish(new_work.id)
     
     return jsonify({
         'message': 'Œuvre littéraire créée avec succès',
@@ -57,7 +90,29 @@ def create_literary_work():
         }
     }), 201
 
+@literary_works_bp.route('/literary-works/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_literary_works():
+    # Import en masse des œuvres de l'utilisateur (tableau JSON, NDJSON ou CSV), quota de publication compris
+    if request.mimetype not in IMPORT_MIMETYPES:
+        return jsonify({'error': f'Type de contenu non supporté, valeurs possibles : {", ".join(IMPORT_MIMETYPES)}'}), 415
+    
+    report = ImportReport(current_app.config.get('IMPORT_MAX_ERRORS', 100))
+    try:
+        import_works(read_records(), get_current_user_id(), report, current_app.config.get('IMPORT_BATCH_SIZE', 1000))
+    except ImportFormatError as error:
+        # Les lots précédents restent enregistrés
+        db.session.rollback()
+        return jsonify({'error': str(error), **report.to_dict()}), 400
+    finally:
+        if report.inserted:
+            cache.invalidate('works')
+    # Corps lisible : bilan ligne par ligne, même vide ou sans aucune ligne valide
+    return jsonify(report.to_dict()), 201 if report.inserted else 200
+
 @literary_works_bp.route('/literary-works', methods=['GET'])
+@read_replica
+@cache.cached('works')
 def get_literary_works():
     # Paramètres de filtrage
     author_id = request.args.get('author_id', type=int)
@@ -65,10 +120,15 @@ def get_literary_works():
     status = request.args.get('status')
     workshop_id = request.args.get('workshop_id', type=int)
     group_id = request.args.get('group_id', type=int)
-    sort_by = request.args.get('sort_by', 'recent')  # 'recent', 'popularity'
-    
-    # Construction de la requête simplifiée
-    query = LiteraryWork.query.join(User, LiteraryWork.author_id == User.id)
+    sort_by = request.args.get('sort_by', 'recent')  # 'recent', 'popularity', 'trending', 'rating'
+    
+    # Construction de la requête : auteur et livre chargés dans la même requête SQL
+    # (pas de chargement paresseux par œuvre), contenu exclu car inutile en liste
+    query = LiteraryWork.query.join(User, LiteraryWork.author_id == User.id).options(
+        defer(LiteraryWork.content),
+        contains_eager(LiteraryWork.author).load_only(User.id, User.username, User.profile_picture),
+        joinedload(LiteraryWork.book)
+    )
     
     # Filtres
     if author_id:
@@ -85,118 +145,109 @@ def get_literary_works():
     if group_id:
         query = query.filter(LiteraryWork.group_id == group_id)
     
-    # Tri selon le paramètre
+    # Tri selon le paramètre : la clé de tri se termine toujours par l'id
+    # pour être totale et servir de curseur de pagination
     if sort_by == 'popularity':
-        # Pour le tri par popularité, on compte les likes
-        query = query.outerjoin(literary_work_likes).group_by(LiteraryWork.id).order_by(func.count(literary_work_likes.c.user_id).desc())
+        # Pour le tri par popularité, on lit le compteur de likes indexé
+        sort_columns = [LiteraryWork.likes_count, LiteraryWork.id]
+        sort_key = lambda work: [work.likes_count, work.id]
+    elif sort_by == 'trending':
+        # Score tendance maintenu à chaque événement : parcours de l'index (status, hot_score, id)
+        sort_columns = [LiteraryWork.hot_score, LiteraryWork.id]
+        sort_key = lambda work: [work.hot_score, work.id]
+    elif sort_by == 'rating':
+        # Note lissée (moyenne bayésienne) maintenue à chaque note : index (status, rating_score, id)
+        sort_columns = [LiteraryWork.rating_score, LiteraryWork.id]
+        sort_key = lambda work: [work.rating_score, work.id]
     else:
-        query = query.order_by(LiteraryWork.created_at.desc())
-    
-    # Exécution de la requête
-    works = query.all()
-    
-    # Formatage de la réponse
-    works_list = []
-    for work in works:
-        # Compter les likes et commentaires séparément
-        likes_count = len(work.likes)
-        comments_count = len(work.comments)
-        
-        work_data = {
-            'id': work.id,
-            'title': work.title,
-            'type': work.type,
-            'status': work.status,
-            'created_at': work.created_at.isoformat(),
-            'updated_at': work.updated_at.isoformat(),
-            'author': {
-                'id': work.author.id,
-                'username': work.author.username,
-                'profile_picture': work.author.profile_picture
-            },
-            'likes_count': likes_count,
-            'comments_count': comments_count
-        }
-        
-        # Ajouter les informations du livre si présent
-        if work.book:
-            work_data['book'] = {
-                'id': work.book.id,
-                'title': work.book.title,
-                'author': work.book.author
-            }
-        
-        works_list.append(work_data)
+        sort_columns = [LiteraryWork.created_at, LiteraryWork.id]
+        sort_key = lambda work: [work.created_at, work.id]
+    
+    # Exécution de la requête : page demandée, ou au plus MAX_LIMIT œuvres sans limit/cursor
+    works, next_cursor = list_page(query, sort_columns, sort_key)
+    cache.add_tags(*SORT_CACHE_TAGS.get(sort_by, ()), *(resource_tag('work', work.id) for work in works))
     
-    return jsonify(works_list), 200
+    # Formatage de la réponse (schéma compilé)
+    return list_response('works', WORK_LIST_ITEM.dump_many(works), next_cursor)
+
+@literary_works_bp.route('/literary-works/search', methods=['GET'])
+@read_replica
+@cache.cached('works')
+def search_literary_works():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Le paramètre de recherche q est requis'}), 400
+    
+    limit, cursor = get_page_args()
+    offset = decode_offset_cursor(cursor)
+    
+    # Recherche dans l'index plein texte (FTS5 / tsvector), classée par pertinence
+    try:
+        hits, has_more = search_works(q, limit, offset, current_app.config['SEARCH_LANGUAGE'])
+    except SearchUnavailable:
+        return jsonify({'error': 'Recherche plein texte non disponible sur cette base de données'}), 501
+    
+    # Chargement groupé des œuvres de la page avec leurs auteurs
+    works = LiteraryWork.query.options(
+        defer(LiteraryWork.content),
+        joinedload(LiteraryWork.author).load_only(User.id, User.username, User.profile_picture)
+    ).filter(LiteraryWork.id.in_([work_id for work_id, _, _ in hits])).all()
+    works_by_id = {work.id: work for work in works}
+    cache.add_tags(*(resource_tag('work', work_id) for work_id in works_by_id))
+    
+    results = []
+    for work_id, snippet, score in hits:
+        work = works_by_id.get(work_id)
+        if work:
+            results.append(dict(WORK_SEARCH_ITEM.dump(work), snippet=snippet, score=score))
+    
+    return jsonify({
+        'results': results,
+        'next_cursor': encode_offset_cursor(offset + limit) if has_more else None
+    }), 200
 
 @literary_works_bp.route('/literary-works/<int:work_id>', methods=['GET'])
+@read_replica
 def get_literary_work(work_id):
-    # Requête optimisée avec jointures
+    # Requête légère sur les marqueurs de version : permet de répondre 304
+    # sans exécuter la requête complète ci-dessous
+    # (le livre, les commentateurs et les lecteurs affichés incrémentent la version
+    # de l'œuvre quand ils changent, voir LiteraryWork.bump_version_where)
+    state = db.session.query(
+        LiteraryWork.updated_at, LiteraryWork.version, LiteraryWork.changed_at,
+        User.updated_at, Workshop.version, Group.version, Workshop.changed_at, Group.changed_at
+    ).join(User, LiteraryWork.author_id == User.id
+    ).outerjoin(Workshop, LiteraryWork.workshop_id == Workshop.id
+    ).outerjoin(Group, LiteraryWork.group_id == Group.id
+    ).filter(LiteraryWork.id == work_id).first()
+    
+    if not state:
+        return jsonify({'error': 'Œuvre littéraire non trouvée'}), 404
+    
+    etag = make_etag('literary-work', work_id, *state)
+    last_modified = last_modified_of(state[0], state[2], state[3], state[6], state[7])
+    cached_response = not_modified(etag, last_modified)
+    if cached_response:
+        return cached_response
+    
+    # Relations simples en jointure ; commentaires et likes chargés chacun par une
+    # requête IN : les joindre ensemble produirait commentaires × likes lignes
     work = LiteraryWork.query.options(
         joinedload(LiteraryWork.author),
-        joinedload(LiteraryWork.comments).joinedload(Comment.user),
         joinedload(LiteraryWork.workshop),
         joinedload(LiteraryWork.group),
         joinedload(LiteraryWork.book),
-        joinedload(LiteraryWork.likes)
+        selectinload(LiteraryWork.comments).joinedload(Comment.user),
+        selectinload(LiteraryWork.likes)
     ).get(work_id)
     
     if not work:
         return jsonify({'error': 'Œuvre littéraire non trouvée'}), 404
     
-    # Formatage de la réponse optimisé
-    work_data = {
-        'id': work.id,
-        'title': work.title,
-        'content': work.content,
-        'type': work.type,
-        'status': work.status,
-        'created_at': work.created_at.isoformat(),
-        'updated_at': work.updated_at.isoformat(),
-        'author': {
-            'id': work.author.id,
-            'username': work.author.username,
-            'profile_picture': work.author.profile_picture
-        },
-        'likes_count': len(work.likes),
-        'likes': [{'id': user.id, 'username': user.username} for user in work.likes],
-        'comments': [{
-            'id': comment.id,
-            'content': comment.content,
-            'rating': comment.rating,
-            'created_at': comment.created_at.isoformat(),
-            'user': {
-                'id': comment.user.id,
-                'username': comment.user.username,
-                'profile_picture': comment.user.profile_picture
-            }
-        } for comment in work.comments]
-    }
-    
-    # Ajouter les informations sur le workshop si présent
-    if work.workshop:
-        work_data['workshop'] = {
-            'id': work.workshop.id,
-            'title': work.workshop.title
-        }
-    
-    # Ajouter les informations sur le groupe si présent
-    if work.group:
-        work_data['group'] = {
-            'id': work.group.id,
-            'name': work.group.name
-        }
-    
-    # Ajouter les informations du livre si présent
-    if work.book:
-        work_data['book'] = {
-            'id': work.book.id,
-            'title': work.book.title,
-            'author': work.book.author
-        }
+    # Formatage de la réponse (schéma compilé)
+    work_data = WORK_DETAIL.dump(work)
     
-    return jsonify(work_data), 200
+    return with_validators(jsonify(work_data), etag, last_modified), 200
 
 @literary_works_bp.route('/literary-works/<int:work_id>', methods=['PUT'])
 @jwt_required()
@@ -212,6 +263,11 @@ def update_literary_work(work_id):
         return jsonify({'error': 'Vous n\'êtes pas autorisé à modifier cette œuvre'}), 403
     
     data = request.get_json()
+    previous_workshop_id, previous_group_id = work.workshop_id, work.group_id
+    # Œuvre publiée avant la colonne first_published_at : sa publication a déjà été comptée
+    if work.status == 'published' and work.first_published_at is None:
+        work.first_published_at = work.created_at or datetime.utcnow()
+    first_publication = False
     
     # Mise à jour des champs
     if 'title' in data:
@@ -221,6 +277,13 @@ def update_literary_work(work_id):
     if 'type' in data:
         work.type = data['type']
     if 'status' in data:
+        # Points de publication et diffusion uniquement à la première mise en ligne
+        if data['status'] == 'published' and work.first_published_at is None:
+            first_publication = True
+            work.first_published_at = datetime.utcnow()
+            work.hot_score = LiteraryWork.hot_score + trending.delta(
+                trending.points(publication=True), at=work.first_published_at
+            )
         work.status = data['status']
     if 'workshop_id' in data:
         work.workshop_id = data['workshop_id']
@@ -232,7 +295,16 @@ def update_literary_work(work_id):
     # Mettre à jour la date de modification
     work.updated_at = datetime.utcnow()
     
+    # Les ateliers / groupes (ancien et nouveau) affichent titre et statut de l'œuvre
+    Workshop.bump_version(previous_workshop_id, work.workshop_id)
+    Group.bump_version(previous_group_id, work.group_id)
     db.session.commit()
+    cache.invalidate('works')
+    # Première publication, ou œuvre publiée déplacée vers un autre groupe / atelier :
+    # diffusion aux nouveaux lecteurs (une republication retrouve ses entrées de fil)
+    moved = (work.workshop_id, work.group_id) != (previous_workshop_id, previous_group_id)
+    if work.status == 'published' and (first_publication or moved):
+        feed.publish(work.id)
     
     return jsonify({
         'message': 'Œuvre littéraire mise à jour avec succès',
@@ -254,14 +326,19 @@ def delete_literary_work(work_id):
     if not work:
         return jsonify({'error': 'Œuvre littéraire non trouvée'}), 404
     
-    # Vérifier si l'utilisateur actuel est l'auteur ou un admin
-    user = User.query.get(current_user_id)
-    if work.author_id != current_user_id and user.role != 'admin':
+    # Vérifier si l'utilisateur actuel est l'auteur ou un admin (rôle lu dans le JWT)
+    if work.author_id != current_user_id and not is_admin():
         return jsonify({'error': 'Vous n\'êtes pas autorisé à supprimer cette œuvre'}), 403
     
     # Supprimer l'œuvre
+    author_id = work.author_id
+    Workshop.bump_version(work.workshop_id)
+    Group.bump_version(work.group_id)
+    feed.remove_work(work.id)
     db.session.delete(work)
     db.session.commit()
+    cache.invalidate('works')
+    publication_quota.invalidate(author_id)
     
     return jsonify({'message': 'Œuvre littéraire supprimée avec succès'}), 200
 
@@ -269,46 +346,84 @@ def delete_literary_work(work_id):
 @jwt_required()
 def like_literary_work(work_id):
     current_user_id = get_current_user_id()
-    work = LiteraryWork.query.get(work_id)
-    user = User.query.get(current_user_id)
+    work_exists = db.session.query(LiteraryWork.id).filter_by(id=work_id).scalar()
+    user = current_identity()
     
-    if not work or not user:
+    if not work_exists or not user:
         return jsonify({'error': 'Œuvre littéraire ou utilisateur non trouvé'}), 404
     
-    # Vérifier si l'utilisateur a déjà aimé cette œuvre
-    if user in work.likes:
-        return jsonify({'error': 'Vous avez déjà aimé cette œuvre'}), 400
-    
-    # Ajouter le like
-    work.likes.append(user)
+    # Ajouter le like (sans effet s'il existe déjà) et le compteur dans la même transaction
+    added = add_like(current_user_id, work_id)
     db.session.commit()
+    if added:
+        cache.invalidate(resource_tag('work', work_id), 'works:likes')
     
     return jsonify({
-        'message': 'Like ajouté avec succès',
-        'likes_count': len(work.likes)
+        'message': 'Like ajouté avec succès' if added else 'Vous avez déjà aimé cette œuvre',
+        'liked': True,
+        'likes_count': get_likes_counts([work_id]).get(work_id, 0)
     }), 200
 
 @literary_works_bp.route('/literary-works/<int:work_id>/unlike', methods=['POST'])
 @jwt_required()
 def unlike_literary_work(work_id):
     current_user_id = get_current_user_id()
-    work = LiteraryWork.query.get(work_id)
-    user = User.query.get(current_user_id)
+    work_exists = db.session.query(LiteraryWork.id).filter_by(id=work_id).scalar()
+    user = current_identity()
     
-    if not work or not user:
+    if not work_exists or not user:
         return jsonify({'error': 'Œuvre littéraire ou utilisateur non trouvé'}), 404
     
-    # Vérifier si l'utilisateur a aimé cette œuvre
-    if user not in work.likes:
-        return jsonify({'error': 'Vous n\'avez pas aimé cette œuvre'}), 400
+    # Retirer le like (sans effet s'il n'existe pas) et le compteur dans la même transaction
+    removed = remove_like(current_user_id, work_id)
+    db.session.commit()
+    if removed:
+        cache.invalidate(resource_tag('work', work_id), 'works:likes')
     
-    # Retirer le like
-    work.likes.remove(user)
+    return jsonify({
+        'message': 'Like retiré avec succès' if removed else 'Vous n\'avez pas aimé cette œuvre',
+        'liked': False,
+        'likes_count': get_likes_counts([work_id]).get(work_id, 0)
+    }), 200
+
+@literary_works_bp.route('/likes/batch', methods=['POST'])
+@jwt_required()
+def batch_likes():
+    # Synchronise plusieurs likes/unlikes en un seul aller-retour
+    current_user_id = get_current_user_id()
+    data = request.get_json()
+    
+    items = data.get('likes') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Une liste "likes" de {work_id, liked} est requise'}), 400
+    if len(items) > MAX_BATCH_LIKES:
+        return jsonify({'error': f'Maximum {MAX_BATCH_LIKES} likes par requête'}), 400
+    
+    # Le dernier état demandé pour chaque œuvre l'emporte
+    wanted = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('work_id'), int) or not isinstance(item.get('liked'), bool):
+            return jsonify({'error': 'Chaque élément doit contenir work_id (entier) et liked (booléen)'}), 400
+        wanted[item['work_id']] = item['liked']
+    
+    existing_ids = {work_id for work_id, in db.session.query(LiteraryWork.id).filter(LiteraryWork.id.in_(wanted))}
+    
+    # Insertions, suppressions et compteurs groupés (nombre de requêtes fixe)
+    changed = set_likes(current_user_id, {
+        work_id: liked for work_id, liked in wanted.items() if work_id in existing_ids
+    })
     db.session.commit()
+    if changed:
+        cache.invalidate(*(resource_tag('work', work_id) for work_id in changed), 'works:likes')
     
+    counts = get_likes_counts(existing_ids)
     return jsonify({
-        'message': 'Like retiré avec succès',
-        'likes_count': len(work.likes)
+        'results': [{
+            'work_id': work_id,
+            'liked': liked if work_id in existing_ids else None,
+            'likes_count': counts.get(work_id),
+            'error': None if work_id in existing_ids else 'Œuvre littéraire non trouvée'
+        } for work_id, liked in wanted.items()]
     }), 200
 
 @literary_works_bp.route('/literary-works/<int:work_id>/comments', methods=['POST'])
@@ -325,16 +440,31 @@ def add_comment(work_id):
     if 'content' not in data or not data['content'].strip():
         return jsonify({'error': 'Le contenu du commentaire est requis'}), 400
     
+    rating = data.get('rating')
+    if rating is not None and (not isinstance(rating, int) or isinstance(rating, bool) or not 1 <= rating <= 5):
+        return jsonify({'error': 'La note doit être un entier entre 1 et 5'}), 400
+    
     # Création du commentaire
     new_comment = Comment(
         content=data['content'],
-        rating=data.get('rating'),
+        rating=rating,
         user_id=current_user_id,
         literary_work_id=work_id
     )
     
     db.session.add(new_comment)
+    # Mise à jour des compteurs dans la même transaction que le commentaire
+    # (notes : somme, nombre, répartition et note lissée, voir LiteraryWork.rating_deltas)
+    LiteraryWork.adjust_counters(
+        work_id,
+        comments_count=1,
+        hot_score=trending.delta(trending.points(comments=1, rating=rating)),
+        **LiteraryWork.rating_deltas(added=rating)
+    )
     db.session.commit()
+    cache.invalidate(
+        resource_tag('work', work_id), 'works:comments', *(('works:ratings',) if rating is not None else ())
+    )
     
     return jsonify({
         'message': 'Commentaire ajouté avec succès',
@@ -355,18 +485,13 @@ def add_comment(work_id):
 def check_publication_limit():
     current_user_id = get_current_user_id()
     
-    # Vérifier combien de publications ont été faites cette semaine
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_works = LiteraryWork.query.filter(
-        LiteraryWork.author_id == current_user_id,
-        LiteraryWork.created_at >= one_week_ago
-    ).count()
-    
-    remaining_publications = max(0, 2 - recent_works)
+    # Vérifier combien de publications ont été faites sur les 7 derniers jours
+    usage = publication_quota.usage(current_user_id)
     
     return jsonify({
-        'publications_this_week': recent_works,
-        'remaining_publications': remaining_publications,
-        'limit': 2,
-        'can_publish': remaining_publications > 0
+        'publications_this_week': usage.count,
+        'remaining_publications': usage.remaining,
+        'limit': usage.limit,
+        'can_publish': usage.can_publish,
+        'next_available_at': usage.next_available_at.isoformat() if usage.next_available_at else None
     }), 200 
\ No newline at end of file
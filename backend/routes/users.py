@@ -1,7 +1,19 @@
 from flask import Blueprint, request, jsonify
-from models import db, User, LiteraryWork, Comment
+from models import db, User, LiteraryWork, Comment, literary_work_likes
+from cache import cache
+from replica import read_replica
+from passwords import password_hasher, HashingBusy
+from identity import current_user, identity_cache
+from memberships import memberships
+from feed import feed
+from pagination import get_page_args, keyset_page
+from serializers import (
+    USER_SUMMARY, USER_PROFILE, USER_PUBLIC, USER_LIST_ITEM,
+    ACTIVITY_PUBLICATION, ACTIVITY_COMMENT, ACTIVITY_LIKED_WORK
+)
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from datetime import timedelta
+from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload, defer, with_expression
 import re
 
 users_bp = Blueprint('users', __name__)
@@ -29,6 +41,9 @@ def register():
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Cet email est déjà utilisé'}), 400
     
+    # Fin de la transaction de vérification : pas de connexion gardée pendant le hachage
+    db.session.rollback()
+    
     # Créer un nouvel utilisateur
     new_user = User(
         username=data['username'],
@@ -69,13 +84,31 @@ def login():
     if not all(key in data for key in ['email', 'password']):
         return jsonify({'error': 'Email et mot de passe requis'}), 400
     
-    # Rechercher l'utilisateur par email
-    user = User.query.filter_by(email=data['email']).first()
+    # Rechercher l'utilisateur par email (colonnes utiles seulement), puis terminer la
+    # transaction : la connexion à la base n'est pas gardée pendant le hachage
+    user = db.session.query(
+        User.id, User.username, User.email, User.role, User.password_hash
+    ).filter(User.email == data['email']).first()
+    db.session.rollback()
     
     # Vérifier si l'utilisateur existe et si le mot de passe est correct
-    if not user or not user.check_password(data['password']):
+    if not user or not password_hasher.verify(user.password_hash, data['password']):
         return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
     
+    # Paramètres de hachage modifiés depuis le dernier enregistrement : on re-hache
+    # (au mieux : en cas de surcharge, ce sera fait à la prochaine connexion)
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            password_hash = password_hasher.hash(data['password'])
+        except HashingBusy:
+            password_hash = None
+        if password_hash:
+            db.session.query(User).filter(User.id == user.id).update(
+                {User.password_hash: password_hash, User.updated_at: User.updated_at},
+                synchronize_session=False
+            )
+            db.session.commit()
+    
     # Créer un token JWT
     access_token = create_access_token(
         identity=str(user.id),
@@ -97,34 +130,23 @@ def login():
 @users_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    current_user_id = get_current_user_id()
-    user = User.query.get(current_user_id)
+    user = current_user()
     
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
     
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'bio': user.bio,
-        'profile_picture': user.profile_picture,
-        'role': user.role,
-        'created_at': user.created_at.isoformat()
-    }), 200
+    return jsonify(USER_PROFILE.dump(user)), 200
 
 @users_bp.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
-    current_user_id = get_current_user_id()
-    user = User.query.get(current_user_id)
+    user = current_user()
     
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
     
     data = request.get_json()
+    shown = (user.username, user.profile_picture)
     
     # Mettre à jour les champs autorisés
     if 'username' in data and data['username'] != user.username:
@@ -146,8 +168,15 @@ def update_profile():
     if 'password' in data and data['password']:
         user.set_password(data['password'])
     
+    # Nom et avatar affichés dans le détail des œuvres commentées ou aimées : leurs ETag changent
+    if (user.username, user.profile_picture) != shown:
+        LiteraryWork.bump_version_where(LiteraryWork.showing_user(user.id))
+    
     # Sauvegarder les modifications
     db.session.commit()
+    identity_cache.invalidate(user.id)
+    # Le nom et l'avatar sont repris dans les listes publiques
+    cache.invalidate('works', 'groups', 'workshops')
     
     return jsonify({
         'message': 'Profil mis à jour avec succès',
@@ -168,93 +197,148 @@ def update_profile():
 def get_users():
     users = User.query.all()
     
-    users_list = [{
-        'id': user.id,
-        'username': user.username,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'role': user.role,
-        'profile_picture': user.profile_picture
-    } for user in users]
+    users_list = USER_LIST_ITEM.dump_many(users)
     
     return jsonify(users_list), 200
 
 @users_bp.route('/users/<int:user_id>', methods=['GET'])
+@read_replica
 def get_user(user_id):
     user = User.query.get(user_id)
     
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
     
+    return jsonify(USER_PUBLIC.dump(user)), 200 
+
+@users_bp.route('/users/<int:user_id>/follow', methods=['POST'])
+@jwt_required()
+def follow_user(user_id):
+    current_user_id = get_current_user_id()
+    
+    if user_id == current_user_id:
+        return jsonify({'error': 'Vous ne pouvez pas vous suivre vous-même'}), 400
+    if not db.session.query(db.exists().where(User.id == user_id)).scalar():
+        return jsonify({'error': 'Utilisateur non trouvé'}), 404
+    
+    # Abonnement (INSERT direct) : les prochaines œuvres de l'auteur arrivent dans le fil
+    if not memberships.add('author', user_id, current_user_id):
+        db.session.rollback()
+        memberships.invalidate('author', user_id, current_user_id)
+        return jsonify({'error': 'Vous suivez déjà cet auteur'}), 400
+    db.session.commit()
+    memberships.invalidate('author', user_id, current_user_id)
+    
+    return jsonify({
+        'message': 'Vous suivez désormais cet auteur',
+        'followers_count': memberships.count('author', user_id)
+    }), 200
+
+@users_bp.route('/users/<int:user_id>/unfollow', methods=['POST'])
+@jwt_required()
+def unfollow_user(user_id):
+    current_user_id = get_current_user_id()
+    
+    # Désabonnement (DELETE direct) et retrait de ses œuvres du fil
+    if not memberships.remove('author', user_id, current_user_id):
+        db.session.rollback()
+        memberships.invalidate('author', user_id, current_user_id)
+        return jsonify({'error': 'Vous ne suivez pas cet auteur'}), 400
+    feed.forget('author', user_id, current_user_id)
+    db.session.commit()
+    memberships.invalidate('author', user_id, current_user_id)
+    
     return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'bio': user.bio,
-        'profile_picture': user.profile_picture,
-        'role': user.role,
-        'created_at': user.created_at.isoformat()
-    }), 200 
+        'message': 'Vous ne suivez plus cet auteur',
+        'followers_count': memberships.count('author', user_id)
+    }), 200
+
+# Sections paginées de l'historique d'activité : requête, colonnes de tri (curseur), schéma
+def _publications_query(user_id):
+    return LiteraryWork.query.options(defer(LiteraryWork.content)).filter(LiteraryWork.author_id == user_id)
+
+def _comments_query(user_id):
+    return Comment.query.filter(Comment.user_id == user_id).options(
+        joinedload(Comment.literary_work).load_only(LiteraryWork.id, LiteraryWork.title, LiteraryWork.author_id)
+        .joinedload(LiteraryWork.author).load_only(User.id, User.username)
+    )
+
+# Date des likes, les plus anciens (created_at NULL, antérieurs à la colonne) en dernier
+LIKED_AT = db.func.coalesce(literary_work_likes.c.created_at, datetime(1970, 1, 1))
+
+def _liked_works_query(user_id):
+    return LiteraryWork.query.join(
+        literary_work_likes, literary_work_likes.c.literary_work_id == LiteraryWork.id
+    ).filter(literary_work_likes.c.user_id == user_id).options(
+        defer(LiteraryWork.content),
+        joinedload(LiteraryWork.author).load_only(User.id, User.username),
+        with_expression(LiteraryWork.liked_at, LIKED_AT)
+    )
+
+ACTIVITY_SECTIONS = {
+    'publications': (
+        _publications_query, [LiteraryWork.created_at, LiteraryWork.id],
+        lambda work: [work.created_at, work.id], ACTIVITY_PUBLICATION
+    ),
+    'comments': (
+        _comments_query, [Comment.created_at, Comment.id],
+        lambda comment: [comment.created_at, comment.id], ACTIVITY_COMMENT
+    ),
+    'liked_works': (
+        _liked_works_query, [LIKED_AT, literary_work_likes.c.literary_work_id],
+        lambda work: [work.liked_at, work.id], ACTIVITY_LIKED_WORK
+    ),
+}
+
+def _activity_page(section, user_id, limit, cursor):
+    build_query, columns, key, schema = ACTIVITY_SECTIONS[section]
+    rows, next_cursor = keyset_page(build_query(user_id), columns, limit, cursor, key)
+    return schema.dump_many(rows), next_cursor
+
+def _activity_statistics(user_id):
+    """Totaux de l'utilisateur en une seule requête d'agrégats (compteurs dénormalisés des œuvres)"""
+    publications = db.select(
+        db.func.count(LiteraryWork.id).label('count'),
+        db.func.coalesce(db.func.sum(LiteraryWork.likes_count), 0).label('likes_received')
+    ).where(LiteraryWork.author_id == user_id).subquery()
+    comments = db.select(db.func.count(Comment.id)).where(Comment.user_id == user_id).scalar_subquery()
+    likes = db.select(db.func.count()).select_from(literary_work_likes).where(
+        literary_work_likes.c.user_id == user_id
+    ).scalar_subquery()
+
+    row = db.session.execute(db.select(
+        publications.c.count, publications.c.likes_received,
+        comments.label('comments'), likes.label('likes_given')
+    )).one()
+    return {
+        'total_publications': row.count,
+        'total_comments': row.comments,
+        'total_likes_given': row.likes_given,
+        'total_likes_received': int(row.likes_received)
+    }
 
 @users_bp.route('/users/<int:user_id>/activity', methods=['GET'])
 @jwt_required()
 def get_user_activity(user_id):
-    current_user_id = get_current_user_id()
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
     
-    # Récupérer les publications de l'utilisateur
-    publications = LiteraryWork.query.filter_by(author_id=user_id).order_by(LiteraryWork.created_at.desc()).all()
-    
-    # Récupérer les commentaires de l'utilisateur
-    comments = Comment.query.filter_by(user_id=user_id).order_by(Comment.created_at.desc()).all()
+    limit, cursor = get_page_args()
     
-    # Récupérer les œuvres aimées par l'utilisateur
-    liked_works = user.liked_works
+    # Page suivante d'une seule section : ?section=comments&cursor=...
+    section = request.args.get('section')
+    if section:
+        if section not in ACTIVITY_SECTIONS:
+            return jsonify({'error': 'Section inconnue'}), 400
+        items, next_cursor = _activity_page(section, user_id, limit, cursor)
+        return jsonify({section: items, 'next_cursor': next_cursor}), 200
     
-    # Formatage de la réponse
-    activity = {
-        'user': {
-            'id': user.id,
-            'username': user.username,
-            'profile_picture': user.profile_picture
-        },
-        'publications': [{
-            'id': work.id,
-            'title': work.title,
-            'type': work.type,
-            'status': work.status,
-            'created_at': work.created_at.isoformat(),
-            'likes_count': len(work.likes),
-            'comments_count': len(work.comments)
-        } for work in publications],
-        'comments': [{
-            'id': comment.id,
-            'content': comment.content,
-            'rating': comment.rating,
-            'created_at': comment.created_at.isoformat(),
-            'literary_work': {
-                'id': comment.literary_work.id,
-                'title': comment.literary_work.title,
-                'author': comment.literary_work.author.username
-            }
-        } for comment in comments],
-        'liked_works': [{
-            'id': work.id,
-            'title': work.title,
-            'type': work.type,
-            'author': work.author.username,
-            'likes_count': len(work.likes)
-        } for work in liked_works],
-        'statistics': {
-            'total_publications': len(publications),
-            'total_comments': len(comments),
-            'total_likes_given': len(liked_works),
-            'total_likes_received': sum(len(work.likes) for work in publications)
-        }
-    }
+    # Vue d'ensemble : première page de chaque section et totaux agrégés en SQL
+    activity = {'user': USER_SUMMARY.dump(user), 'next_cursors': {}}
+    for name in ACTIVITY_SECTIONS:
+        activity[name], activity['next_cursors'][name] = _activity_page(name, user_id, limit, None)
+    activity['statistics'] = _activity_statistics(user_id)
     
-    return jsonify(activity), 200 
\ No newline at end of file
+    return jsonify(activity), 200
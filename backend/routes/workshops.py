@@ -1,7 +1,17 @@
 from flask import Blueprint, request, jsonify
-from models import db, Workshop, User
+from models import db, Workshop, User, LiteraryWork, workshop_participants
+from cache import cache, resource_tag
+from replica import read_replica
+from conditional import make_etag, last_modified_of, not_modified, with_validators
+from serializers import WORKSHOP_LIST_ITEM, WORKSHOP_DETAIL, USER_SUMMARY, WORK_BRIEF
+from pagination import get_page_args, keyset_page, list_page, list_response, parse_date_arg
+from identity import current_identity, is_admin
+from memberships import memberships
+from feed import feed
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy import or_
+from sqlalchemy.orm import contains_eager, undefer, joinedload, defer, load_only
 
 workshops_bp = Blueprint('workshops', __name__)
 
@@ -41,14 +51,12 @@ def create_workshop():
         except ValueError:
             return jsonify({'error': 'Format de date de fin invalide'}), 400
     
-    # Sauvegarder l'atelier
+    # Sauvegarder l'atelier et y inscrire le créateur dans la même transaction
     db.session.add(new_workshop)
+    db.session.flush()
+    memberships.add('workshop', new_workshop.id, current_user_id)
     db.session.commit()
-    
-    # Ajouter le créateur comme participant
-    creator = User.query.get(current_user_id)
-    new_workshop.participants.append(creator)
-    db.session.commit()
+    cache.invalidate('workshops')
     
     return jsonify({
         'message': 'Atelier créé avec succès',
@@ -62,6 +70,8 @@ def create_workshop():
     }), 201
 
 @workshops_bp.route('/workshops', methods=['GET'])
+@read_replica
+@cache.cached('workshops')
 def get_workshops():
     # Paramètres de filtrage
     creator_id = request.args.get('creator_id', type=int)
@@ -69,8 +79,19 @@ def get_workshops():
     theme = request.args.get('theme')
     participant_id = request.args.get('participant_id', type=int)
     
-    # Construction de la requête
-    query = Workshop.query
+    # Plage de dates (vue calendrier)
+    try:
+        starts_after = parse_date_arg('starts_after')
+        ends_before = parse_date_arg('ends_before')
+        active_at = parse_date_arg('active_at')
+    except ValueError:
+        return jsonify({'error': 'Format de date invalide (ISO 8601 attendu)'}), 400
+    
+    # Une seule requête : créateur en jointure, nombre de participants en sous-requête corrélée
+    query = Workshop.query.join(User, Workshop.creator_id == User.id).options(
+        contains_eager(Workshop.creator).load_only(User.id, User.username, User.profile_picture),
+        undefer(Workshop.participants_count)
+    )
     
     if creator_id:
         query = query.filter(Workshop.creator_id == creator_id)
@@ -79,81 +100,111 @@ def get_workshops():
     if theme:
         query = query.filter(Workshop.theme == theme)
     if participant_id:
-        query = query.filter(Workshop.participants.any(id=participant_id))
-    
-    # Trier par date de création (du plus récent au plus ancien)
-    query = query.order_by(Workshop.created_at.desc())
-    
-    # Exécution de la requête
-    workshops = query.all()
-    
-    # Formatage de la réponse
-    workshops_list = []
-    for workshop in workshops:
-        creator = User.query.get(workshop.creator_id)
-        workshop_data = {
-            'id': workshop.id,
-            'title': workshop.title,
-            'description': workshop.description,
-            'theme': workshop.theme,
-            'status': workshop.status,
-            'start_date': workshop.start_date.isoformat() if workshop.start_date else None,
-            'end_date': workshop.end_date.isoformat() if workshop.end_date else None,
-            'created_at': workshop.created_at.isoformat(),
-            'creator': {
-                'id': creator.id,
-                'username': creator.username,
-                'profile_picture': creator.profile_picture
-            },
-            'participants_count': len(workshop.participants)
-        }
-        workshops_list.append(workshop_data)
+        # Jointure sur la table d'association (clé primaire) plutôt qu'un EXISTS corrélé
+        query = query.join(
+            workshop_participants, workshop_participants.c.workshop_id == Workshop.id
+        ).filter(workshop_participants.c.user_id == participant_id)
+    if starts_after:
+        query = query.filter(Workshop.start_date >= starts_after)
+    if ends_before:
+        query = query.filter(Workshop.end_date <= ends_before)
+    if active_at:
+        query = query.filter(
+            Workshop.start_date <= active_at,
+            or_(Workshop.end_date.is_(None), Workshop.end_date >= active_at)
+        )
+    
+    # Tri par date de création (du plus récent au plus ancien), l'id sert de départage et de curseur
+    sort_columns = [Workshop.created_at, Workshop.id]
+    
+    # Exécution de la requête : page demandée, ou au plus MAX_LIMIT ateliers sans limit/cursor
+    workshops, next_cursor = list_page(query, sort_columns, lambda workshop: [workshop.created_at, workshop.id])
+    # Tags par atelier (nombre de participants) et, filtrée par participant, par participant
+    cache.add_tags(*(resource_tag('workshop', workshop.id) for workshop in workshops))
+    if participant_id:
+        cache.add_tags(resource_tag('workshop-participant', participant_id))
     
-    return jsonify(workshops_list), 200
+    # Formatage de la réponse (schéma compilé)
+    return list_response('workshops', WORKSHOP_LIST_ITEM.dump_many(workshops), next_cursor)
+
+def participants_page(workshop_id, limit, cursor=None):
+    """Page de participants, triés par id décroissant (la table d'association n'est pas horodatée)"""
+    query = User.query.join(workshop_participants, workshop_participants.c.user_id == User.id).filter(
+        workshop_participants.c.workshop_id == workshop_id
+    ).options(load_only(User.id, User.username, User.profile_picture))
+    participants, next_cursor = keyset_page(
+        query, [workshop_participants.c.user_id], limit, cursor, lambda user: [user.id]
+    )
+    return USER_SUMMARY.dump_many(participants), next_cursor
+
+def works_page(workshop_id, limit, cursor=None):
+    """Page d'œuvres soumises à l'atelier, les plus récentes d'abord, auteurs chargés dans la même requête"""
+    query = LiteraryWork.query.filter(LiteraryWork.workshop_id == workshop_id).options(
+        defer(LiteraryWork.content),
+        joinedload(LiteraryWork.author).load_only(User.id, User.username)
+    )
+    works, next_cursor = keyset_page(
+        query, [LiteraryWork.created_at, LiteraryWork.id], limit, cursor,
+        lambda work: [work.created_at, work.id]
+    )
+    return WORK_BRIEF.dump_many(works), next_cursor
 
 @workshops_bp.route('/workshops/<int:workshop_id>', methods=['GET'])
+@read_replica
+@jwt_required(optional=True)
 def get_workshop(workshop_id):
-    workshop = Workshop.query.get(workshop_id)
+    workshop = db.session.get(Workshop, workshop_id, options=[
+        undefer(Workshop.participants_count), undefer(Workshop.works_count)
+    ])
     
     if not workshop:
         return jsonify({'error': 'Atelier non trouvé'}), 404
     
     creator = User.query.get(workshop.creator_id)
+    viewer_id = get_current_user_id() if get_jwt_identity() else None
+    
+    # Réponse 304 si le client a déjà cette version (participants et œuvres non chargés).
+    # is_participant dépend de l'utilisateur : il entre dans l'ETag.
+    etag = make_etag('workshop', workshop.id, workshop.version, workshop.changed_at, creator.updated_at, viewer_id)
+    last_modified = last_modified_of(workshop.changed_at, creator.updated_at)
+    cached_response = not_modified(etag, last_modified)
+    if cached_response:
+        return cached_response
+    
+    # Compteurs et première page de chaque sous-ressource (schéma compilé)
+    limit = get_page_args()[0]
+    workshop_data = WORKSHOP_DETAIL.dump(workshop)
+    workshop_data['participants'], participants_cursor = participants_page(workshop.id, limit)
+    workshop_data['works'], works_cursor = works_page(workshop.id, limit)
+    workshop_data['next_cursors'] = {'participants': participants_cursor, 'works': works_cursor}
+    workshop_data['is_participant'] = viewer_id is not None and memberships.is_member('workshop', workshop.id, viewer_id)
+    
+    return with_validators(jsonify(workshop_data), etag, last_modified), 200
+
+@workshops_bp.route('/workshops/<int:workshop_id>/participants', methods=['GET'])
+@read_replica
+@cache.cached('workshops')
+def get_workshop_participants(workshop_id):
+    if not db.session.get(Workshop, workshop_id):
+        return jsonify({'error': 'Atelier non trouvé'}), 404
+    
+    cache.add_tags(resource_tag('workshop', workshop_id))
+    limit, cursor = get_page_args()
+    participants, next_cursor = participants_page(workshop_id, limit, cursor)
+    
+    return jsonify({'participants': participants, 'next_cursor': next_cursor}), 200
+
+@workshops_bp.route('/workshops/<int:workshop_id>/works', methods=['GET'])
+@read_replica
+@cache.cached('workshops', 'works')
+def get_workshop_works(workshop_id):
+    if not db.session.get(Workshop, workshop_id):
+        return jsonify({'error': 'Atelier non trouvé'}), 404
     
-    # Formatage de la réponse
-    workshop_data = {
-        'id': workshop.id,
-        'title': workshop.title,
-        'description': workshop.description,
-        'theme': workshop.theme,
-        'status': workshop.status,
-        'start_date': workshop.start_date.isoformat() if workshop.start_date else None,
-        'end_date': workshop.end_date.isoformat() if workshop.end_date else None,
-        'created_at': workshop.created_at.isoformat(),
-        'creator': {
-            'id': creator.id,
-            'username': creator.username,
-            'profile_picture': creator.profile_picture
-        },
-        'participants': [{
-            'id': participant.id,
-            'username': participant.username,
-            'profile_picture': participant.profile_picture
-        } for participant in workshop.participants],
-        'works': [{
-            'id': work.id,
-            'title': work.title,
-            'type': work.type,
-            'status': work.status,
-            'created_at': work.created_at.isoformat(),
-            'author': {
-                'id': work.author.id,
-                'username': work.author.username
-            }
-        } for work in workshop.works]
-    }
-    
-    return jsonify(workshop_data), 200
+    limit, cursor = get_page_args()
+    works, next_cursor = works_page(workshop_id, limit, cursor)
+    
+    return jsonify({'works': works, 'next_cursor': next_cursor}), 200
 
 @workshops_bp.route('/workshops/<int:workshop_id>', methods=['PUT'])
 @jwt_required()
@@ -193,7 +244,9 @@ def update_workshop(workshop_id):
         except ValueError:
             return jsonify({'error': 'Format de date de fin invalide'}), 400
     
+    Workshop.bump_version(workshop.id)
     db.session.commit()
+    cache.invalidate('workshops')
     
     return jsonify({
         'message': 'Atelier mis à jour avec succès',
@@ -215,13 +268,16 @@ def delete_workshop(workshop_id):
         return jsonify({'error': 'Atelier non trouvé'}), 404
     
     # Vérifier si l'utilisateur actuel est le créateur ou un admin
-    user = User.query.get(current_user_id)
-    if workshop.creator_id != current_user_id and user.role != 'admin':
+    if workshop.creator_id != current_user_id and not is_admin():
         return jsonify({'error': 'Vous n\'êtes pas autorisé à supprimer cet atelier'}), 403
     
-    # Supprimer l'atelier
+    # Supprimer l'atelier (participations effacées en une requête, sans charger la liste)
+    memberships.remove_all('workshop', workshop.id)
+    feed.remove_container_works('workshop', workshop.id)
     db.session.delete(workshop)
     db.session.commit()
+    memberships.invalidate_container('workshop', workshop.id)
+    cache.invalidate('workshops', 'works')
     
     return jsonify({'message': 'Atelier supprimé avec succès'}), 200
 
@@ -229,48 +285,59 @@ def delete_workshop(workshop_id):
 @jwt_required()
 def join_workshop(workshop_id):
     current_user_id = get_current_user_id()
-    workshop = Workshop.query.get(workshop_id)
-    user = User.query.get(current_user_id)
+    workshop = db.session.get(Workshop, workshop_id)
     
-    if not workshop or not user:
+    if not workshop or not current_identity():
         return jsonify({'error': 'Atelier ou utilisateur non trouvé'}), 404
     
     # Vérifier si l'utilisateur est déjà participant
-    if user in workshop.participants:
+    if memberships.is_member('workshop', workshop.id, current_user_id):
         return jsonify({'error': 'Vous êtes déjà participant à cet atelier'}), 400
     
-    # Ajouter l'utilisateur comme participant
-    workshop.participants.append(user)
+    # Ajouter l'utilisateur comme participant (INSERT direct ; une requête concurrente a pu le faire)
+    if not memberships.add('workshop', workshop.id, current_user_id):
+        db.session.rollback()
+        memberships.invalidate('workshop', workshop.id, current_user_id)
+        return jsonify({'error': 'Vous êtes déjà participant à cet atelier'}), 400
+    Workshop.bump_version(workshop.id)
     db.session.commit()
+    memberships.invalidate('workshop', workshop.id, current_user_id)
+    cache.invalidate(resource_tag('workshop', workshop.id), resource_tag('workshop-participant', current_user_id))
     
     return jsonify({
         'message': 'Vous avez rejoint l\'atelier avec succès',
-        'participants_count': len(workshop.participants)
+        'participants_count': memberships.count('workshop', workshop.id)
     }), 200
 
 @workshops_bp.route('/workshops/<int:workshop_id>/leave', methods=['POST'])
 @jwt_required()
 def leave_workshop(workshop_id):
     current_user_id = get_current_user_id()
-    workshop = Workshop.query.get(workshop_id)
-    user = User.query.get(current_user_id)
+    workshop = db.session.get(Workshop, workshop_id)
     
-    if not workshop or not user:
+    if not workshop or not current_identity():
         return jsonify({'error': 'Atelier ou utilisateur non trouvé'}), 404
     
     # Vérifier si l'utilisateur est participant
-    if user not in workshop.participants:
+    if not memberships.is_member('workshop', workshop.id, current_user_id):
         return jsonify({'error': 'Vous n\'êtes pas participant à cet atelier'}), 400
     
     # Vérifier si l'utilisateur est le créateur (ne peut pas quitter)
     if workshop.creator_id == current_user_id:
         return jsonify({'error': 'Le créateur ne peut pas quitter l\'atelier'}), 400
     
-    # Retirer l'utilisateur des participants
-    workshop.participants.remove(user)
+    # Retirer l'utilisateur des participants (DELETE direct)
+    if not memberships.remove('workshop', workshop.id, current_user_id):
+        db.session.rollback()
+        memberships.invalidate('workshop', workshop.id, current_user_id)
+        return jsonify({'error': 'Vous n\'êtes pas participant à cet atelier'}), 400
+    feed.forget('workshop', workshop.id, current_user_id)
+    Workshop.bump_version(workshop.id)
     db.session.commit()
+    memberships.invalidate('workshop', workshop.id, current_user_id)
+    cache.invalidate(resource_tag('workshop', workshop.id), resource_tag('workshop-participant', current_user_id))
     
     return jsonify({
         'message': 'Vous avez quitté l\'atelier avec succès',
-        'participants_count': len(workshop.participants)
+        'participants_count': memberships.count('workshop', workshop.id)
     }), 200 
\ No newline at end of file
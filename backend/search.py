@@ -0,0 +1,164 @@
+import re
+from html import escape
+from sqlalchemy import text
+from models import db
+
+# Index plein texte des œuvres (titre + contenu), maintenu par la base elle-même :
+# - SQLite : table virtuelle FTS5 à contenu externe + triggers
+# - PostgreSQL : colonne tsvector générée + index GIN
+
+FTS_TABLE = 'literary_work_fts'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Objets d'index gérés hors des modèles, à ignorer par l'autogénération Alembic
+# (la table FTS5 et ses tables internes literary_work_fts_data, _idx, _docsize, _config)
+INDEX_COLUMNS = {('literary_work', 'search_vector')}
+INDEX_NAMES = {'ix_literary_work_search_vector'}
+
+# Délimiteurs de surlignage renvoyés par la base : des caractères de contrôle qu'html.escape
+# laisse intacts, remplacés par <mark> une fois le contenu utilisateur échappé
+MARK_START = '\x02'
+MARK_STOP = '\x03'
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content,
+        content='literary_work', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON literary_work BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON literary_work BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON literary_work BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE literary_work ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{language}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{language}', coalesce(content, '')), 'B')
+        ) STORED""",
+    """CREATE INDEX IF NOT EXISTS ix_literary_work_search_vector
+        ON literary_work USING GIN (search_vector)""",
+]
+
+class SearchUnavailable(Exception):
+    """Le moteur de base de données courant n'a pas d'index plein texte supporté"""
+
+def is_index_object(name, type_, table_name=None):
+    """Indique si un objet de schéma appartient à l'index plein texte (pour Alembic)"""
+    if type_ == 'table':
+        return name == FTS_TABLE or name.startswith(FTS_TABLE + '_')
+    if type_ == 'column':
+        return (table_name, name) in INDEX_COLUMNS
+    if type_ == 'index':
+        return name in INDEX_NAMES
+    return False
+
+def highlight(snippet):
+    """Échappe l'extrait (contenu utilisateur brut) puis insère les balises <mark>"""
+    if snippet is None:
+        return None
+    return escape(snippet).replace(MARK_START, '<mark>').replace(MARK_STOP, '</mark>')
+
+def _dialect():
+    return db.engine.dialect.name
+
+def ensure_search_index(language='french'):
+    """Crée l'index plein texte s'il n'existe pas (idempotent, appelé au démarrage)"""
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        exists = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first()
+        for statement in SQLITE_DDL:
+            db.session.execute(text(statement))
+        if not exists:
+            # Indexer les œuvres déjà présentes avant la création de la table
+            db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            db.session.execute(text(statement.format(language=language)))
+        db.session.commit()
+
+def rebuild_search_index(language='french'):
+    """Reconstruit entièrement l'index (après un import direct en base par exemple)"""
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        ensure_search_index(language)
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+    elif dialect == 'postgresql':
+        # La colonne générée est toujours à jour, seul l'index GIN peut être recompacté
+        ensure_search_index(language)
+        db.session.execute(text('REINDEX INDEX ix_literary_work_search_vector'))
+        db.session.commit()
+    else:
+        raise SearchUnavailable(dialect)
+
+def _fts5_query(q):
+    """Transforme la saisie utilisateur en requête FTS5 sûre (termes entre guillemets, dernier en préfixe)"""
+    tokens = TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    terms = ['"%s"' % token for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def search_works(q, limit, offset=0, language='french'):
+    """
+    Recherche classée des œuvres publiées.
+    Retourne une liste de (work_id, snippet, score) et un booléen indiquant
+    s'il reste des résultats après cette page.
+    """
+    dialect = _dialect()
+    params = {'limit': limit + 1, 'offset': offset}
+
+    if dialect == 'sqlite':
+        match = _fts5_query(q)
+        if match is None:
+            return [], False
+        params.update(match=match, mark_start=MARK_START, mark_stop=MARK_STOP)
+        # bm25 est négatif (plus petit = plus pertinent), le titre pèse 10 fois plus que le contenu
+        rows = db.session.execute(text(f"""
+            SELECT w.id,
+                   snippet({FTS_TABLE}, 1, :mark_start, :mark_stop, '…', 24) AS snippet,
+                   -bm25({FTS_TABLE}, 10.0, 1.0) AS score
+            FROM {FTS_TABLE}
+            JOIN literary_work w ON w.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :match AND w.status = 'published'
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0), w.id
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+    elif dialect == 'postgresql':
+        params['q'] = q
+        params['language'] = language
+        params['headline'] = f'StartSel={MARK_START}, StopSel={MARK_STOP}, MaxWords=35, MinWords=15'
+        # ts_headline est coûteux : il n'est calculé que sur la page retenue
+        rows = db.session.execute(text("""
+            SELECT page.id,
+                   ts_headline(CAST(:language AS regconfig), w.content, page.query, :headline) AS snippet,
+                   page.score
+            FROM (
+                SELECT w.id, query, ts_rank_cd(w.search_vector, query) AS score
+                FROM literary_work w, websearch_to_tsquery(CAST(:language AS regconfig), :q) AS query
+                WHERE w.search_vector @@ query AND w.status = 'published'
+                ORDER BY score DESC, w.id
+                LIMIT :limit OFFSET :offset
+            ) AS page
+            JOIN literary_work w ON w.id = page.id
+            ORDER BY page.score DESC, page.id
+        """), params).all()
+    else:
+        raise SearchUnavailable(dialect)
+
+    has_more = len(rows) > limit
+    return [(row[0], highlight(row[1]), float(row[2])) for row in rows[:limit]], has_more
@@ -0,0 +1,252 @@
+import json
+import re
+from datetime import datetime, date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from replica import offload
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur le module json de Flask
+    orjson = None
+
+# Schémas de sérialisation déclaratifs. Chaque schéma est compilé une seule fois
+# en une fonction Python qui construit le dictionnaire en une expression, sans
+# introspection ni appel par champ à l'exécution. Les datetime sont laissés tels
+# quels : orjson les écrit au même format que datetime.isoformat().
+
+class Nested:
+    """Champ imbriqué sérialisé avec un autre schéma (liste si many=True, omis si None et optional=True)"""
+
+    def __init__(self, schema, attr=None, many=False, optional=False):
+        self.schema = schema
+        self.attr = attr
+        self.many = many
+        self.optional = optional
+
+class Formatted:
+    """Attribut passé à une fonction de formatage (ex. date au format YYYY-MM-DD)"""
+
+    def __init__(self, func, attr=None):
+        self.func = func
+        self.attr = attr
+
+class Computed:
+    """Valeur calculée à partir de l'objet entier"""
+
+    def __init__(self, func):
+        self.func = func
+
+class Schema:
+    """
+    Schéma déclaratif : Schema(id='id', author=Nested(AUTHOR), ...).
+    Une chaîne désigne l'attribut lu sur l'objet.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.dump = self._compile()
+
+    def extend(self, **fields):
+        """Nouveau schéma avec des champs ajoutés ou remplacés"""
+        return Schema(**{**self.fields, **fields})
+
+    def only(self, *keys):
+        """Nouveau schéma restreint aux clés données"""
+        return Schema(**{key: self.fields[key] for key in keys})
+
+    def dump_many(self, objects):
+        dump = self.dump
+        return [dump(obj) for obj in objects]
+
+    def _compile(self):
+        namespace = {}
+        items = []
+        optional = []
+        for index, (key, spec) in enumerate(self.fields.items()):
+            if isinstance(spec, str):
+                items.append(f'{key!r}: obj.{_attr(spec)}')
+            elif isinstance(spec, Nested):
+                name = f'_nested_{index}'
+                namespace[name] = spec.schema.dump
+                attr = _attr(spec.attr or key)
+                if spec.many:
+                    items.append(f'{key!r}: [{name}(item) for item in obj.{attr}]')
+                elif spec.optional:
+                    optional.append((key, attr, name))
+                else:
+                    items.append(f'{key!r}: {name}(obj.{attr})')
+            elif isinstance(spec, Formatted):
+                name = f'_format_{index}'
+                namespace[name] = spec.func
+                items.append(f'{key!r}: {name}(obj.{_attr(spec.attr or key)})')
+            elif isinstance(spec, Computed):
+                name = f'_computed_{index}'
+                namespace[name] = spec.func
+                items.append(f'{key!r}: {name}(obj)')
+            else:
+                raise TypeError(f'Champ de schéma invalide pour {key!r}: {spec!r}')
+
+        lines = ['def dump(obj):', '    data = {' + ', '.join(items) + '}']
+        for key, attr, name in optional:
+            lines += [
+                f'    value = obj.{attr}',
+                '    if value is not None:',
+                f'        data[{key!r}] = {name}(value)',
+            ]
+        lines.append('    return data')
+        exec('\n'.join(lines), namespace)
+        return namespace['dump']
+
+def _attr(name):
+    if not name.isidentifier():
+        raise ValueError(f"Nom d'attribut invalide : {name!r}")
+    return name
+
+def format_date(value):
+    """Date seule (YYYY-MM-DD), comme l'API des livres"""
+    return value.strftime('%Y-%m-%d') if value else None
+
+# --- Schémas des ressources -------------------------------------------------
+
+USER_SUMMARY = Schema(id='id', username='username', profile_picture='profile_picture')
+USER_BRIEF = USER_SUMMARY.only('id', 'username')
+USER_LIST_ITEM = Schema(
+    id='id', username='username', first_name='first_name', last_name='last_name',
+    role='role', profile_picture='profile_picture'
+)
+USER_PUBLIC = USER_LIST_ITEM.extend(bio='bio', created_at='created_at')
+USER_PROFILE = USER_PUBLIC.extend(email='email')
+
+BOOK = Schema(id='id', title='title', author='author', published_at=Formatted(format_date))
+BOOK_SUMMARY = BOOK.only('id', 'title', 'author')
+
+COMMENT = Schema(
+    id='id', content='content', rating='rating', created_at='created_at',
+    user=Nested(USER_SUMMARY)
+)
+
+WORK_BRIEF = Schema(
+    id='id', title='title', type='type', status='status', created_at='created_at',
+    author=Nested(USER_BRIEF)
+)
+WORK_LIST_ITEM = Schema(
+    id='id', title='title', type='type', status='status',
+    created_at='created_at', updated_at='updated_at',
+    author=Nested(USER_SUMMARY),
+    likes_count='likes_count', comments_count='comments_count',
+    rating_average='rating_average', rating_count='rating_count',
+    book=Nested(BOOK_SUMMARY, optional=True)
+)
+WORK_SEARCH_ITEM = WORK_LIST_ITEM.only(
+    'id', 'title', 'type', 'status', 'created_at', 'author', 'likes_count', 'comments_count'
+)
+WORK_DETAIL = WORK_LIST_ITEM.only(
+    'id', 'title', 'type', 'status', 'created_at', 'updated_at', 'author', 'likes_count', 'book',
+    'rating_average', 'rating_count'
+).extend(
+    content='content',
+    rating_distribution='rating_distribution',
+    likes=Nested(USER_BRIEF, many=True),
+    comments=Nested(COMMENT, many=True),
+    workshop=Nested(Schema(id='id', title='title'), optional=True),
+    group=Nested(Schema(id='id', name='name'), optional=True)
+)
+
+# Historique d'activité d'un utilisateur
+ACTIVITY_PUBLICATION = Schema(
+    id='id', title='title', type='type', status='status', created_at='created_at',
+    likes_count='likes_count', comments_count='comments_count'
+)
+ACTIVITY_COMMENT = Schema(
+    id='id', content='content', rating='rating', created_at='created_at',
+    literary_work=Nested(Schema(
+        id='id', title='title', author=Computed(lambda work: work.author.username)
+    ))
+)
+ACTIVITY_LIKED_WORK = Schema(
+    id='id', title='title', type='type',
+    author=Computed(lambda work: work.author.username), likes_count='likes_count'
+)
+
+GROUP_LIST_ITEM = Schema(
+    id='id', name='name', description='description', is_private='is_private',
+    created_at='created_at', creator=Nested(USER_SUMMARY),
+    members_count='members_count'
+)
+# Pages de détail : compteurs et première page des membres / œuvres, la suite
+# via les sous-ressources paginées (/groups/<id>/members, /groups/<id>/works...)
+GROUP_DETAIL = GROUP_LIST_ITEM.extend(works_count='works_count')
+
+WORKSHOP_LIST_ITEM = Schema(
+    id='id', title='title', description='description', theme='theme', status='status',
+    start_date='start_date', end_date='end_date', created_at='created_at',
+    creator=Nested(USER_SUMMARY),
+    participants_count='participants_count'
+)
+WORKSHOP_DETAIL = WORKSHOP_LIST_ITEM.extend(works_count='works_count')
+
+# --- Encodage JSON -----------------------------------------------------------
+
+def _default(obj):
+    # Utilisé par orjson pour les types qu'il ne gère pas, et par le repli json
+    # (qui écrirait sinon les dates au format HTTP au lieu d'ISO 8601)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Type non sérialisable en JSON : {type(obj).__name__}')
+
+def dumps_compact(obj):
+    """JSON compact en octets UTF-8, une ligne (export NDJSON)"""
+    if orjson is None:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return orjson.dumps(obj, default=_default)
+
+# Flottants qu'orjson n'écrit pas comme repr() : exposant (1e-7, 1e16) ou petite valeur (0.00001)
+_EXPONENT = re.compile(rb'e-?\d')
+
+def _same_as_json_module(data):
+    """Vrai si ces octets orjson sont ceux qu'écrirait le module json avec ensure_ascii"""
+    if not data.isascii() or b'\x7f' in data or b'0.0000' in data:
+        return False
+    return not any(data[match.start() - 1:match.start()].isdigit() for match in _EXPONENT.finditer(data))
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Fournisseur JSON de l'application basé sur orjson : utilisé par jsonify() dans
+    tous les blueprints. Mêmes clés triées, même indentation en debug et même saut
+    de ligne final que le fournisseur par défaut, mêmes valeurs JSON ; les octets
+    diffèrent toutefois :
+      - caractères non ASCII écrits en UTF-8 au lieu d'échappements \\uXXXX ;
+      - certains flottants écrits autrement (0.00001 au lieu de 1e-05, 1e16 au lieu de 1e+16).
+    ensure_ascii = True (JSON_ENSURE_ASCII) rend les réponses identiques octet pour
+    octet à celles du module json : orjson n'est alors gardé que pour les réponses
+    qu'il écrit à l'identique, les autres repassent par le module json.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def _options(self):
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs or self.ensure_ascii:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # Calcul CPU : hors de la boucle d'événements en mode ASGI
+        data = offload(orjson.dumps, obj, default=_default, option=self._options())
+        if self.ensure_ascii and not _same_as_json_module(data):
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data, mimetype=self.mimetype)
@@ -0,0 +1,88 @@
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+# L'application lit sa configuration à l'import : base SQLite temporaire, cache
+# de réponses coupé et diffusion des fils dans la requête pour des tests déterministes
+_db_dir = tempfile.mkdtemp(prefix='esme-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ['CACHE_TYPE'] = 'none'
+os.environ['FEED_FANOUT_WORKERS'] = '0'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import app as flask_app  # noqa: E402
+from models import db, User, LiteraryWork  # noqa: E402
+
+# La base est partagée par toute la session de tests : noms uniques
+_ids = itertools.count()
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        yield flask_app
+        db.session.rollback()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    """Fabrique d'utilisateurs (ajoutés à la session, non validés)"""
+    def make_user(**fields):
+        n = next(_ids)
+        user = User(username=f'user_{n}', email=f'user_{n}@example.com', password_hash='x', **fields)
+        db.session.add(user)
+        return user
+    return make_user
+
+@pytest.fixture
+def make_work(app, make_user):
+    """Fabrique d'œuvres publiées, chacune d'un nouvel auteur par défaut (validées)"""
+    def make_work(type_='poem', status='published', **fields):
+        if fields.get('author') is None and 'author_id' not in fields:
+            fields['author'] = make_user()
+        fields.setdefault('title', f'Œuvre {next(_ids)}')
+        fields.setdefault('content', 'Texte')
+        work = LiteraryWork(type=type_, status=status, **fields)
+        db.session.add(work)
+        db.session.commit()
+        return work
+    return make_work
+
+@pytest.fixture
+def auth_headers(app):
+    """En-têtes d'authentification d'un utilisateur (validé en base)"""
+    def auth_headers(user):
+        db.session.commit()
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    return auth_headers
+
+class StatementCounter:
+    """Compte les instructions SQL exécutées sur le moteur principal"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+@pytest.fixture
+def count_statements(app):
+    return lambda: StatementCounter(db.engine)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from models import db, literary_work_likes
+
+def test_liked_works_are_ordered_by_like_date(client, make_user, make_work, auth_headers):
+    user = make_user()
+    works = [make_work() for _ in range(4)]
+    # Œuvres aimées dans l'ordre inverse de leur création ; la dernière avant l'horodatage des likes
+    liked_at = [datetime(2024, 5, 4), datetime(2024, 5, 3), datetime(2024, 5, 2), None]
+    db.session.execute(literary_work_likes.insert(), [
+        {'user_id': user.id, 'literary_work_id': work.id, 'created_at': at} for work, at in zip(works, liked_at)
+    ])
+    headers = auth_headers(user)
+
+    overview = client.get(f'/api/users/{user.id}/activity', headers=headers).get_json()
+    assert [work['id'] for work in overview['liked_works']] == [work.id for work in works]
+
+    # Pages d'une œuvre : le curseur reprend après la date du dernier like affiché
+    seen, cursor = [], None
+    for _ in works:
+        url = f'/api/users/{user.id}/activity?section=liked_works&limit=1'
+        page = client.get(url + (f'&cursor={cursor}' if cursor else ''), headers=headers).get_json()
+        seen += [work['id'] for work in page['liked_works']]
+        cursor = page['next_cursor']
+    assert seen == [work.id for work in works]
+    assert cursor is None
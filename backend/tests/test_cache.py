@@ -0,0 +1,50 @@
+import pytest
+
+from cache import cache, MemoryBackend
+
+@pytest.fixture
+def memory_cache(app, monkeypatch):
+    monkeypatch.setattr(cache, 'backend', MemoryBackend())
+    return cache.backend
+
+def test_stale_read_is_not_stored():
+    backend = MemoryBackend()
+    started = backend.now()
+    # Écriture (et invalidation) pendant le calcul de la réponse
+    backend.invalidate(['work:1'])
+
+    assert not backend.set('stale', {'body': '[]'}, 60, ['works', 'work:1'], started)
+    assert backend.get('stale') is None
+    assert backend.set('fresh', {'body': '[]'}, 60, ['works', 'work:2'], started)
+
+def test_like_only_invalidates_pages_showing_the_work(client, memory_cache, make_user, make_work, auth_headers):
+    liked = make_work('cache-liked')
+    make_work('cache-other')
+    headers = auth_headers(make_user())
+
+    urls = [
+        '/api/literary-works?type=cache-liked&limit=10',
+        '/api/literary-works?type=cache-other&limit=10',
+        '/api/literary-works?type=cache-other&sort_by=popularity&limit=10',
+    ]
+    for url in urls:
+        assert client.get(url).headers['X-Cache'] == 'MISS'
+        assert client.get(url).headers['X-Cache'] == 'HIT'
+
+    assert client.post(f'/api/literary-works/{liked.id}/like', headers=headers).status_code == 200
+
+    liked_page = client.get(urls[0])
+    assert liked_page.headers['X-Cache'] == 'MISS'
+    assert liked_page.get_json()['works'][0]['likes_count'] == 1
+    # Liste par date sans l'œuvre : intacte ; liste par popularité : ordre à revoir
+    assert client.get(urls[1]).headers['X-Cache'] == 'HIT'
+    assert client.get(urls[2]).headers['X-Cache'] == 'MISS'
+
+def test_counters_are_reported(client, memory_cache, monkeypatch):
+    monkeypatch.setattr(cache, 'hits', 0)
+    monkeypatch.setattr(cache, 'misses', 0)
+    client.get('/api/literary-works?type=cache-stats&limit=5')
+    client.get('/api/literary-works?type=cache-stats&limit=5')
+
+    stats = client.get('/api/cache/stats').get_json()
+    assert (stats['hits'], stats['misses']) == (1, 1)
@@ -0,0 +1,40 @@
+from models import db, Book, Comment
+
+def etag_of(client, work_id):
+    response = client.get(f'/api/literary-works/{work_id}')
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+def revalidate(client, work_id, etag):
+    return client.get(f'/api/literary-works/{work_id}', headers={'If-None-Match': etag})
+
+def test_unchanged_work_is_not_modified(client, make_work):
+    work_id = make_work().id
+    etag = etag_of(client, work_id)
+
+    assert revalidate(client, work_id, etag).status_code == 304
+
+def test_commenter_profile_change_changes_the_etag(client, make_user, make_work, auth_headers):
+    work = make_work()
+    reader = make_user()
+    db.session.add(Comment(content='Bravo', user=reader, literary_work=work))
+    headers = auth_headers(reader)
+    work_id = work.id
+    etag = etag_of(client, work_id)
+
+    assert client.put('/api/profile', json={'profile_picture': 'avatar.png'}, headers=headers).status_code == 200
+
+    response = revalidate(client, work_id, etag)
+    assert response.status_code == 200
+    assert response.get_json()['comments'][0]['user']['profile_picture'] == 'avatar.png'
+
+def test_book_edit_changes_the_etag(client, make_work):
+    work = make_work(book=Book(title='Avant', author='Écrivain'))
+    work_id, book_id = work.id, work.book_id
+    etag = etag_of(client, work_id)
+
+    assert client.put(f'/api/books/{book_id}', json={'title': 'Après'}).status_code == 200
+
+    response = revalidate(client, work_id, etag)
+    assert response.status_code == 200
+    assert response.get_json()['book']['title'] == 'Après'
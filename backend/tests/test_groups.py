@@ -0,0 +1,53 @@
+import pytest
+
+from cache import cache, MemoryBackend
+from memberships import memberships
+from models import db, Group
+
+@pytest.fixture
+def groups(app, make_user):
+    """Un groupe public et un groupe privé dont `member` fait partie"""
+    member = make_user()
+    public = Group(name=f'Public {member.username}', description='', is_private=False, creator=member)
+    private = Group(name=f'Privé {member.username}', description='', is_private=True, creator=member)
+    db.session.add_all([public, private])
+    db.session.flush()
+    memberships.add('group', private.id, member.id)
+    db.session.commit()
+    return public, private, member
+
+def listed(response):
+    return [group['id'] for group in response.get_json()]
+
+@pytest.mark.parametrize('query', ['', '?is_private=false'])
+def test_group_list_shows_public_groups_only(client, groups, auth_headers, query):
+    public, private, member = groups
+
+    for headers in ({}, auth_headers(member)):
+        ids = listed(client.get(f'/api/groups{query}', headers=headers))
+        assert public.id in ids and private.id not in ids
+
+@pytest.mark.parametrize('query', ['?is_private=true', '?is_private=1'])
+def test_private_group_list_is_empty(client, groups, auth_headers, query):
+    public, private, member = groups
+
+    assert listed(client.get(f'/api/groups{query}')) == []
+    # Même pour un membre : la liste est partagée par le cache entre tous les clients
+    assert listed(client.get(f'/api/groups{query}', headers=auth_headers(member))) == []
+
+def test_cached_group_list_does_not_leak_to_anonymous_clients(client, groups, auth_headers, monkeypatch):
+    monkeypatch.setattr(cache, 'backend', MemoryBackend())
+    public, private, member = groups
+
+    client.get('/api/groups?is_private=true', headers=auth_headers(member))
+    response = client.get('/api/groups?is_private=true')
+    assert response.headers['X-Cache'] == 'HIT'
+    assert listed(response) == []
+
+def test_private_group_detail_requires_membership(client, groups, make_user, auth_headers):
+    public, private, member = groups
+
+    assert client.get(f'/api/groups/{public.id}').status_code == 200
+    assert client.get(f'/api/groups/{private.id}').status_code == 401
+    assert client.get(f'/api/groups/{private.id}', headers=auth_headers(make_user())).status_code == 403
+    assert client.get(f'/api/groups/{private.id}', headers=auth_headers(member)).status_code == 200
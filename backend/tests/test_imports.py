@@ -0,0 +1,22 @@
+def test_empty_import_returns_an_empty_report(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+
+    response = client.post('/api/literary-works/bulk', json=[], headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json() == {'inserted': 0, 'failed': 0, 'errors': []}
+
+def test_rejected_rows_are_reported_without_error_status(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+
+    response = client.post('/api/literary-works/bulk', json=[{'title': 'Sans contenu'}], headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['failed'] == 1
+
+def test_unreadable_body_is_a_bad_request(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+
+    response = client.post('/api/literary-works/bulk', json={'title': 'Pas un tableau'}, headers=headers)
+
+    assert response.status_code == 400
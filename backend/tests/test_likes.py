@@ -0,0 +1,42 @@
+import pytest
+
+from models import db, LiteraryWork
+
+# Requêtes SQL d'un lot de likes ou d'unlikes, quel que soit le nombre d'œuvres
+BATCH_BUDGET = 6
+
+def batch(client, headers, work_ids, liked):
+    return client.post('/api/likes/batch', headers=headers, json={
+        'likes': [{'work_id': work_id, 'liked': liked} for work_id in work_ids]
+    })
+
+@pytest.mark.parametrize('count', [1, 25])
+def test_batch_likes_use_a_fixed_number_of_statements(client, count_statements, make_user, make_work,
+                                                      auth_headers, count):
+    work_ids = [make_work('batch-likes').id for _ in range(count)]
+    headers = auth_headers(make_user())
+
+    with count_statements() as sql:
+        response = batch(client, headers, work_ids, True)
+    assert response.status_code == 200
+    assert [result['likes_count'] for result in response.get_json()['results']] == [1] * count
+    # Œuvres existantes, BEGIN IMMEDIATE (SQLite), epoch, insertion, compteurs, compteurs renvoyés
+    assert sql.count == BATCH_BUDGET
+
+    with count_statements() as sql:
+        response = batch(client, headers, work_ids, False)
+    assert [result['likes_count'] for result in response.get_json()['results']] == [0] * count
+    assert sql.count == BATCH_BUDGET
+
+    db.session.expire_all()
+    for work_id in work_ids:
+        assert db.session.get(LiteraryWork, work_id).hot_score == pytest.approx(0, abs=1e-9)
+
+def test_batch_likes_are_idempotent(client, make_user, make_work, auth_headers):
+    work = make_work('batch-likes-idempotent')
+    headers = auth_headers(make_user())
+
+    batch(client, headers, [work.id], True)
+    response = batch(client, headers, [work.id], True)
+
+    assert response.get_json()['results'][0]['likes_count'] == 1
@@ -0,0 +1,56 @@
+import pytest
+
+from models import db, Book, Comment, literary_work_likes
+
+# Nombre de requêtes SQL par endpoint, indépendant du nombre d'œuvres, de
+# commentaires et de likes (pas de chargement paresseux par ligne)
+LIST_BUDGET = 1
+DETAIL_BUDGET = 4  # marqueurs de version (ETag), œuvre et relations simples, commentaires, likes
+
+@pytest.fixture
+def make_works(make_work):
+    """count œuvres publiées, chacune d'un auteur différent et liée à un livre"""
+    def make_works(count, type_):
+        return [make_work(type_, book=Book(title=f'Livre {i}', author=f'Écrivain {i}')) for i in range(count)]
+    return make_works
+
+def add_reactions(work, count, make_user):
+    """count commentaires notés et count likes, de lecteurs différents"""
+    readers = [make_user() for _ in range(count)]
+    db.session.flush()
+    for reader in readers:
+        db.session.add(Comment(content='Bravo', rating=4, user=reader, literary_work=work))
+    db.session.execute(literary_work_likes.insert(), [
+        {'user_id': reader.id, 'literary_work_id': work.id} for reader in readers
+    ])
+    db.session.commit()
+
+@pytest.mark.parametrize('count', [1, 30])
+def test_works_list_query_budget(client, count_statements, make_works, count):
+    type_ = f'budget-list-{count}'
+    make_works(count, type_)
+    db.session.expunge_all()  # chaque requête part d'une session vide
+
+    with count_statements() as sql:
+        response = client.get(f'/api/literary-works?type={type_}&limit=50')
+
+    assert response.status_code == 200
+    works = response.get_json()['works']
+    assert len(works) == count
+    assert all(work['author']['username'] and work['book']['title'] for work in works)
+    assert sql.count == LIST_BUDGET
+
+@pytest.mark.parametrize('count', [1, 30])
+def test_work_detail_query_budget(client, count_statements, make_works, make_user, count):
+    work = make_works(1, 'budget-detail')[0]
+    add_reactions(work, count, make_user)
+    work_id = work.id
+    db.session.expunge_all()
+
+    with count_statements() as sql:
+        response = client.get(f'/api/literary-works/{work_id}')
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['comments']) == count and len(data['likes']) == count
+    assert sql.count == DETAIL_BUDGET
@@ -0,0 +1,36 @@
+import threading
+import time
+
+from models import db, LiteraryWork
+from quota import publication_quota
+
+def test_concurrent_reservations_respect_the_limit(app, monkeypatch, make_user):
+    monkeypatch.setitem(app.config, 'PUBLICATION_LIMIT', 1)
+    author = make_user()
+    db.session.commit()
+    author_id = author.id
+
+    barrier = threading.Barrier(2)
+    accepted = []
+
+    def publish():
+        with app.app_context():
+            barrier.wait()
+            usage = publication_quota.reserve(author_id)
+            if usage.can_publish:
+                # Laisse à l'autre requête le temps de faire son propre décompte
+                time.sleep(0.2)
+                db.session.add(LiteraryWork(title='Course', content='Texte', type='poem', author_id=author_id))
+                db.session.commit()
+                accepted.append(True)
+            else:
+                db.session.rollback()
+
+    threads = [threading.Thread(target=publish) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(accepted) == 1
+    assert LiteraryWork.query.filter_by(author_id=author_id).count() == 1
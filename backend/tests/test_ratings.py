@@ -0,0 +1,55 @@
+import pytest
+
+from commands import recount_works
+from models import db, LiteraryWork
+
+def rate(client, headers, work_id, rating):
+    return client.post(f'/api/literary-works/{work_id}/comments', headers=headers, json={
+        'content': 'Avis', **({'rating': rating} if rating is not None else {})
+    })
+
+def test_ratings_update_the_aggregates(client, make_user, make_work, auth_headers):
+    work = make_work('ratings-aggregates')
+    headers = auth_headers(make_user())
+
+    for rating in (5, 4, 4, None):
+        assert rate(client, headers, work.id, rating).status_code == 201
+    for invalid in (0, 6, 4.5, True, '4'):
+        assert rate(client, headers, work.id, invalid).status_code == 400
+
+    detail = client.get(f'/api/literary-works/{work.id}').get_json()
+    assert detail['rating_count'] == 3
+    assert detail['rating_average'] == pytest.approx(4.33)
+    assert detail['rating_distribution'] == {'1': 0, '2': 0, '3': 0, '4': 2, '5': 1}
+
+    # Compteurs maintenus à chaque note identiques à ceux recalculés depuis les commentaires
+    db.session.expire_all()
+    before = db.session.get(LiteraryWork, work.id)
+    maintained = (before.rating_sum, before.rating_count, before.rating_4_count, before.rating_score)
+    recount_works()
+    db.session.expire_all()
+    after = db.session.get(LiteraryWork, work.id)
+    assert (after.rating_sum, after.rating_count, after.rating_4_count, after.rating_score) == pytest.approx(maintained)
+
+def test_sort_by_rating_uses_the_smoothed_score(client, make_user, make_work, auth_headers):
+    headers = auth_headers(make_user())
+    single_five, many_fours, unrated, low = (make_work('ratings-sort') for _ in range(4))
+    rate(client, headers, single_five.id, 5)
+    for _ in range(10):
+        rate(client, headers, many_fours.id, 4)
+    rate(client, headers, low.id, 1)
+
+    # Note a priori 3 sur 5 notes : dix 4 (3.67) devant un seul 5 (3.33), sans note (3) devant un 1
+    expected = [many_fours.id, single_five.id, unrated.id, low.id]
+    works = client.get('/api/literary-works?type=ratings-sort&sort_by=rating').get_json()
+    assert [work['id'] for work in works] == expected
+
+    # Pagination : le curseur reprend après la note lissée de la dernière œuvre
+    seen, cursor = [], None
+    for _ in expected:
+        params = {'type': 'ratings-sort', 'sort_by': 'rating', 'limit': 1, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/api/literary-works', query_string=params).get_json()
+        seen += [work['id'] for work in page['works']]
+        cursor = page['next_cursor']
+    assert seen == expected
+    assert cursor is None
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+from flask import g
+from sqlalchemy.util import greenlet_spawn
+
+from replica import ReplicaRouter, STICKY_HEADER, async_engines, offload
+
+def make_router():
+    router = ReplicaRouter()
+    router.sticky_seconds = 5
+    return router
+
+def test_write_sends_the_sticky_window_to_the_client(app):
+    router = make_router()
+    with app.test_request_context('/api/literary-works', method='POST'):
+        router.record_write()
+        response = router._after_request(app.response_class())
+
+    until = float(response.headers[STICKY_HEADER])
+    assert 4 < until - time.time() <= 5.001
+
+def test_sticky_window_is_read_from_the_request(app):
+    router = make_router()
+    # Fenêtre émise par un autre processus : seule la valeur portée par le client compte
+    cases = [
+        (None, False),
+        ('%.3f' % (time.time() + 3), True),
+        ('%.3f' % (time.time() - 1), False),
+        ('%.3f' % (time.time() + 3600), False),
+        ('invalide', False),
+    ]
+    for value, expected in cases:
+        headers = {STICKY_HEADER: value} if value is not None else {}
+        with app.test_request_context('/api/literary-works', headers=headers):
+            assert router.recently_wrote() is expected
+            assert g.get('read_primary_until') is None
+
+def test_offload_calls_directly_in_sync_mode():
+    assert offload(threading.get_ident) == threading.get_ident()
+
+def test_offload_runs_off_the_event_loop_in_asgi_mode():
+    # Même contexte que asgi.AsyncApplication : greenlet avec les moteurs asynchrones
+    async def serve():
+        token = async_engines.set({})
+        try:
+            return threading.get_ident(), await greenlet_spawn(offload, threading.get_ident)
+        finally:
+            async_engines.reset(token)
+
+    loop_thread, called_in = asyncio.run(serve())
+    assert called_in != loop_thread
@@ -0,0 +1,20 @@
+from search import is_index_object
+
+def test_snippet_escapes_user_content(client, make_work):
+    make_work(title='Piège', content='<script>alert(1)</script> un vers zéphyrin <img src=x onerror=alert(2)>')
+
+    response = client.get('/api/literary-works/search?q=zephyrin')
+
+    assert response.status_code == 200
+    snippet = response.get_json()['results'][0]['snippet']
+    assert '<mark>zéphyrin</mark>' in snippet
+    assert '<script>' not in snippet and '<img' not in snippet
+    assert '&lt;script&gt;' in snippet
+
+def test_search_index_objects_are_ignored_by_alembic():
+    assert is_index_object('literary_work_fts', 'table')
+    assert is_index_object('literary_work_fts_docsize', 'table')
+    assert is_index_object('search_vector', 'column', 'literary_work')
+    assert is_index_object('ix_literary_work_search_vector', 'index')
+    assert not is_index_object('literary_work', 'table')
+    assert not is_index_object('content', 'column', 'literary_work')
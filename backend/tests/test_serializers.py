@@ -0,0 +1,42 @@
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+import serializers
+from serializers import OrjsonProvider
+
+PAYLOADS = [
+    {'title': 'Œuvre d’été à Noël', 'author': {'username': 'zoé'}, 'tags': ['poésie', '😀'], 'likes_count': 3},
+    {'score': 1e-07, 'big': 1.5e+16, 'small': 3.14e-05, 'rating_average': 4.25, 'zero': 0.0, 'n': -2},
+    {'content': 'Ligne\n"citée" \\ \x7f\x01 1e5, 2e-3 et 0.00001 dans le texte', 'created_at': datetime(2025, 3, 1, 12, 30, 5, 120)},
+    [{'b': None, 'a': True}, [], {}, 'ascii \x7f', 'expo 1e-07', 3.5],
+    [random.uniform(-1, 1) * 10 ** random.randint(-12, 20) for _ in range(200)],
+]
+
+def json_module_response(app, monkeypatch, payload):
+    # Repli sans orjson : fournisseur par défaut de Flask (module json, ensure_ascii)
+    provider = OrjsonProvider(app)
+    provider.ensure_ascii = True
+    with monkeypatch.context() as patch:
+        patch.setattr(serializers, 'orjson', None)
+        return provider.response(payload).get_data()
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_default_output_has_the_same_json_values(app, monkeypatch, payload):
+    data = OrjsonProvider(app).response(payload).get_data()
+
+    assert json.loads(data) == json.loads(json_module_response(app, monkeypatch, payload))
+
+def test_default_output_is_utf8(app):
+    assert 'Œuvre'.encode('utf-8') in OrjsonProvider(app).response(PAYLOADS[0]).get_data()
+
+@pytest.mark.parametrize('debug', [False, True])
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_ensure_ascii_matches_the_json_module_byte_for_byte(app, monkeypatch, payload, debug):
+    monkeypatch.setattr(app, 'debug', debug)
+    provider = OrjsonProvider(app)
+    provider.ensure_ascii = True
+
+    assert provider.response(payload).get_data() == json_module_response(app, monkeypatch, payload)
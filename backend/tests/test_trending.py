@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from feed import feed
+from likes import add_like, remove_like
+from models import db, LiteraryWork, TrendingState, literary_work_likes
+from trending import trending
+
+def hot_score(work_id):
+    return db.session.query(LiteraryWork.hot_score).filter(LiteraryWork.id == work_id).scalar()
+
+def test_unlike_removes_the_weight_added_by_the_like(make_user, make_work):
+    work = make_work()
+    reader = make_user()
+    db.session.commit()
+    # Like d'il y a deux jours : son poids a décru de trois quarts depuis
+    liked_at = datetime.utcnow() - timedelta(days=2)
+    db.session.execute(literary_work_likes.insert().values(
+        user_id=reader.id, literary_work_id=work.id, created_at=liked_at
+    ))
+    LiteraryWork.adjust_counters(work.id, likes_count=1, hot_score=trending.delta(trending.points(likes=1), at=liked_at))
+    db.session.commit()
+
+    assert remove_like(reader.id, work.id)
+    db.session.commit()
+
+    assert hot_score(work.id) == pytest.approx(0, abs=1e-9)
+
+def test_like_then_unlike_is_neutral(make_user, make_work):
+    work = make_work()
+    reader = make_user()
+    db.session.commit()
+
+    assert add_like(reader.id, work.id)
+    db.session.commit()
+    assert remove_like(reader.id, work.id)
+    db.session.commit()
+
+    assert hot_score(work.id) == pytest.approx(0, abs=1e-9)
+
+def test_only_the_first_publication_counts(client, monkeypatch, make_work, auth_headers):
+    published = []
+    monkeypatch.setattr(feed, 'publish', published.append)
+    work = make_work(status='draft')
+    headers = auth_headers(work.author)
+
+    for status in ('published', 'draft', 'published', 'draft', 'published'):
+        response = client.put(f'/api/literary-works/{work.id}', json={'status': status}, headers=headers)
+        assert response.status_code == 200
+
+    db.session.expire_all()
+    work = db.session.get(LiteraryWork, work.id)
+    assert work.first_published_at is not None
+    assert hot_score(work.id) == pytest.approx(
+        trending.delta(trending.points(publication=True), at=work.first_published_at)
+    )
+    assert published == [work.id]
+
+def test_delta_uses_the_epoch_advanced_by_another_process(make_user, make_work):
+    trending.ensure_state()
+    db.session.query(TrendingState).filter(TrendingState.id == 1).update(
+        {TrendingState.epoch: datetime.utcnow() - timedelta(days=2)}
+    )
+    db.session.commit()
+    trending.epoch()
+    db.session.commit()
+    # Re-décroissance faite par un autre processus : epoch avancée à il y a une heure
+    db.session.query(TrendingState).filter(TrendingState.id == 1).update(
+        {TrendingState.epoch: datetime.utcnow() - timedelta(hours=1)}
+    )
+    db.session.commit()
+
+    work = make_work()
+    reader = make_user()
+    db.session.commit()
+    assert add_like(reader.id, work.id)
+    db.session.commit()
+
+    assert hot_score(work.id) == pytest.approx(2 ** (1 / 24), rel=1e-3)
@@ -0,0 +1,151 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from models import db, LiteraryWork, TrendingState, begin_write, insert_ignore
+
+logger = logging.getLogger(__name__)
+
+# Classement « tendance » des œuvres. Chaque événement (publication, like,
+# commentaire, note) vaut un poids qui décroît de moitié toutes les
+# TRENDING_HALF_LIFE_HOURS. Plutôt que de faire décroître tous les scores en
+# continu, on stocke poids * exp((t - epoch) / tau) : l'ajout d'un événement est
+# un simple UPDATE hot_score = hot_score + delta, et l'ordre entre les œuvres est
+# celui des scores décrus. La re-décroissance périodique ramène les valeurs à
+# l'échelle de la date courante (epoch avancée) pour éviter qu'elles ne croissent
+# sans limite. Un delta doit donc être calculé avec l'epoch lue dans la transaction
+# qui l'ajoute : une epoch mise en cache serait périmée dès qu'un autre processus
+# re-décroît, et le delta serait trop grand d'un facteur exp(avance / tau).
+
+DEFAULT_WEIGHTS = {
+    'publication': 1.0,  # mise en ligne de l'œuvre
+    'like': 1.0,
+    'comment': 2.0,
+    'rating': 0.5,       # par étoile au-dessus (ou en dessous) de 3
+}
+
+class Trending:
+    def __init__(self):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.tau = 24 * 3600 / math.log(2)
+        self._thread = None
+
+    def init_app(self, app):
+        self.weights = {**DEFAULT_WEIGHTS, **app.config.get('TRENDING_WEIGHTS', {})}
+        self.tau = app.config.get('TRENDING_HALF_LIFE_HOURS', 24) * 3600 / math.log(2)
+        app.extensions['trending'] = self
+
+        interval = app.config.get('TRENDING_DECAY_INTERVAL', 0)
+        if interval and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._decay_loop, args=(app, interval), name='trending-decay', daemon=True
+            )
+            self._thread.start()
+
+    def points(self, likes=0, comments=0, rating=None, publication=False):
+        """Poids d'un ensemble d'événements (négatif pour un retrait)"""
+        points = likes * self.weights['like'] + comments * self.weights['comment']
+        if rating is not None:
+            points += (rating - 3) * self.weights['rating']
+        if publication:
+            points += self.weights['publication']
+        return points
+
+    def delta(self, points, at=None, epoch=None):
+        """
+        Incrément de hot_score pour des événements survenus à `at` (maintenant par défaut).
+        `epoch` : epoch déjà lue dans la transaction courante (écritures groupées).
+        """
+        if not points:
+            return 0
+        elapsed = ((at or datetime.utcnow()) - (epoch or self.epoch())).total_seconds()
+        return points * math.exp(elapsed / self.tau)
+
+    def epoch(self):
+        """
+        Date de référence des scores, lue dans la transaction courante avec un verrou
+        partagé (FOR SHARE, ou transaction d'écriture sur SQLite) : une re-décroissance
+        concurrente attend le commit de l'écriture, ou l'écriture attend la sienne.
+        """
+        begin_write()
+        epoch = db.session.query(TrendingState.epoch).filter(
+            TrendingState.id == 1
+        ).with_for_update(read=True).scalar()
+        if epoch is None:
+            epoch = self.ensure_state(commit=False)
+        return epoch
+
+    def redecay(self):
+        """
+        Ramène tous les scores à l'échelle de maintenant et avance l'epoch.
+        L'epoch est réservée par un UPDATE conditionnel : si un autre processus
+        vient de le faire, on s'arrête (pas de double décroissance).
+        Retourne le nombre d'œuvres mises à jour, None si la passe a été faite ailleurs.
+        """
+        previous = db.session.query(TrendingState.epoch).filter(TrendingState.id == 1).scalar()
+        if previous is None:
+            previous = self.ensure_state(commit=False)
+        now = datetime.utcnow()
+        claimed = db.session.query(TrendingState).filter(
+            TrendingState.id == 1, TrendingState.epoch == previous
+        ).update({TrendingState.epoch: now}, synchronize_session=False)
+        if not claimed:
+            db.session.rollback()
+            return None
+
+        factor = math.exp(-(now - previous).total_seconds() / self.tau)
+        updated = db.session.query(LiteraryWork).filter(LiteraryWork.hot_score != 0).update(
+            {LiteraryWork.hot_score: LiteraryWork.hot_score * factor}, synchronize_session=False
+        )
+        # Scores devenus négligeables : remis à zéro (les œuvres anciennes sortent du classement)
+        db.session.query(LiteraryWork).filter(
+            LiteraryWork.hot_score != 0, LiteraryWork.hot_score.between(-1e-6, 1e-6)
+        ).update({LiteraryWork.hot_score: 0}, synchronize_session=False)
+        db.session.commit()
+        return updated
+
+    def rebuild(self, batch_size=1000):
+        """
+        Recalcule hot_score depuis les compteurs dénormalisés, en datant tous les
+        événements d'une œuvre de sa création (approximation pour l'initialisation).
+        """
+        epoch = self.epoch()
+        rows = db.session.query(
+            LiteraryWork.id, LiteraryWork.status, LiteraryWork.created_at,
+            LiteraryWork.likes_count, LiteraryWork.comments_count,
+            LiteraryWork.rating_sum, LiteraryWork.rating_count
+        ).all()
+        values = []
+        for work_id, status, created_at, likes, comments, rating_sum, rating_count in rows:
+            points = self.points(likes=likes, comments=comments, publication=status == 'published')
+            points += (rating_sum - 3 * rating_count) * self.weights['rating']
+            elapsed = ((created_at or epoch) - epoch).total_seconds()
+            values.append({'id': work_id, 'hot_score': points * math.exp(elapsed / self.tau)})
+
+        for start in range(0, len(values), batch_size):
+            db.session.execute(db.update(LiteraryWork), values[start:start + batch_size])
+        db.session.commit()
+        return len(values)
+
+    def ensure_state(self, commit=True):
+        """Crée la ligne d'epoch si elle manque (au démarrage) ; retourne l'epoch en vigueur"""
+        db.session.execute(insert_ignore(TrendingState.__table__).values(id=1, epoch=datetime.utcnow()))
+        if commit:
+            db.session.commit()
+        return db.session.query(TrendingState.epoch).filter(TrendingState.id == 1).scalar()
+
+    def _decay_loop(self, app, interval):
+        # Un fil par processus ; la réservation de l'epoch évite les passes en double
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    self.redecay()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Re-décroissance des scores tendance échouée')
+                finally:
+                    db.session.remove()
+
+trending = Trending()
@@ -54,6 +54,21 @@ const GroupDetail = ({ user }) => {
     }
   };
 
+  // Charge la page suivante des membres ou des œuvres et l'ajoute à la liste
+  const loadMore = async (section) => {
+    try {
+      const fetchPage = section === 'members' ? groupService.getGroupMembers : groupService.getGroupWorks;
+      const page = await fetchPage(id, group.next_cursors[section]);
+      setGroup(prev => ({
+        ...prev,
+        [section]: [...prev[section], ...page[section]],
+        next_cursors: { ...prev.next_cursors, [section]: page.next_cursor }
+      }));
+    } catch (err) {
+      console.error('Erreur lors du chargement de la suite:', err);
+    }
+  };
+
   const handleDeleteGroup = async () => {
     if (confirmDelete) {
       try {
@@ -71,7 +86,7 @@ const GroupDetail = ({ user }) => {
   };
 
   const isCreator = group && user && group.creator.id === user.id;
-  const isMember = group && user && group.members.some(member => member.id === user.id);
+  const isMember = group && user && group.is_member;
   const formatDate = (dateString) => {
     const options = { year: 'numeric', month: 'long', day: 'numeric' };
     return new Date(dateString).toLocaleDateString('fr-FR', options);
@@ -129,7 +144,7 @@ const GroupDetail = ({ user }) => {
 
       <div className="group-detail-content">
         <div className="group-works">
-          <h2 className="group-section-header">Œuvres du groupe</h2>
+          <h2 className="group-section-header">Œuvres du groupe ({group.works_count})</h2>
           {group.works.length === 0 ? (
             <p>Aucune œuvre dans ce groupe pour le moment.</p>
           ) : (
@@ -150,10 +165,15 @@ const GroupDetail = ({ user }) => {
               ))}
             </div>
           )}
+          {group.next_cursors?.works && (
+            <button className="load-more-btn" onClick={() => loadMore('works')}>
+              Voir plus
+            </button>
+          )}
         </div>
 
         <div className="group-members">
-          <h2 className="group-section-header">Membres ({group.members.length})</h2>
+          <h2 className="group-section-header">Membres ({group.members_count})</h2>
           <div className="members-list">
             {group.members.map(member => (
               <div key={member.id} className="member-item">
@@ -168,6 +188,11 @@ const GroupDetail = ({ user }) => {
               </div>
             ))}
           </div>
+          {group.next_cursors?.members && (
+            <button className="load-more-btn" onClick={() => loadMore('members')}>
+              Voir plus
+            </button>
+          )}
         </div>
       </div>
     </div>
@@ -4,8 +4,12 @@ import { groupService } from '../../services/api';
 import '../../styles/Groups.css';
 import { FaPlus, FaUsers, FaBook } from 'react-icons/fa';
 
+// Nombre de groupes chargés par page (pagination par curseur)
+const PAGE_SIZE = 20;
+
 const Groups = () => {
   const [groups, setGroups] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [filters, setFilters] = useState({
@@ -14,17 +18,18 @@ const Groups = () => {
     member_id: ''
   });
 
+  // Filtrer les valeurs non vides
+  const activeFilters = () => Object.fromEntries(
+    Object.entries(filters).filter(([_, value]) => value !== '')
+  );
+
   useEffect(() => {
     const fetchGroups = async () => {
       setLoading(true);
       try {
-        // Filtrer les valeurs non vides
-        const activeFilters = Object.fromEntries(
-          Object.entries(filters).filter(([_, value]) => value !== '')
-        );
-        
-        const data = await groupService.getAllGroups(activeFilters);
-        setGroups(data);
+        const data = await groupService.getAllGroups({ ...activeFilters(), limit: PAGE_SIZE });
+        setGroups(data.groups);
+        setNextCursor(data.next_cursor);
         setError(null);
       } catch (err) {
         console.error('Erreur lors du chargement des groupes:', err);
@@ -37,6 +42,17 @@ const Groups = () => {
     fetchGroups();
   }, [filters]);
 
+  // Page suivante, ajoutée à la liste
+  const loadMore = async () => {
+    try {
+      const data = await groupService.getAllGroups({ ...activeFilters(), limit: PAGE_SIZE, cursor: nextCursor });
+      setGroups(prev => [...prev, ...data.groups]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      console.error('Erreur lors du chargement de la suite:', err);
+    }
+  };
+
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
     setFilters(prev => ({
@@ -150,6 +166,11 @@ const Groups = () => {
           ))}
         </div>
       )}
+      {!loading && nextCursor && (
+        <button className="load-more-btn" onClick={loadMore}>
+          Voir plus
+        </button>
+      )}
     </div>
   );
 };
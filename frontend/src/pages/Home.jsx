@@ -3,11 +3,12 @@ import reactLogo from '../assets/react.svg'
 import viteLogo from '/vite.svg'
 import '../App.css'
 import { Link } from 'react-router-dom'
-import { literaryWorkService, workshopService, groupService } from '../services/api'
+import { literaryWorkService, workshopService, groupService, userService } from '../services/api'
 import '../styles/Home.css'
 
 const Home = () => {
   const [recentWorks, setRecentWorks] = useState([])
+  const [feedWorks, setFeedWorks] = useState([])
   const [activeWorkshops, setActiveWorkshops] = useState([])
   const [featuredGroups, setFeaturedGroups] = useState([])
   const [loading, setLoading] = useState(true)
@@ -18,17 +19,21 @@ const Home = () => {
       try {
         setLoading(true)
         
+        // Fil d'actualité : nouveautés des groupes, ateliers et auteurs suivis (limitées à 4)
+        const feed = await userService.getFeed(null, 4)
+        setFeedWorks(feed.works)
+        
         // Récupérer les œuvres récentes (limitées à 4)
-        const works = await literaryWorkService.getAllWorks({ status: 'published' })
-        setRecentWorks(works.slice(0, 4))
+        const works = await literaryWorkService.getAllWorks({ status: 'published', limit: 4 })
+        setRecentWorks(works.works)
         
         // Récupérer les ateliers actifs (limités à 3)
-        const workshops = await workshopService.getAllWorkshops({ status: 'active' })
-        setActiveWorkshops(workshops.slice(0, 3))
+        const workshops = await workshopService.getAllWorkshops({ status: 'active', limit: 3 })
+        setActiveWorkshops(workshops.workshops)
         
         // Récupérer les groupes (limités à 3)
-        const groups = await groupService.getAllGroups({ is_private: false })
-        setFeaturedGroups(groups.slice(0, 3))
+        const groups = await groupService.getAllGroups({ is_private: false, limit: 3 })
+        setFeaturedGroups(groups.groups)
         
         setLoading(false)
       } catch (err) {
@@ -64,6 +69,32 @@ const Home = () => {
         <div className="loading-spinner">Chargement...</div>
       ) : (
         <>
+          {feedWorks.length > 0 && (
+            <section className="home-section">
+              <div className="section-header">
+                <h2>Votre fil</h2>
+              </div>
+              <div className="works-grid">
+                {feedWorks.map(work => (
+                  <div className="work-card" key={work.id}>
+                    <div className="work-type">{work.type}</div>
+                    <h3 className="work-title">
+                      <Link to={`/literary-works/${work.id}`}>{work.title}</Link>
+                    </h3>
+                    <div className="work-author">
+                      <span>Par {work.author.username}</span>
+                    </div>
+                    <div className="work-meta">
+                      <span>{new Date(work.created_at).toLocaleDateString()}</span>
+                      <span>{work.likes_count} ❤️</span>
+                      <span>{work.comments_count} 💬</span>
+                    </div>
+                  </div>
+                ))}
+              </div>
+            </section>
+          )}
+
           <section className="home-section">
             <div className="section-header">
               <h2>Dernières Œuvres Publiées</h2>
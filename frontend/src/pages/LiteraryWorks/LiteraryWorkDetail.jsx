@@ -198,6 +198,11 @@ const LiteraryWorkDetail = ({ user: currentUser }) => {
               Groupe : <Link to={`/groups/${work.group.id}`}>{work.group.name}</Link>
             </div>
           )}
+          {work.rating_count > 0 && (
+            <div className="work-rating" title={[5, 4, 3, 2, 1].map(value => `${value}★ : ${work.rating_distribution[value]}`).join(' · ')}>
+              {renderStarRating(Math.round(work.rating_average))} {work.rating_average}/5 ({work.rating_count} note{work.rating_count > 1 ? 's' : ''})
+            </div>
+          )}
           {work.book && (
             <div className="work-book">
               📚 Livre associé : <strong>{work.book.title}</strong> par {work.book.author}
@@ -3,11 +3,16 @@ import { Link } from 'react-router-dom'
 import { literaryWorkService } from '../../services/api'
 import '../../styles/LiteraryWorks.css'
 
+// Nombre d'œuvres chargées par page (pagination par curseur)
+const PAGE_SIZE = 20
+
 const LiteraryWorks = ({ user }) => {
   const [works, setWorks] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
-  const [cache, setCache] = useState({}) // Cache pour éviter les requêtes répétées
+  const [cache, setCache] = useState({}) // Cache pour éviter les requêtes répétées ({ works, next_cursor } par filtres)
   
   // États pour les filtres
   const [filters, setFilters] = useState({
@@ -39,15 +44,17 @@ const LiteraryWorks = ({ user }) => {
   const fetchWorks = useCallback(async () => {
     // Vérifier le cache d'abord
     if (cache[cacheKey]) {
-      setWorks(cache[cacheKey])
+      setWorks(cache[cacheKey].works)
+      setNextCursor(cache[cacheKey].next_cursor)
       setLoading(false)
       return
     }
 
       try {
         setLoading(true)
-      const data = await literaryWorkService.getAllWorks(debouncedFilters)
-        setWorks(data)
+      const data = await literaryWorkService.getAllWorks({ ...debouncedFilters, limit: PAGE_SIZE })
+        setWorks(data.works)
+        setNextCursor(data.next_cursor)
       
       // Mettre en cache les résultats
       setCache(prev => ({
@@ -63,6 +70,25 @@ const LiteraryWorks = ({ user }) => {
       }
   }, [debouncedFilters, cacheKey, cache])
 
+  // Page suivante, ajoutée à la liste et au cache
+  const loadMore = useCallback(async () => {
+    try {
+      setLoadingMore(true)
+      const data = await literaryWorkService.getAllWorks({ ...debouncedFilters, limit: PAGE_SIZE, cursor: nextCursor })
+      const merged = [...works, ...data.works]
+      setWorks(merged)
+      setNextCursor(data.next_cursor)
+      setCache(prev => ({
+        ...prev,
+        [cacheKey]: { works: merged, next_cursor: data.next_cursor }
+      }))
+    } catch (err) {
+      console.error('Erreur lors du chargement de la suite:', err)
+    } finally {
+      setLoadingMore(false)
+    }
+  }, [debouncedFilters, cacheKey, nextCursor, works])
+
   const handleFilterChange = useCallback((filterName, value) => {
     setFilters(prev => ({
       ...prev,
@@ -83,10 +109,10 @@ const LiteraryWorks = ({ user }) => {
       setWorks(updateWorks)
       
       // Mettre à jour le cache
-      setCache(prev => ({
+      setCache(prev => prev[cacheKey] ? ({
         ...prev,
-        [cacheKey]: updateWorks(prev[cacheKey] || [])
-      }))
+        [cacheKey]: { ...prev[cacheKey], works: updateWorks(prev[cacheKey].works) }
+      }) : prev)
     } catch (err) {
       console.error('Erreur lors du like:', err)
     }
@@ -105,10 +131,10 @@ const LiteraryWorks = ({ user }) => {
       setWorks(updateWorks)
       
       // Mettre à jour le cache
-      setCache(prev => ({
+      setCache(prev => prev[cacheKey] ? ({
         ...prev,
-        [cacheKey]: updateWorks(prev[cacheKey] || [])
-      }))
+        [cacheKey]: { ...prev[cacheKey], works: updateWorks(prev[cacheKey].works) }
+      }) : prev)
     } catch (err) {
       console.error('Erreur lors du unlike:', err)
     }
@@ -176,6 +202,11 @@ const LiteraryWorks = ({ user }) => {
         <div className="stat">
           💬 {work.comments_count}
         </div>
+        {work.rating_count > 0 && (
+          <div className="stat">
+            ★ {work.rating_average} ({work.rating_count})
+          </div>
+        )}
       </div>
     </div>
   ), [getTypeLabel, formatDate, handleLike, handleUnlike])
@@ -219,6 +250,8 @@ const LiteraryWorks = ({ user }) => {
           >
               <option value="recent">Plus récents</option>
               <option value="popularity">Popularité</option>
+              <option value="trending">Tendances</option>
+              <option value="rating">Mieux notées</option>
           </select>
         </div>
         </div>
@@ -238,6 +271,11 @@ const LiteraryWorks = ({ user }) => {
           ))
           )}
         </div>
+      {nextCursor && (
+        <button className="load-more-btn" onClick={loadMore} disabled={loadingMore}>
+          {loadingMore ? 'Chargement...' : 'Voir plus'}
+        </button>
+      )}
     </div>
   )
 }
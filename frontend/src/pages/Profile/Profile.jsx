@@ -41,6 +41,30 @@ const Profile = ({ user: currentUser, setUser }) => {
     }
   }, [currentUser])
 
+  // Charge la page suivante d'une section de l'activité et l'ajoute à la liste
+  const loadMore = async (section) => {
+    try {
+      const page = await userService.getUserActivitySection(
+        profile.id, section, activity.next_cursors[section]
+      )
+      setActivity(previous => ({
+        ...previous,
+        [section]: [...previous[section], ...page[section]],
+        next_cursors: { ...previous.next_cursors, [section]: page.next_cursor }
+      }))
+    } catch (err) {
+      console.error(err)
+    }
+  }
+
+  const renderLoadMore = (section) => (
+    activity?.next_cursors?.[section] && (
+      <button className="btn btn-secondary" onClick={() => loadMore(section)}>
+        Voir plus
+      </button>
+    )
+  )
+
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('fr-FR', {
       year: 'numeric',
@@ -234,7 +258,7 @@ const Profile = ({ user: currentUser, setUser }) => {
         {activeTab === 'publications' && (
           <div className="publications-tab">
             <div className="tab-header">
-              <h3>Mes publications ({activity?.publications?.length || 0})</h3>
+              <h3>Mes publications ({activity?.statistics?.total_publications || 0})</h3>
               <Link to="/literary-works/create" className="btn btn-primary">
                 Nouvelle publication
             </Link>
@@ -279,12 +303,13 @@ const Profile = ({ user: currentUser, setUser }) => {
                 </div>
               )}
             </div>
+            {renderLoadMore('publications')}
           </div>
         )}
 
         {activeTab === 'comments' && (
           <div className="comments-tab">
-            <h3>Mes commentaires ({activity?.comments?.length || 0})</h3>
+            <h3>Mes commentaires ({activity?.statistics?.total_comments || 0})</h3>
             
             <div className="comments-list">
               {activity?.comments?.length > 0 ? (
@@ -319,12 +344,13 @@ const Profile = ({ user: currentUser, setUser }) => {
                 </div>
               )}
             </div>
+            {renderLoadMore('comments')}
           </div>
         )}
 
         {activeTab === 'likes' && (
           <div className="likes-tab">
-            <h3>Œuvres que j'ai aimées ({activity?.liked_works?.length || 0})</h3>
+            <h3>Œuvres que j'ai aimées ({activity?.statistics?.total_likes_given || 0})</h3>
             
             <div className="works-grid">
               {activity?.liked_works?.length > 0 ? (
@@ -357,6 +383,7 @@ const Profile = ({ user: currentUser, setUser }) => {
                 </div>
               )}
             </div>
+            {renderLoadMore('liked_works')}
           </div>
           )}
       </div>
@@ -20,9 +20,8 @@ const WorkshopDetail = ({ user }) => {
         const data = await workshopService.getWorkshopById(id)
         setWorkshop(data)
         
-        // Vérifier si l'utilisateur est participant
-        const isUserParticipant = data.participants.some(p => p.id === user?.id)
-        setIsParticipant(isUserParticipant)
+        // Vérifier si l'utilisateur est participant (calculé par l'API)
+        setIsParticipant(data.is_participant)
         
         // Vérifier si l'utilisateur est le créateur
         setIsCreator(data.creator.id === user?.id)
@@ -46,6 +45,7 @@ const WorkshopDetail = ({ user }) => {
       setIsParticipant(true)
       setWorkshop(prev => ({
         ...prev,
+        participants_count: prev.participants_count + 1,
         participants: [...prev.participants, {
           id: user.id,
           username: user.username,
@@ -68,6 +68,7 @@ const WorkshopDetail = ({ user }) => {
       setIsParticipant(false)
       setWorkshop(prev => ({
         ...prev,
+        participants_count: prev.participants_count - 1,
         participants: prev.participants.filter(p => p.id !== user.id)
       }))
       setActionLoading(false)
@@ -78,6 +79,23 @@ const WorkshopDetail = ({ user }) => {
     }
   }
 
+  // Charge la page suivante des participants ou des œuvres et l'ajoute à la liste
+  const loadMore = async (section) => {
+    try {
+      const fetchPage = section === 'participants'
+        ? workshopService.getWorkshopParticipants
+        : workshopService.getWorkshopWorks
+      const page = await fetchPage(id, workshop.next_cursors[section])
+      setWorkshop(prev => ({
+        ...prev,
+        [section]: [...prev[section], ...page[section]],
+        next_cursors: { ...prev.next_cursors, [section]: page.next_cursor }
+      }))
+    } catch (err) {
+      console.error(err)
+    }
+  }
+
   const handleDeleteWorkshop = async () => {
     if (window.confirm('Êtes-vous sûr de vouloir supprimer cet atelier ? Cette action est irréversible.')) {
       try {
@@ -178,7 +196,7 @@ const WorkshopDetail = ({ user }) => {
       </div>
 
       <div className="workshop-participants-section">
-        <h2>Participants ({workshop.participants.length})</h2>
+        <h2>Participants ({workshop.participants_count})</h2>
         <div className="participants-grid">
           {workshop.participants.map(participant => (
             <div className="participant-card" key={participant.id}>
@@ -200,10 +218,15 @@ const WorkshopDetail = ({ user }) => {
             </div>
           ))}
         </div>
+        {workshop.next_cursors?.participants && (
+          <button className="load-more-btn" onClick={() => loadMore('participants')}>
+            Voir plus
+          </button>
+        )}
       </div>
 
       <div className="workshop-works-section">
-        <h2>Œuvres soumises ({workshop.works.length})</h2>
+        <h2>Œuvres soumises ({workshop.works_count})</h2>
         {workshop.works.length > 0 ? (
           <div className="works-grid">
             {workshop.works.map(work => (
@@ -227,6 +250,11 @@ const WorkshopDetail = ({ user }) => {
             {isParticipant && " Soyez le premier à soumettre quelque chose !"}
           </p>
         )}
+        {workshop.next_cursors?.works && (
+          <button className="load-more-btn" onClick={() => loadMore('works')}>
+            Voir plus
+          </button>
+        )}
       </div>
     </div>
   )
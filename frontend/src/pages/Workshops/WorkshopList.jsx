@@ -3,8 +3,12 @@ import { Link } from 'react-router-dom'
 import { workshopService } from '../../services/api'
 import '../../styles/Workshops.css'
 
+// Nombre d'ateliers chargés par page (pagination par curseur)
+const PAGE_SIZE = 20
+
 const WorkshopList = () => {
   const [workshops, setWorkshops] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
   const [filters, setFilters] = useState({
@@ -16,8 +20,9 @@ const WorkshopList = () => {
     const fetchWorkshops = async () => {
       try {
         setLoading(true)
-        const data = await workshopService.getAllWorkshops(filters)
-        setWorkshops(data)
+        const data = await workshopService.getAllWorkshops({ ...filters, limit: PAGE_SIZE })
+        setWorkshops(data.workshops)
+        setNextCursor(data.next_cursor)
         setLoading(false)
       } catch (err) {
         setError('Erreur lors du chargement des ateliers')
@@ -29,6 +34,17 @@ const WorkshopList = () => {
     fetchWorkshops()
   }, [filters])
 
+  // Page suivante, ajoutée à la liste
+  const loadMore = async () => {
+    try {
+      const data = await workshopService.getAllWorkshops({ ...filters, limit: PAGE_SIZE, cursor: nextCursor })
+      setWorkshops(prev => [...prev, ...data.workshops])
+      setNextCursor(data.next_cursor)
+    } catch (err) {
+      console.error('Erreur lors du chargement de la suite:', err)
+    }
+  }
+
   const handleFilterChange = (e) => {
     const { name, value } = e.target
     setFilters(prev => ({
@@ -131,6 +147,11 @@ const WorkshopList = () => {
           )}
         </div>
       )}
+      {!loading && nextCursor && (
+        <button className="load-more-btn" onClick={loadMore}>
+          Voir plus
+        </button>
+      )}
     </div>
   )
 }
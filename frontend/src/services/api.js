@@ -25,6 +25,11 @@ const axiosInstance = axios.create({
   timeout: 10000, // Timeout de 10 secondes
 });
 
+// Après une écriture, le serveur renvoie la fin de la fenêtre pendant laquelle
+// les lectures doivent se faire sur la base principale (lecture de ses propres écritures)
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+let readPrimaryUntil = 0;
+
 // Intercepteur pour ajouter le token d'authentification à chaque requête
 axiosInstance.interceptors.request.use(
   (config) => {
@@ -32,6 +37,9 @@ axiosInstance.interceptors.request.use(
     if (token) {
       config.headers['Authorization'] = `Bearer ${token}`;
     }
+    if (readPrimaryUntil * 1000 > Date.now()) {
+      config.headers[READ_PRIMARY_HEADER] = readPrimaryUntil;
+    }
     return config;
   },
   (error) => {
@@ -41,7 +49,13 @@ axiosInstance.interceptors.request.use(
 
 // Intercepteur de réponse pour gérer les erreurs
 axiosInstance.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const until = parseFloat(response.headers[READ_PRIMARY_HEADER.toLowerCase()]);
+    if (until > readPrimaryUntil) {
+      readPrimaryUntil = until;
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
@@ -257,6 +271,25 @@ export const workshopService = {
     }
   },
 
+  // Pages suivantes des sous-ressources d'un atelier (curseur fourni par la page précédente)
+  getWorkshopParticipants: async (id, cursor) => {
+    try {
+      const response = await axiosInstance.get(`/workshops/${id}/participants`, { params: { cursor } });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
+  getWorkshopWorks: async (id, cursor) => {
+    try {
+      const response = await axiosInstance.get(`/workshops/${id}/works`, { params: { cursor } });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
   createWorkshop: async (workshopData) => {
     try {
       const response = await axiosInstance.post('/workshops', workshopData);
@@ -323,6 +356,25 @@ export const groupService = {
     }
   },
 
+  // Pages suivantes des sous-ressources d'un groupe (curseur fourni par la page précédente)
+  getGroupMembers: async (id, cursor) => {
+    try {
+      const response = await axiosInstance.get(`/groups/${id}/members`, { params: { cursor } });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
+  getGroupWorks: async (id, cursor) => {
+    try {
+      const response = await axiosInstance.get(`/groups/${id}/works`, { params: { cursor } });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
   createGroup: async (groupData) => {
     try {
       const response = await axiosInstance.post('/groups', groupData);
@@ -415,5 +467,45 @@ export const userService = {
     } catch (error) {
       throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
     }
+  },
+
+  // Page suivante d'une section de l'activité (publications, comments, liked_works)
+  getUserActivitySection: async (id, section, cursor) => {
+    try {
+      const response = await axiosInstance.get(`/users/${id}/activity`, {
+        params: { section, cursor }
+      });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
+  followUser: async (id) => {
+    try {
+      const response = await axiosInstance.post(`/users/${id}/follow`);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
+  unfollowUser: async (id) => {
+    try {
+      const response = await axiosInstance.post(`/users/${id}/unfollow`);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
+  },
+
+  // Fil d'actualité : œuvres des groupes, ateliers et auteurs suivis ({ works, next_cursor })
+  getFeed: async (cursor, limit = 20) => {
+    try {
+      const response = await axiosInstance.get('/feed', { params: { cursor, limit } });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { error: 'Une erreur est survenue' };
+    }
   }
 }; 
\ No newline at end of file